@@ -37,6 +37,39 @@ def ensure_trader_container(trader_id: str, env: dict[str, str], recreate: bool
         labels={"app": "upbit-trader", "trader_id": trader_id},
     )
 
+def _env_of(c) -> dict[str, str]:
+    out = {}
+    for kv in (c.attrs.get("Config", {}).get("Env") or []):
+        k, _, v = kv.partition("=")
+        out[k] = v
+    return out
+
+def apply_trader_container(trader_id: str, env: dict[str, str], force_recreate: bool = False) -> str:
+    # config 적용 시 컨테이너 처리. 반환값 = 실제로 간 경로
+    #   hot      : 실행 중 + 같은 image/env => 그대로 두고 trader 가 config_current 를 polling 해서 반영
+    #   start    : 멈춰 있던 컨테이너를 다시 시작 (캐시는 없지만 재생성은 안 함)
+    #   recreate : image(또는 trader env)가 바뀌었거나 강제 => stop/remove 후 새로 run
+    #   create   : 컨테이너가 없음
+    c = get_trader_container(trader_id)
+    if c is None:
+        ensure_trader_container(trader_id, env)
+        return "create"
+    if not force_recreate:
+        try:
+            image_id = cli.images.get(SETTINGS.TRADER_IMAGE).id
+        except docker.errors.ImageNotFound:
+            image_id = None
+        cur_env = _env_of(c)
+        same_image = image_id is None or c.image.id == image_id
+        same_env = all(cur_env.get(k) == v for k, v in env.items())
+        if same_image and same_env:
+            if c.status == "running":
+                return "hot"
+            c.start()
+            return "start"
+    ensure_trader_container(trader_id, env, recreate=True)
+    return "recreate"
+
 def get_trader_container(trader_id: str):
     name = trader_container_name(trader_id)
     try:
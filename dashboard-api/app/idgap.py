@@ -0,0 +1,34 @@
+import bisect
+import time
+
+# AUTO_INCREMENT id 는 commit 순서와 다르게 보일 수 있다 (id 를 먼저 받은 transaction 이 늦게 commit).
+# 그래서 "여기까지는 빠짐없이 봤다" 는 id watermark 는 이어지는 id 까지만 올리고,
+# watermark 바로 다음이 비어 있으면 gap_sec 동안 그 앞에 묶어 둔다.
+# 그래도 안 채워지면 rollback / 예약만 하고 안 쓴 id / 삭제된 행으로 보고 건너뛴다.
+# gap 의 나이 = 그 id 보다 큰 id 가 처음 보인 시각부터. 읽을 때마다 (지금까지 본 최대 id, 처음 본 시각) 을 남겨서
+# 이미 오래된 gap 여러 개는 한 번에 건너뛴다 (gap 마다 gap_sec 씩 줄줄이 기다리지 않게).
+class IdGapTracker:
+    def __init__(self, gap_sec: float):
+        self.gap_sec = gap_sec
+        self.skipped = 0
+        self._max_ids: list[int] = []  # 오름차순
+        self._seen_at: list[float] = []
+
+    def advance(self, last_id: int, ids) -> int:
+        # ids: last_id 보다 큰 id 오름차순 (last_id 다음부터 빠짐없이 읽은 결과) => 새 watermark
+        now = time.monotonic()
+        if ids and (not self._max_ids or ids[-1] > self._max_ids[-1]):
+            self._max_ids.append(ids[-1])
+            self._seen_at.append(now)
+        for i in ids:
+            if i != last_id + 1:
+                # last_id+1 이 비어 있는 상태로 더 큰 id 가 처음 보인 시각
+                k = bisect.bisect_left(self._max_ids, last_id + 2)
+                if now - self._seen_at[k] < self.gap_sec:
+                    break
+                self.skipped += i - last_id - 1
+            last_id = i
+        # watermark 아래 기록은 더 이상 필요 없다
+        k = bisect.bisect_left(self._max_ids, last_id + 2)
+        del self._max_ids[:k], self._seen_at[:k]
+        return last_id
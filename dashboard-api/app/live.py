@@ -0,0 +1,124 @@
+import asyncio
+from collections import defaultdict
+from sqlalchemy import func, select
+from .db import engine
+from .idgap import IdGapTracker
+from .models import Event, Score
+from .settings import SETTINGS
+
+# events/scores tail (id high-water mark) -> 구독자 fan-out
+# DB 조회는 구독자 수와 무관하게 poll 1회당 table 별 1 query. 구독자가 없으면 poller 도 멈춘다
+# 늦게 commit 되는 작은 id 를 놓치지 않도록 hw 는 빠짐없이 이어진 id 까지만 올리고 (IdGapTracker),
+# 그 뒤 행은 보낸 id 를 기억해 두었다가 다시 읽힐 때 거른다 (최대 LIVE_SENT_MAX 개, 넘치면 오래된 gap 부터 포기)
+LIVE_KINDS = ("events", "scores")
+LIVE_BATCH = 1000
+LIVE_SENT_MAX = 1000
+LIVE_QUEUE_MAX = 100  # 구독자별 대기 batch 수. 넘치면 그 구독자 몫은 버린다 (느린 client 가 poller 를 막지 않게)
+
+_COLUMNS = {
+    "events": (Event.id, Event.trader_id, Event.level, Event.code, Event.message, Event.created_at),
+    "scores": (Score.id, Score.trader_id, Score.symbol, Score.score, Score.scan_id, Score.created_at),
+}
+
+class LiveHub:
+    def __init__(self, poll_sec: float = SETTINGS.LIVE_POLL_SEC):
+        self.poll_sec = poll_sec
+        self.subs: dict[asyncio.Queue, tuple[str | None, frozenset]] = {}
+        self.hw: dict[str, int] = {}
+        self.sent: dict[str, set[int]] = {}
+        self.gaps = {k: IdGapTracker(SETTINGS.LIVE_GAP_SEC) for k in LIVE_KINDS}
+        self.task: asyncio.Task | None = None
+        self.polls = 0
+        self.rows = 0
+        self.dropped = 0
+        self.last_error: str | None = None
+
+    def subscribe(self, trader_id: str | None, kinds) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=LIVE_QUEUE_MAX)
+        self.subs[q] = (trader_id, frozenset(kinds))
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        self.subs.pop(q, None)
+
+    def _fetch(self) -> dict[str, list[dict]]:
+        out = {}
+        with engine.connect() as conn:
+            for kind, cols in _COLUMNS.items():
+                id_col = cols[0]
+                hw = self.hw.get(kind)
+                first = hw is None
+                if first:
+                    # 처음에는 지금 시점부터 (과거 행은 /events, /scores 로 조회)
+                    # MAX(id) 아래에도 아직 commit 안 된 id 가 있을 수 있으니 LIVE_BATCH 앞부터 gap tracker 를 태우고,
+                    # 지금 보이는 행은 보낸 것으로 친다
+                    hw = max(0, int(conn.execute(select(func.coalesce(func.max(id_col), 0))).scalar()) - LIVE_BATCH)
+                sent = self.sent.setdefault(kind, set())
+                q = select(*cols).where(id_col > hw).order_by(id_col).limit(LIVE_BATCH + len(sent))
+                rows = conn.execute(q).mappings().all()
+                new = [r for r in rows if r["id"] not in sent]
+                gaps = self.gaps[kind]
+                new_hw = gaps.advance(hw, [int(r["id"]) for r in rows])
+                sent.update(int(r["id"]) for r in new)
+                sent = {i for i in sent if i > new_hw}
+                if len(sent) > LIVE_SENT_MAX:
+                    # 매 poll 다시 읽는 행 수 상한. 가장 오래된 보낸 id 까지 hw 를 올리고 그 사이 gap 은 건너뛴 것으로 센다
+                    ahead = sorted(sent)
+                    cut = ahead[len(ahead) - LIVE_SENT_MAX - 1]
+                    gaps.skipped += cut - new_hw - (len(ahead) - LIVE_SENT_MAX)
+                    new_hw = cut
+                    sent = set(ahead[-LIVE_SENT_MAX:])
+                self.hw[kind] = new_hw
+                self.sent[kind] = sent
+                if new and not first:
+                    out[kind] = [dict(r, created_at=r["created_at"].isoformat()) for r in new]
+        return out
+
+    def _publish(self, kind: str, rows: list[dict]):
+        by_trader = defaultdict(list)
+        for r in rows:
+            by_trader[r["trader_id"]].append(r)
+        for q, (trader_id, kinds) in list(self.subs.items()):
+            if kind not in kinds:
+                continue
+            mine = rows if trader_id is None else by_trader.get(trader_id)
+            if not mine:
+                continue
+            try:
+                q.put_nowait((kind, mine))
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def _run(self):
+        while self.subs:
+            try:
+                batch = await asyncio.to_thread(self._fetch)
+                self.polls += 1
+            except Exception as e:
+                self.last_error = str(e)
+                batch = {}
+            for kind, rows in batch.items():
+                self.rows += len(rows)
+                self._publish(kind, rows)
+            await asyncio.sleep(self.poll_sec)
+        # 다음 구독이 시작되면 그 시점부터 다시 tail
+        self.hw.clear()
+        self.sent.clear()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subs),
+            "running": self.task is not None and not self.task.done(),
+            "poll_sec": self.poll_sec,
+            "polls": self.polls,
+            "rows": self.rows,
+            "dropped": self.dropped,
+            "high_water": dict(self.hw),
+            "ahead_of_gap": {k: len(v) for k, v in self.sent.items()},
+            "gap_skipped_ids": {k: g.skipped for k, g in self.gaps.items()},
+            "last_error": self.last_error,
+        }
+
+HUB = LiveHub()
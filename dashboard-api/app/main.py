@@ -9,6 +9,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 from .routers.overview import router as overview_router
@@ -16,11 +17,26 @@ from .routers.traders import router as traders_router
 from .routers.config import router as config_router
 from .routers.query import router as query_router
 from .routers.accounts import router as accounts_router
+from .routers.export import router as export_router
+from .routers.live import router as live_router
 
 app.include_router(overview_router)
 app.include_router(traders_router)
 app.include_router(config_router)
 app.include_router(query_router)
 app.include_router(accounts_router)
+app.include_router(export_router)
+app.include_router(live_router)
+
+from .migrate import run_migrations
+from .rollup import ROLLUP
+from .retention import RETENTION
+
+@app.on_event("startup")
+def _start_jobs():
+    # 기존 DB 의 schema 를 먼저 맞춘 뒤 background job 시작
+    run_migrations()
+    ROLLUP.start()
+    RETENTION.start()
 
 # Startup reconcile intentionally does NOT start traders automatically.
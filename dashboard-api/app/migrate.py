@@ -0,0 +1,31 @@
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from .db import engine
+
+# db/init/*.sql 은 빈 volume 에서만 돈다. 그 뒤에 추가된 column / index / table 은 여기서 기존 DB 에도 맞춘다.
+# 전부 IF NOT EXISTS (MariaDB) 라 매 startup 마다 다시 돌려도 된다.
+MIGRATIONS = [
+    ("scores.scan_id", "ALTER TABLE scores ADD COLUMN IF NOT EXISTS scan_id VARCHAR(32) NULL AFTER score"),
+    ("scores.features_json", "ALTER TABLE scores ADD COLUMN IF NOT EXISTS features_json LONGTEXT NULL AFTER scan_id"),
+    ("scores.idx_scores_scan", "ALTER TABLE scores ADD INDEX IF NOT EXISTS idx_scores_scan (scan_id)"),
+    # db/init/005_retention.sql 과 같은 정의
+    ("retention_cursors", "CREATE TABLE IF NOT EXISTS retention_cursors (rule_key VARCHAR(96) NOT NULL, "
+                          "compacted_until DATETIME NOT NULL, updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+                          "PRIMARY KEY (rule_key))"),
+]
+
+STATUS = {"ran_at": None, "applied": [], "errors": {}}
+
+def run_migrations() -> dict:
+    applied, errors = [], {}
+    for name, sql in MIGRATIONS:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(sql))
+            applied.append(name)
+        except DBAPIError as e:
+            # 실패해도 API 는 뜬다 (/overview/jobs 에 남김)
+            errors[name] = str(e.orig)[:500]
+    STATUS.update({"ran_at": time.time(), "applied": applied, "errors": errors})
+    return STATUS
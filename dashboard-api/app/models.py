@@ -43,7 +43,7 @@ class ConfigCurrent(Base):
     version: Mapped[int] = mapped_column(Integer)
     config_json: Mapped[str] = mapped_column(Text)
     applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    apply_mode: Mapped[str] = mapped_column(String(32), default="restart")
+    apply_mode: Mapped[str] = mapped_column(String(32), default="hot")
 
 class Event(Base):
     __tablename__ = "events"
@@ -85,4 +85,6 @@ class Score(Base):
     trader_id: Mapped[str] = mapped_column(String(64), index=True)
     symbol: Mapped[str] = mapped_column(String(32))
     score: Mapped[float] = mapped_column(Float)
+    scan_id: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+    features_json: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,292 @@
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import DBAPIError
+from .db import engine
+from .settings import SETTINGS
+
+# events/scores retention
+#   1) 일별 partition(pYYYYMMDD = [d, d+1)) 을 RETENTION_PREMAKE_DAYS 만큼 미리 만든다 (pmax 를 REORGANIZE)
+#   2) EVENT_DETAIL_TTL 이 지난 events.detail_json 을 NULL 로 비운다 (archive dir 이 있으면 먼저 gz 로 저장)
+#   3) 보관 일수가 지난 partition 을 DROP (DELETE 없음). archive dir 이 있으면 먼저 gz 로 저장
+# rollup job 이 아직 집계하지 않은 events 는 건드리지 않는다 (rollup_watermarks 기준)
+# compaction 이 어디까지 비웠는지는 retention_cursors 에 rule 별로 남긴다
+# partition 은 004_partitioning.sql (빈 volume 에서만 적용) 이 있어야 한다. 없으면 DROP 없이 stats() 에만 표시
+LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+COMPACT_BATCH = 5000
+_SET_CURSOR = text(
+    "INSERT INTO retention_cursors (rule_key, compacted_until, updated_at) VALUES (:rule, :at, NOW()) "
+    "ON DUPLICATE KEY UPDATE compacted_until=VALUES(compacted_until), updated_at=NOW()"
+)
+
+def parse_ttl(spec: str) -> dict[str, int]:
+    # "DEBUG=1,BUY_EVAL=1,*=14" -> {"DEBUG": 1, "BUY_EVAL": 1, "*": 14}
+    out = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            out[k.strip().upper() if k.strip() != "*" else "*"] = int(v)
+    return out
+
+def _bound(desc: str | None) -> date | None:
+    # information_schema.PARTITIONS.PARTITION_DESCRIPTION: "'2025-01-02'" / "'2025-01-02 00:00:00'" / "MAXVALUE"
+    if not desc or desc.upper() == "MAXVALUE":
+        return None
+    return datetime.fromisoformat(desc.strip("'")).date()
+
+def _pname(d: date) -> str:
+    return f"p{d:%Y%m%d}"
+
+def _json_default(v):
+    return v.isoformat() if isinstance(v, (date, datetime)) else str(v)
+
+def _cursor_rule(cond: str, params: dict) -> str:
+    # retention_cursors.rule_key (VARCHAR(96)). TTL 설정이 바뀌어 조건이 달라지면 새 cursor 로 처음부터
+    sig = zlib.crc32(json.dumps([cond, params], sort_keys=True).encode())
+    return f"compact:{sig:08x}:{params.get('key') or '*'}"[:96]
+
+class RetentionJob:
+    def __init__(self, interval_sec: float = SETTINGS.RETENTION_INTERVAL_SEC):
+        self.interval_sec = interval_sec
+        self.days = {"events": SETTINGS.RETENTION_EVENTS_DAYS, "scores": SETTINGS.RETENTION_SCORES_DAYS}
+        self.premake_days = SETTINGS.RETENTION_PREMAKE_DAYS
+        self.detail_ttl = parse_ttl(SETTINGS.EVENT_DETAIL_TTL)
+        self.archive_dir = SETTINGS.RETENTION_ARCHIVE_DIR
+        self.runs = 0
+        self.created: list[str] = []
+        self.dropped: list[str] = []
+        self.compacted = 0
+        self.gate_margin = timedelta(seconds=SETTINGS.RETENTION_GATE_MARGIN_SEC)
+        self._compact_from: dict[str, datetime] = {}
+        self.partitioned: dict[str, bool | None] = {t: None for t in self.days}
+        self.cursors_persisted: bool | None = None
+        self.last_run_ms = None
+        self.last_error: str | None = None
+        self._stop = threading.Event()
+        self._th: threading.Thread | None = None
+
+    # ---- partitions ------------------------------------------------------
+
+    def partitions(self, conn, table: str) -> list[tuple[str, date | None]]:
+        rows = conn.execute(
+            text(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA=DATABASE() AND TABLE_NAME=:t AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION"
+            ),
+            {"t": table},
+        ).fetchall()
+        return [(r[0], _bound(r[1])) for r in rows]
+
+    def premake(self, conn, table: str, today: date) -> list[str]:
+        parts = self.partitions(conn, table)
+        self.partitioned[table] = bool(parts)
+        if not parts or parts[-1][1] is not None:
+            # partition 안 된 table (004 적용 전 DB) 이거나 pmax 가 없음
+            return []
+        last = max((b for _, b in parts if b is not None), default=None)
+        # 마지막 partition 의 상한 = 다음 partition 의 첫날
+        start = last if last is not None and last > date(2000, 1, 1) else None
+        if start is None:
+            # 처음: pmax 에 이미 있는 행부터 일별로 나눈다
+            first = conn.execute(text(f"SELECT MIN(created_at) FROM {table} PARTITION (pmax)")).scalar()
+            start = first.date() if first else today
+        end = today + timedelta(days=self.premake_days)
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if not days:
+            return []
+        spec = ", ".join(f"PARTITION {_pname(d)} VALUES LESS THAN ('{d + timedelta(days=1)}')" for d in days)
+        conn.execute(text(f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({spec}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"))
+        return [f"{table}.{_pname(d)}" for d in days]
+
+    def rollup_gate(self, conn, table: str) -> datetime | None:
+        # 이 시각 이전 행은 rollup 에 반영됨. None = rollup 테이블이 없음(제한 없음)
+        # created_at(enqueue 시각) 은 id 순서와 다르므로 watermark 행의 created_at 이 아니라
+        # 아직 집계 안 된 행(id > last_id) 중 가장 이른 created_at 을 쓰고, 아직 commit 안 된 행 몫으로 margin 을 뺀다
+        try:
+            wm = conn.execute(text("SELECT last_id FROM rollup_watermarks WHERE source=:t"), {"t": table}).scalar()
+        except DBAPIError as e:
+            if getattr(e.orig, "args", (None,))[0] == 1146:  # ER_NO_SUCH_TABLE
+                return None
+            raise
+        if wm is None:
+            return datetime.min
+        first = conn.execute(
+            text(f"SELECT COALESCE(MIN(created_at), NOW()) FROM {table} WHERE id > :wm"), {"wm": wm}
+        ).scalar()
+        return first - self.gate_margin
+
+    def _archive_path(self, *parts: str) -> str:
+        p = os.path.join(self.archive_dir, *parts)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        return p
+
+    def archive_partition(self, table: str, pname: str) -> int:
+        path = self._archive_path(table, f"{pname}.ndjson.gz")
+        tmp = f"{path}.tmp"
+        n = 0
+        with engine.connect() as conn, gzip.open(tmp, "wt", encoding="utf-8") as f:
+            res = conn.execution_options(stream_results=True, yield_per=COMPACT_BATCH).execute(
+                text(f"SELECT * FROM {table} PARTITION ({pname})")
+            )
+            keys = list(res.keys())
+            for part in res.partitions():
+                f.writelines(json.dumps(dict(zip(keys, r)), ensure_ascii=False, default=_json_default) + "\n" for r in part)
+                n += len(part)
+        os.replace(tmp, path)
+        return n
+
+    def drop_old(self, conn, table: str, today: date, gate: datetime | None) -> list[str]:
+        keep_from = today - timedelta(days=self.days[table])
+        out = []
+        for pname, bound in self.partitions(conn, table):
+            if bound is None or pname == "p0" or bound > keep_from:
+                continue
+            if gate is not None and datetime(bound.year, bound.month, bound.day) > gate:
+                continue
+            if self.archive_dir:
+                self.archive_partition(table, pname)
+            conn.execute(text(f"ALTER TABLE {table} DROP PARTITION {pname}"))
+            out.append(f"{table}.{pname}")
+        return out
+
+    # ---- detail compaction -----------------------------------------------
+
+    def _ttl_rules(self) -> list[tuple[str, dict, int]]:
+        # (조건 SQL, params, 일수). code > level > * 순서로 겹치지 않게 나눈다
+        codes = [k for k in self.detail_ttl if k != "*" and k not in LEVELS]
+        levels = [k for k in self.detail_ttl if k in LEVELS]
+        not_codes = "code NOT IN :codes" if codes else "1=1"
+        rules = [("code=:key", {"key": c}, self.detail_ttl[c]) for c in codes]
+        rules += [(f"level=:key AND {not_codes}", {"key": lv, "codes": codes}, self.detail_ttl[lv]) for lv in levels]
+        if "*" in self.detail_ttl:
+            not_levels = "level NOT IN :levels" if levels else "1=1"
+            rules.append((f"{not_codes} AND {not_levels}", {"codes": codes, "levels": levels}, self.detail_ttl["*"]))
+        return rules
+
+    def _load_cursors(self) -> bool:
+        # retention_cursors 에 남긴 rule 별 cursor. False = 테이블이 없음 (이 process 메모리에만 유지)
+        with engine.connect() as conn:
+            try:
+                rows = conn.execute(text("SELECT rule_key, compacted_until FROM retention_cursors")).fetchall()
+            except DBAPIError as e:
+                if getattr(e.orig, "args", (None,))[0] == 1146:  # ER_NO_SUCH_TABLE
+                    return False
+                raise
+        for rule, at in rows:
+            self._compact_from[rule] = max(self._compact_from.get(rule, at), at)
+        return True
+
+    def _set_cursor(self, conn, rule: str, at: datetime, persist: bool):
+        self._compact_from[rule] = at
+        if persist:
+            # DATETIME 은 초 단위 => 다음 회차가 경계의 행을 다시 볼 뿐 (detail_json IS NOT NULL 로 걸러짐)
+            conn.execute(_SET_CURSOR, {"rule": rule, "at": at.replace(microsecond=0)})
+
+    def compact_details(self, gate: datetime | None) -> int:
+        # rule 별로 어디까지 비웠는지 기억해서 (retention_cursors / self._compact_from) 다음 회차는 그 이후 partition 만 본다
+        total = 0
+        persist = self.cursors_persisted = self._load_cursors()
+        for cond, params, days in self._ttl_rules():
+            rule = _cursor_rule(cond, params)
+            while True:
+                with engine.begin() as conn:
+                    cutoff = conn.execute(text("SELECT NOW() - INTERVAL :d DAY"), {"d": days}).scalar()
+                    if gate is not None:
+                        cutoff = min(cutoff, gate)
+                    since = self._compact_from.get(rule, datetime.min)
+                    stmt = text(
+                        "SELECT id, trader_id, level, code, detail_json, created_at FROM events "
+                        f"WHERE created_at >= :since AND created_at < :cutoff AND detail_json IS NOT NULL AND {cond} "
+                        "ORDER BY created_at LIMIT :n"
+                    )
+                    expanding = [k for k in ("codes", "levels") if f":{k}" in cond]
+                    if expanding:
+                        stmt = stmt.bindparams(*(bindparam(k, expanding=True) for k in expanding))
+                    rows = conn.execute(stmt, dict(params, since=since, cutoff=cutoff, n=COMPACT_BATCH)).fetchall()
+                    if not rows:
+                        if cutoff > since:
+                            self._set_cursor(conn, rule, cutoff, persist)
+                        break
+                    if self.archive_dir:
+                        # 같은 날 파일에 gzip member 를 이어 붙인다 (zcat 으로 한 번에 읽힘)
+                        path = self._archive_path("events_detail", f"{date.today():%Y-%m-%d}.ndjson.gz")
+                        with gzip.open(path, "at", encoding="utf-8") as f:
+                            f.writelines(
+                                json.dumps({"id": r.id, "trader_id": r.trader_id, "level": r.level, "code": r.code,
+                                            "created_at": r.created_at.isoformat(), "detail_json": r.detail_json},
+                                           ensure_ascii=False) + "\n"
+                                for r in rows
+                            )
+                    conn.execute(
+                        text(
+                            "UPDATE events SET detail_json=NULL "
+                            "WHERE id IN :ids AND created_at >= :since AND created_at <= :last"
+                        ).bindparams(bindparam("ids", expanding=True)),
+                        {"ids": [r.id for r in rows], "since": since, "last": rows[-1].created_at},
+                    )
+                    self._set_cursor(conn, rule, rows[-1].created_at, persist)
+                total += len(rows)
+                if len(rows) < COMPACT_BATCH:
+                    break
+        return total
+
+    # ---- loop ------------------------------------------------------------
+
+    def run_once(self):
+        t0 = time.perf_counter()
+        with engine.begin() as conn:
+            today = conn.execute(text("SELECT CURDATE()")).scalar()
+            gates = {table: self.rollup_gate(conn, table) for table in self.days}
+            for table in self.days:
+                self.created += self.premake(conn, table, today)
+        compacted = self.compact_details(gates["events"])
+        with engine.begin() as conn:
+            for table in self.days:
+                self.dropped += self.drop_old(conn, table, today, gates[table])
+        self.compacted += compacted
+        self.created = self.created[-50:]
+        self.dropped = self.dropped[-50:]
+        self.runs += 1
+        self.last_run_ms = round((time.perf_counter() - t0) * 1000, 1)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.interval_sec)
+
+    def start(self):
+        if self._th is None:
+            self._th = threading.Thread(target=self._loop, name="retention", daemon=True)
+            self._th.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "days": self.days,
+            "detail_ttl": self.detail_ttl,
+            "archive_dir": self.archive_dir or None,
+            "created": self.created,
+            "dropped": self.dropped,
+            "compacted": self.compacted,
+            # False = partition 안 된 table (004_partitioning.sql 적용 전 volume) => 오래된 행이 DROP 되지 않는다
+            "partitioned": self.partitioned,
+            "unpartitioned": [t for t, v in self.partitioned.items() if v is False],
+            "cursors_persisted": self.cursors_persisted,
+            "last_run_ms": self.last_run_ms,
+            "last_error": self.last_error,
+        }
+
+RETENTION = RetentionJob()
@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import text
+from .db import engine
+from .idgap import IdGapTracker
+from .settings import SETTINGS
+
+# events/scores -> trader_rollups (minute/hour/day) 증분 집계
+# source 별 id watermark 이후 행만 읽고, upsert 와 watermark 갱신을 한 transaction 으로 묶어서 두 번 세지 않는다.
+# AUTO_INCREMENT id 는 commit 순서와 다를 수 있으므로 watermark 는 빠짐없이 이어진 id 까지만 올린다 (IdGapTracker).
+# 중간 id 가 ROLLUP_LAG_SEC 동안 안 보이면 rollback 등으로 보고 건너뛴다.
+# created_at 은 enqueue 시각이라 commit 순서와 무관하므로 settle 기준으로 쓰지 않는다.
+GRAINS = ("minute", "hour", "day")
+ROLLUP_CODES = ("SCORES_SAVED", "SCAN_NO_CANDIDATE", "BUY_INTENT", "TRADER_LOOP_ERROR")
+REJECT_KEYS = ("caution", "low_volume", "spread", "candle")
+SCORE_BINS = 10
+SUM_COLS = (
+    ("scans", "no_candidate", "checked", "candidates")
+    + tuple(f"rej_{k}" for k in REJECT_KEYS)
+    + ("buy_intents", "loop_errors", "score_n", "score_sum", "score_sumsq")
+    + tuple(f"score_b{i}" for i in range(SCORE_BINS))
+)
+ROLLUP_BATCH = 5000
+
+# 지금 있는 trader 만 (hard delete 된 trader 의 events 가 watermark 위에 남아 있어도 rollup 을 다시 만들지 않게).
+# INSERT ... SELECT 는 traders 행을 잠그고 읽으므로 hard delete(traders 행을 먼저 잠금)와 순서가 정해진다
+_UPSERT = text(
+    "INSERT INTO trader_rollups (trader_id, grain, bucket_at, score_min, score_max, " + ", ".join(SUM_COLS) + ") "
+    "SELECT :trader_id, :grain, :bucket_at, :score_min, :score_max, " + ", ".join(f":{c}" for c in SUM_COLS) + " "
+    "FROM traders t WHERE t.trader_id=:trader_id "
+    "ON DUPLICATE KEY UPDATE "
+    + ", ".join(f"{c}={c}+VALUES({c})" for c in SUM_COLS)
+    + ", score_min=LEAST(COALESCE(score_min, VALUES(score_min)), COALESCE(VALUES(score_min), score_min))"
+    + ", score_max=GREATEST(COALESCE(score_max, VALUES(score_max)), COALESCE(VALUES(score_max), score_max))"
+)
+_SET_WM = text(
+    "INSERT INTO rollup_watermarks (source, last_id, updated_at) VALUES (:source, :last_id, NOW()) "
+    "ON DUPLICATE KEY UPDATE last_id=VALUES(last_id), updated_at=NOW()"
+)
+
+def _bucket(ts: datetime, grain: str) -> datetime:
+    if grain == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if grain == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class Rollups:
+    def __init__(self):
+        self.buckets: dict[tuple[str, str, datetime], dict] = {}
+
+    def _rows(self, trader_id: str, ts: datetime):
+        for g in GRAINS:
+            key = (trader_id, g, _bucket(ts, g))
+            b = self.buckets.get(key)
+            if b is None:
+                b = self.buckets[key] = dict.fromkeys(SUM_COLS, 0)
+                b["score_min"] = b["score_max"] = None
+            yield b
+
+    def add(self, trader_id: str, ts: datetime, **inc):
+        for b in self._rows(trader_id, ts):
+            for k, v in inc.items():
+                b[k] += v
+
+    def add_event(self, trader_id: str, code: str, ts: datetime, detail: dict):
+        if code == "BUY_INTENT":
+            self.add(trader_id, ts, buy_intents=1)
+        elif code == "TRADER_LOOP_ERROR":
+            self.add(trader_id, ts, loop_errors=1)
+        else:
+            rejected = detail.get("rejected") or {}
+            inc = {f"rej_{k}": int(rejected.get(k) or 0) for k in REJECT_KEYS}
+            inc["scans"] = 1
+            inc["checked"] = int(detail.get("checked") or 0)
+            if code == "SCAN_NO_CANDIDATE":
+                inc["no_candidate"] = 1
+            else:
+                # candidates 가 없는 예전 SCORES_SAVED 는 저장된 top 수로 대신한다
+                inc["candidates"] = int(detail.get("candidates") or len(detail.get("top") or ()))
+            self.add(trader_id, ts, **inc)
+
+    def add_score(self, trader_id: str, ts: datetime, score: float):
+        bin_ = min(SCORE_BINS - 1, max(0, int(score * SCORE_BINS)))
+        for b in self._rows(trader_id, ts):
+            b["score_n"] += 1
+            b["score_sum"] += score
+            b["score_sumsq"] += score * score
+            b[f"score_b{bin_}"] += 1
+            b["score_min"] = score if b["score_min"] is None else min(b["score_min"], score)
+            b["score_max"] = score if b["score_max"] is None else max(b["score_max"], score)
+
+    def params(self) -> list[dict]:
+        return [dict(b, trader_id=tid, grain=g, bucket_at=at) for (tid, g, at), b in self.buckets.items()]
+
+class RollupJob:
+    def __init__(self, interval_sec: float = SETTINGS.ROLLUP_INTERVAL_SEC, lag_sec: int = SETTINGS.ROLLUP_LAG_SEC):
+        self.interval_sec = interval_sec
+        self.lag_sec = lag_sec
+        self.gaps = {"events": IdGapTracker(lag_sec), "scores": IdGapTracker(lag_sec)}
+        self.runs = 0
+        self.rows = 0
+        self.last_run_ms = None
+        self.last_error: str | None = None
+        self._stop = threading.Event()
+        self._th: threading.Thread | None = None
+
+    def _settle(self, source: str, wm: int, rows):
+        # 빠짐없이 이어진 id 까지의 행과 새 watermark
+        last = self.gaps[source].advance(wm, [int(r.id) for r in rows])
+        return [r for r in rows if r.id <= last], last
+
+    def run_once(self) -> int:
+        # 처리한 source 행 수
+        t0 = time.perf_counter()
+        agg = Rollups()
+        with engine.begin() as conn:
+            wm = {r[0]: int(r[1]) for r in conn.execute(text("SELECT source, last_id FROM rollup_watermarks"))}
+
+            # id 가 이어지는지 봐야 하므로 code 로 거르지 않고 모든 행의 id 를 읽는다 (detail 은 집계 대상만)
+            ev_wm = wm.get("events", 0)
+            ev, ev_last = self._settle("events", ev_wm, conn.execute(
+                text(
+                    "SELECT id, trader_id, code, created_at, CASE WHEN code IN ('" + "','".join(ROLLUP_CODES) + "') "
+                    "THEN detail_json END AS detail_json FROM events WHERE id > :wm ORDER BY id LIMIT :n"
+                ),
+                {"wm": ev_wm, "n": ROLLUP_BATCH},
+            ).fetchall())
+            for r in ev:
+                if r.code not in ROLLUP_CODES or r.trader_id is None:
+                    continue
+                try:
+                    detail = json.loads(r.detail_json) if r.detail_json else {}
+                except ValueError:
+                    detail = {}
+                agg.add_event(r.trader_id, r.code, r.created_at, detail)
+
+            sc_wm = wm.get("scores", 0)
+            sc, sc_last = self._settle("scores", sc_wm, conn.execute(
+                text("SELECT id, trader_id, score, created_at FROM scores WHERE id > :wm ORDER BY id LIMIT :n"),
+                {"wm": sc_wm, "n": ROLLUP_BATCH},
+            ).fetchall())
+            for r in sc:
+                agg.add_score(r.trader_id, r.created_at, float(r.score))
+
+            params = agg.params()
+            if params:
+                conn.execute(_UPSERT, params)
+            if ev_last > ev_wm:
+                conn.execute(_SET_WM, {"source": "events", "last_id": ev_last})
+            if sc_last > sc_wm:
+                conn.execute(_SET_WM, {"source": "scores", "last_id": sc_last})
+        n = len(ev) + len(sc)
+        self.runs += 1
+        self.rows += n
+        self.last_run_ms = round((time.perf_counter() - t0) * 1000, 1)
+        return n
+
+    def _loop(self):
+        while not self._stop.is_set():
+            busy = False
+            try:
+                # batch 가 꽉 찼으면 밀린 것 => 쉬지 않고 이어서
+                busy = self.run_once() >= ROLLUP_BATCH
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            if not busy:
+                self._stop.wait(self.interval_sec)
+
+    def start(self):
+        if self._th is None:
+            self._th = threading.Thread(target=self._loop, name="rollup", daemon=True)
+            self._th.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "rows": self.rows,
+            "gap_skipped_ids": {k: g.skipped for k, g in self.gaps.items()},
+            "last_run_ms": self.last_run_ms,
+            "last_error": self.last_error,
+        }
+
+ROLLUP = RollupJob()
@@ -13,7 +13,7 @@ from ..db import get_db
 from ..models import Trader, ConfigVersion, ConfigCurrent
 from ..events import log_event
 from ..settings import SETTINGS
-from ..dockerctl import ensure_trader_container
+from ..dockerctl import apply_trader_container
 
 router = APIRouter()
 
@@ -21,7 +21,9 @@ class ConfigDraftReq(BaseModel):
     config_json: Optional[str] = None
 
 class ConfigApplyReq(BaseModel):
-    apply_mode: Optional[str] = "restart"
+    # hot(기본)/restart/immediate: image 가 같으면 컨테이너 유지, trader 가 loop 안에서 반영
+    # recreate: 항상 컨테이너 재생성
+    apply_mode: Optional[str] = "hot"
     trade_enabled: Optional[int] = None
     confirm_crazy_live: Optional[bool] = False
 
@@ -51,7 +53,7 @@ def _get_latest_version_or_404(db: Session, trader_id: str) -> ConfigVersion:
     return v
 
 def _trader_env(trader_id: str) -> Dict[str, str]:
-    return {
+    env = {
         "TRADER_ID": trader_id,
         "DB_HOST": SETTINGS.DB_HOST,
         "DB_PORT": str(SETTINGS.DB_PORT),
@@ -61,6 +63,10 @@ def _trader_env(trader_id: str) -> Dict[str, str]:
         "TZ": SETTINGS.TZ,
         "KEY_ENC_SECRET": SETTINGS.KEY_ENC_SECRET,
     }
+    if SETTINGS.MARKET_DATA_URL:
+        env["UPBIT_BASE_URL"] = SETTINGS.MARKET_DATA_URL
+        env["UPBIT_RATE_PER_SEC"] = SETTINGS.MARKET_DATA_RATE_PER_SEC
+    return env
 
 @router.get("/config/{trader_id}/current")
 def get_current(trader_id: str, db: Session = Depends(get_db)):
@@ -107,7 +113,7 @@ def apply(trader_id: str, req: ConfigApplyReq, db: Session = Depends(get_db)):
     t = _get_trader_or_404(db, trader_id)
     v = _get_latest_version_or_404(db, trader_id)
 
-    apply_mode = (req.apply_mode or "restart").lower()
+    apply_mode = (req.apply_mode or "hot").lower()
     applied_at = datetime.utcnow()
 
     if (t.mode or "").upper() == "LIVE" and (t.strategy_mode or "").upper() == "CRAZY":
@@ -142,13 +148,12 @@ def apply(trader_id: str, req: ConfigApplyReq, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(500, f"apply failed: {str(e)}")
 
-    recreate = True if apply_mode in ("restart", "immediate") else False
-    ensure_trader_container(trader_id, _trader_env(trader_id), recreate=recreate)
+    path = apply_trader_container(trader_id, _trader_env(trader_id), force_recreate=(apply_mode == "recreate"))
 
-    log_event(db, "INFO", "CONFIG_APPLIED", f"Applied v{int(v.version)} ({apply_mode})", trader_id,
-              {"version": int(v.version), "apply_mode": apply_mode})
+    log_event(db, "INFO", "CONFIG_APPLIED", f"Applied v{int(v.version)} ({apply_mode}, {path})", trader_id,
+              {"version": int(v.version), "apply_mode": apply_mode, "path": path})
 
-    return {"ok": True, "trader_id": trader_id, "version": int(v.version), "apply_mode": apply_mode}
+    return {"ok": True, "trader_id": trader_id, "version": int(v.version), "apply_mode": apply_mode, "path": path}
 
 @router.get("/config/{trader_id}/history")
 def history(trader_id: str, db: Session = Depends(get_db)):
@@ -194,6 +199,7 @@ def rollback(trader_id: str, req: ConfigRollbackReq, db: Session = Depends(get_d
         db.rollback()
         raise HTTPException(500, f"rollback failed: {str(e)}")
 
-    ensure_trader_container(trader_id, _trader_env(trader_id), recreate=True)
-    log_event(db, "WARN", "CONFIG_ROLLBACK", f"Rollback to v{int(target.version)}", trader_id, {"version": int(target.version)})
-    return {"ok": True, "trader_id": trader_id, "version": int(target.version)}
+    path = apply_trader_container(trader_id, _trader_env(trader_id))
+    log_event(db, "WARN", "CONFIG_ROLLBACK", f"Rollback to v{int(target.version)} ({path})", trader_id,
+              {"version": int(target.version), "path": path})
+    return {"ok": True, "trader_id": trader_id, "version": int(target.version), "path": path}
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from ..db import engine
+from ..models import Event, Score, Order, Trade
+
+router = APIRouter()
+
+# 분석용 대량 export. server-side cursor(stream_results) 로 CHUNK_ROWS 씩 읽어서 바로 내보낸다
+#   GET /export/scores?trader_id=t1&since=2025-01-01&until=2025-02-01&format=csv&gzip=true
+# 순서는 (created_at, id) 오름차순 => idx_*_trader_time 을 탄다
+EXPORTS = {"events": Event, "scores": Score, "orders": Order, "trades": Trade}
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CHUNK_ROWS = 5000
+GZIP_LEVEL = 5
+
+def _json_default(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return str(v)
+
+def _partitions(table, trader_id: str, since: datetime | None, until: datetime | None):
+    q = select(table).where(table.c.trader_id == trader_id)
+    if since:
+        q = q.where(table.c.created_at >= since)
+    if until:
+        q = q.where(table.c.created_at < until)
+    q = q.order_by(table.c.created_at, table.c.id)
+    # 응답이 끝날 때까지 connection 을 잡고 있어야 하므로 generator 안에서 연다
+    with engine.connect() as conn:
+        res = conn.execution_options(stream_results=True, yield_per=CHUNK_ROWS).execute(q)
+        yield from res.partitions()
+
+def _ndjson(keys, parts):
+    dumps = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+    for part in parts:
+        yield "".join(dumps(dict(zip(keys, r))) + "\n" for r in part).encode("utf-8")
+
+def _csv(keys, parts):
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(keys)
+    for part in parts:
+        w.writerows(part)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+def _gzip(chunks):
+    z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for c in chunks:
+        out = z.compress(c)
+        if out:
+            yield out
+    yield z.flush()
+
+@router.get("/export/{kind}")
+def export(kind: str, trader_id: str, since: datetime | None = None, until: datetime | None = None,
+           format: str = "ndjson", gzip: bool = False):
+    model = EXPORTS.get(kind)
+    if model is None:
+        raise HTTPException(404, f"unknown export: {kind}")
+    if format not in FORMATS:
+        raise HTTPException(400, f"format must be one of {sorted(FORMATS)}")
+    table = model.__table__
+    keys = [c.name for c in table.columns]
+    body = (_csv if format == "csv" else _ndjson)(keys, _partitions(table, trader_id, since, until))
+    filename = f"{kind}_{trader_id}.{format}"
+    media_type = FORMATS[format]
+    if gzip:
+        body = _gzip(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(body, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
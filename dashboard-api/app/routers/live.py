@@ -0,0 +1,41 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from ..live import HUB, LIVE_KINDS
+
+router = APIRouter()
+
+KEEPALIVE_SEC = 15.0
+
+# Server-Sent Events
+#   const es = new EventSource(API + "/live?trader_id=t1&kinds=events,scores");
+#   es.addEventListener("events", e => JSON.parse(e.data));   // 새 행 list (poll 1회분)
+@router.get("/live")
+async def live(trader_id: str | None = None, kinds: str = "events,scores"):
+    ks = [k for k in kinds.split(",") if k in LIVE_KINDS]
+    if not ks:
+        raise HTTPException(400, f"kinds must be subset of {list(LIVE_KINDS)}")
+    q = HUB.subscribe(trader_id, ks)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    kind, rows = await asyncio.wait_for(q.get(), timeout=KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    # proxy idle timeout 방지
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {kind}\ndata: {json.dumps(rows, ensure_ascii=False)}\n\n"
+        finally:
+            # client 가 끊으면 generator 가 취소된다
+            HUB.unsubscribe(q)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/live/stats")
+def live_stats():
+    return HUB.stats()
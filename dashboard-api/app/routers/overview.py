@@ -2,6 +2,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from ..db import get_db
 from ..models import Trader, Event
+from ..migrate import STATUS as MIGRATIONS
+from ..rollup import ROLLUP
+from ..retention import RETENTION
 
 router = APIRouter()
 
@@ -13,3 +16,8 @@ def overview(db: Session = Depends(get_db)):
         "traders": traders,
         "latest_events": [{"id": e.id, "level": e.level, "code": e.code, "message": e.message, "trader_id": e.trader_id, "created_at": e.created_at.isoformat()} for e in latest]
     }
+
+@router.get("/overview/jobs")
+def overview_jobs():
+    # background job 상태 (rollup / retention) + startup schema migration 결과
+    return {"rollup": ROLLUP.stats(), "retention": RETENTION.stats(), "migrations": MIGRATIONS}
@@ -1,38 +1,118 @@
-from fastapi import APIRouter, Depends
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from ..db import get_db
-from ..models import Order, Trade, Position, Score
+from ..models import Order, Trade, Position, Score, Event
 
 router = APIRouter()
 
-@router.get("/positions")
-def positions(trader_id: str | None = None, db: Session = Depends(get_db)):
-    q = db.query(Position)
+# keyset pagination
+#   trader_id 가 있으면 (created_at DESC, id DESC) 순서 => idx_*_trader_time (trader_id, created_at [, id]) 를 그대로 탄다
+#   없으면 id DESC (PK)
+# 다음 페이지가 있으면 X-Next-Cursor 헤더에 cursor 를 돌려준다 (?cursor= 로 그대로 넘기면 됨)
+# OFFSET 을 쓰지 않으므로 몇 번째 페이지든 비용이 같다
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_cursor(ts: datetime | None, id_: int) -> str:
+    return f"{ts.isoformat()}~{id_}" if ts is not None else str(id_)
+
+def _decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        if "~" in cursor:
+            ts, id_ = cursor.rsplit("~", 1)
+            return datetime.fromisoformat(ts), int(id_)
+        return None, int(cursor)
+    except ValueError:
+        raise HTTPException(400, "invalid cursor")
+
+def _page(db: Session, model, cols, response: Response, *, trader_id=None, symbol=None, since=None, until=None,
+          cursor=None, limit=DEFAULT_LIMIT, ts_col="created_at", time_index=True, where=()):
+    ts = getattr(model, ts_col)
+    conds = list(where)
     if trader_id:
-        q = q.filter(Position.trader_id == trader_id)
-    items = q.order_by(Position.id.desc()).limit(500).all()
-    return [{"id": i.id, "trader_id": i.trader_id, "symbol": i.symbol, "state": i.state, "updated_at": i.updated_at.isoformat()} for i in items]
+        conds.append(model.trader_id == trader_id)
+    if symbol:
+        conds.append(model.symbol == symbol)
+    if since:
+        conds.append(ts >= since)
+    if until:
+        conds.append(ts < until)
+    by_time = bool(trader_id) and time_index
+    if cursor:
+        c_ts, c_id = _decode_cursor(cursor)
+        if by_time and c_ts is not None:
+            # (ts, id) < (c_ts, c_id) 를 range 조건(ts <= c_ts)이 보이게 풀어서 쓴다
+            conds += [ts <= c_ts, or_(ts < c_ts, model.id < c_id)]
+        else:
+            conds.append(model.id < c_id)
+    order = (ts.desc(), model.id.desc()) if by_time else (model.id.desc(),)
+    rows = db.execute(select(*cols).where(*conds).order_by(*order).limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(getattr(last, ts_col) if by_time else None, last.id)
+    return rows
+
+@router.get("/positions")
+def positions(response: Response, trader_id: str | None = None, symbol: str | None = None,
+              since: datetime | None = None, until: datetime | None = None, cursor: str | None = None,
+              limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), db: Session = Depends(get_db)):
+    # positions 는 (trader_id) index 뿐이라 항상 id 순서
+    rows = _page(db, Position, (Position.id, Position.trader_id, Position.symbol, Position.state, Position.updated_at),
+                 response, trader_id=trader_id, symbol=symbol, since=since, until=until, cursor=cursor, limit=limit,
+                 ts_col="updated_at", time_index=False)
+    return [{"id": r.id, "trader_id": r.trader_id, "symbol": r.symbol, "state": r.state, "updated_at": r.updated_at.isoformat()} for r in rows]
 
 @router.get("/orders")
-def orders(trader_id: str | None = None, db: Session = Depends(get_db)):
-    q = db.query(Order)
-    if trader_id:
-        q = q.filter(Order.trader_id == trader_id)
-    items = q.order_by(Order.id.desc()).limit(500).all()
-    return [{"id": i.id, "trader_id": i.trader_id, "symbol": i.symbol, "state": i.state, "created_at": i.created_at.isoformat()} for i in items]
+def orders(response: Response, trader_id: str | None = None, symbol: str | None = None,
+           since: datetime | None = None, until: datetime | None = None, cursor: str | None = None,
+           limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), db: Session = Depends(get_db)):
+    rows = _page(db, Order, (Order.id, Order.trader_id, Order.symbol, Order.state, Order.created_at),
+                 response, trader_id=trader_id, symbol=symbol, since=since, until=until, cursor=cursor, limit=limit)
+    return [{"id": r.id, "trader_id": r.trader_id, "symbol": r.symbol, "state": r.state, "created_at": r.created_at.isoformat()} for r in rows]
 
 @router.get("/trades")
-def trades(trader_id: str | None = None, db: Session = Depends(get_db)):
-    q = db.query(Trade)
-    if trader_id:
-        q = q.filter(Trade.trader_id == trader_id)
-    items = q.order_by(Trade.id.desc()).limit(500).all()
-    return [{"id": i.id, "trader_id": i.trader_id, "symbol": i.symbol, "created_at": i.created_at.isoformat()} for i in items]
+def trades(response: Response, trader_id: str | None = None, symbol: str | None = None,
+           since: datetime | None = None, until: datetime | None = None, cursor: str | None = None,
+           limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), db: Session = Depends(get_db)):
+    rows = _page(db, Trade, (Trade.id, Trade.trader_id, Trade.symbol, Trade.created_at),
+                 response, trader_id=trader_id, symbol=symbol, since=since, until=until, cursor=cursor, limit=limit)
+    return [{"id": r.id, "trader_id": r.trader_id, "symbol": r.symbol, "created_at": r.created_at.isoformat()} for r in rows]
 
 @router.get("/scores")
-def scores(trader_id: str | None = None, db: Session = Depends(get_db)):
-    q = db.query(Score)
-    if trader_id:
-        q = q.filter(Score.trader_id == trader_id)
-    items = q.order_by(Score.id.desc()).limit(500).all()
-    return [{"id": i.id, "trader_id": i.trader_id, "symbol": i.symbol, "score": float(i.score), "created_at": i.created_at.isoformat()} for i in items]
+def scores(response: Response, trader_id: str | None = None, scan_id: str | None = None, symbol: str | None = None,
+           since: datetime | None = None, until: datetime | None = None, cursor: str | None = None,
+           limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), features: bool = False,
+           db: Session = Depends(get_db)):
+    cols = [Score.id, Score.trader_id, Score.symbol, Score.score, Score.scan_id, Score.created_at]
+    if features:
+        cols.append(Score.features_json)
+    # 한 scan 의 순위 전체 (idx_scores_scan)
+    rows = _page(db, Score, cols, response, trader_id=trader_id, symbol=symbol, since=since, until=until,
+                 cursor=cursor, limit=limit, where=(Score.scan_id == scan_id,) if scan_id else ())
+    return [{"id": r.id, "trader_id": r.trader_id, "symbol": r.symbol, "score": float(r.score),
+             "scan_id": r.scan_id, "features": json.loads(r.features_json) if features and r.features_json else None,
+             "created_at": r.created_at.isoformat()} for r in rows]
+
+@router.get("/events")
+def events(response: Response, trader_id: str | None = None, level: str | None = None, code: str | None = None,
+           since: datetime | None = None, until: datetime | None = None, cursor: str | None = None,
+           limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), detail: bool = False,
+           db: Session = Depends(get_db)):
+    cols = [Event.id, Event.trader_id, Event.level, Event.code, Event.message, Event.created_at]
+    if detail:
+        cols.append(Event.detail_json)
+    where = []
+    if level:
+        where.append(Event.level == level)
+    if code:
+        where.append(Event.code == code)
+    rows = _page(db, Event, cols, response, trader_id=trader_id, since=since, until=until, cursor=cursor,
+                 limit=limit, where=where)
+    return [{"id": r.id, "trader_id": r.trader_id, "level": r.level, "code": r.code, "message": r.message,
+             "detail": json.loads(r.detail_json) if detail and r.detail_json else None,
+             "created_at": r.created_at.isoformat()} for r in rows]
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from pydantic import BaseModel
 from datetime import datetime
 import json
@@ -10,6 +10,7 @@ from ..models import Trader, ConfigVersion
 from ..events import log_event
 from ..dockerctl import stop_remove_trader_container_if_exists
 from ..settings import SETTINGS
+from ..rollup import GRAINS, REJECT_KEYS, ROLLUP, SCORE_BINS
 
 router = APIRouter()
 
@@ -37,6 +38,78 @@ def list_traders(db: Session = Depends(get_db)):
         "heartbeat_at": t.heartbeat_at.isoformat() if t.heartbeat_at else None,
     } for t in items]
 
+@router.get("/traders/compare")
+def compare_traders(grain: str = "hour", since: datetime | None = None, until: datetime | None = None,
+                    trader_ids: str | None = None, series: bool = False, db: Session = Depends(get_db)):
+    # trader_rollups 만 읽는다 (raw events/scores 는 보지 않음). since 기본값 = 최근 7일
+    if grain not in GRAINS:
+        raise HTTPException(400, f"grain must be one of {list(GRAINS)}")
+    tids = [t for t in (trader_ids or "").split(",") if t]
+    where = "grain=:grain AND bucket_at >= COALESCE(:since, NOW() - INTERVAL 7 DAY)"
+    if until:
+        where += " AND bucket_at < :until"
+    if tids:
+        where += " AND trader_id IN :tids"
+    bins = [f"score_b{i}" for i in range(SCORE_BINS)]
+    sums = ["scans", "no_candidate", "checked", "candidates", *[f"rej_{k}" for k in REJECT_KEYS],
+            "buy_intents", "loop_errors", "score_n", "score_sum", "score_sumsq", *bins]
+    params = {"grain": grain, "since": since, "until": until}
+    if tids:
+        params["tids"] = tids
+
+    def q(sql: str):
+        stmt = text(sql)
+        if tids:
+            stmt = stmt.bindparams(bindparam("tids", expanding=True))
+        return db.execute(stmt, params).mappings().all()
+
+    totals = q(
+        "SELECT trader_id, " + ", ".join(f"SUM({c}) AS {c}" for c in sums)
+        + ", MIN(score_min) AS score_min, MAX(score_max) AS score_max, MIN(bucket_at) AS first_at, MAX(bucket_at) AS last_at "
+        f"FROM trader_rollups WHERE {where} GROUP BY trader_id ORDER BY trader_id"
+    )
+    out = {}
+    for r in totals:
+        n = int(r["score_n"] or 0)
+        mean = float(r["score_sum"]) / n if n else None
+        var = max(0.0, float(r["score_sumsq"]) / n - mean * mean) if n else None
+        out[r["trader_id"]] = {
+            "scans": int(r["scans"]),
+            "no_candidate": int(r["no_candidate"]),
+            "checked": int(r["checked"]),
+            "candidates": int(r["candidates"]),
+            "candidate_rate": int(r["candidates"]) / int(r["checked"]) if r["checked"] else None,
+            "rejected": {k: int(r[f"rej_{k}"]) for k in REJECT_KEYS},
+            "buy_intents": int(r["buy_intents"]),
+            "loop_errors": int(r["loop_errors"]),
+            "scores": {
+                "n": n,
+                "mean": mean,
+                "std": var ** 0.5 if var is not None else None,
+                "min": r["score_min"],
+                "max": r["score_max"],
+                "hist": [int(r[b]) for b in bins],
+            },
+            "first_at": r["first_at"].isoformat() if r["first_at"] else None,
+            "last_at": r["last_at"].isoformat() if r["last_at"] else None,
+        }
+    if series:
+        rows = q(
+            "SELECT trader_id, bucket_at, scans, no_candidate, candidates, buy_intents, loop_errors, score_n, score_sum "
+            f"FROM trader_rollups WHERE {where} ORDER BY trader_id, bucket_at"
+        )
+        for r in rows:
+            out[r["trader_id"]].setdefault("series", []).append({
+                "at": r["bucket_at"].isoformat(),
+                "scans": int(r["scans"]),
+                "no_candidate": int(r["no_candidate"]),
+                "candidates": int(r["candidates"]),
+                "buy_intents": int(r["buy_intents"]),
+                "loop_errors": int(r["loop_errors"]),
+                "score_mean": float(r["score_sum"]) / int(r["score_n"]) if r["score_n"] else None,
+            })
+    return {"grain": grain, "traders": out, "rollup": ROLLUP.stats()}
+
 @router.post("/traders")
 def add_trader(req: TraderCreateReq, db: Session = Depends(get_db)):
     exists = db.query(Trader).filter(Trader.trader_id == req.trader_id).first()
@@ -90,12 +163,15 @@ def delete_trader(trader_id: str, hard: bool = Query(False), db: Session = Depen
         return {"ok": True, "mode": "deactivate", "container_existed": container_existed}
 
     try:
+        # traders 행을 먼저 잠근다 => rollup job 의 upsert(traders 를 잠그고 읽음)와 deadlock 없이 순서가 정해진다
+        db.execute(text("SELECT trader_id FROM traders WHERE trader_id=:tid FOR UPDATE"), {"tid": trader_id})
         db.execute(text("DELETE FROM config_current  WHERE trader_id=:tid"), {"tid": trader_id})
         db.execute(text("DELETE FROM config_versions WHERE trader_id=:tid"), {"tid": trader_id})
         db.execute(text("DELETE FROM positions WHERE trader_id=:tid"), {"tid": trader_id})
         db.execute(text("DELETE FROM orders    WHERE trader_id=:tid"), {"tid": trader_id})
         db.execute(text("DELETE FROM trades    WHERE trader_id=:tid"), {"tid": trader_id})
         db.execute(text("DELETE FROM scores    WHERE trader_id=:tid"), {"tid": trader_id})
+        db.execute(text("DELETE FROM trader_rollups WHERE trader_id=:tid"), {"tid": trader_id})
         db.delete(t)
         db.commit()
     except Exception as e:
@@ -14,4 +14,31 @@ class Settings:
 
     KEY_ENC_SECRET = os.getenv("KEY_ENC_SECRET","dev-only-secret-change-me")
 
+    # 공유 시세 캐시(market-data). 비우면 trader 가 Upbit 에 직접 요청한다.
+    MARKET_DATA_URL = os.getenv("MARKET_DATA_URL","")
+    # market-data 를 거칠 때 trader 쪽 rate limit (upstream 제한은 market-data 가 지킨다)
+    MARKET_DATA_RATE_PER_SEC = os.getenv("MARKET_DATA_RATE_PER_SEC","100")
+
+    # /live (SSE): 구독자가 있을 때만 이 주기로 events/scores 를 한 번씩 읽어서 모든 구독자에게 나눠준다
+    LIVE_POLL_SEC = float(os.getenv("LIVE_POLL_SEC","1.0"))
+    # 중간 id 가 이 시간 동안 안 보이면 (rollback 등) 기다리지 않고 넘어간다
+    LIVE_GAP_SEC = float(os.getenv("LIVE_GAP_SEC","10"))
+
+    # trader_rollups 집계 주기 / watermark 다음 id 가 비어 있으면 (아직 commit 중) 이 시간까지 기다렸다가 건너뛴다
+    ROLLUP_INTERVAL_SEC = float(os.getenv("ROLLUP_INTERVAL_SEC","10"))
+    ROLLUP_LAG_SEC = int(os.getenv("ROLLUP_LAG_SEC","10"))
+
+    # events/scores retention (db/init/004_partitioning.sql 의 일별 partition 을 DROP)
+    RETENTION_INTERVAL_SEC = float(os.getenv("RETENTION_INTERVAL_SEC","3600"))
+    RETENTION_EVENTS_DAYS = int(os.getenv("RETENTION_EVENTS_DAYS","30"))
+    RETENTION_SCORES_DAYS = int(os.getenv("RETENTION_SCORES_DAYS","14"))
+    # 앞으로 쓸 partition 을 며칠치 미리 만들어 둘지
+    RETENTION_PREMAKE_DAYS = int(os.getenv("RETENTION_PREMAKE_DAYS","3"))
+    # rollup 이 아직 못 본(commit 전) 행을 위해 DROP/compaction 기준 시각을 이만큼 앞당긴다
+    RETENTION_GATE_MARGIN_SEC = int(os.getenv("RETENTION_GATE_MARGIN_SEC","3600"))
+    # events.detail_json 보관 일수 (level 또는 code => 일수, code 가 level 보다 우선, *=나머지). 지나면 NULL 로 비운다
+    EVENT_DETAIL_TTL = os.getenv("EVENT_DETAIL_TTL","DEBUG=1,BUY_EVAL=1,SCORES_SAVED=7")
+    # 비우지 않으면 DROP/compaction 전에 {dir}/{table}/... .ndjson.gz 로 남긴다
+    RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR","")
+
 SETTINGS = Settings()
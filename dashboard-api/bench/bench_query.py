@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+# /scores keyset pagination vs OFFSET (MariaDB 필요)
+#   cd dashboard-api && python -m bench.bench_query --rows 10000000 --pages 1 10 100 1000
+# --seed 가 있으면 scores 에 bench trader 행을 rows 개까지 채운다 (INSERT ... SELECT 로 2배씩)
+
+import argparse
+import json
+import time
+
+from fastapi import Response
+from sqlalchemy import text
+
+from app.db import SessionLocal, engine
+from app.routers.query import scores
+
+
+def _seed(trader_id: str, rows: int):
+    with engine.begin() as conn:
+        n = conn.execute(text("SELECT COUNT(*) FROM scores WHERE trader_id=:tid"), {"tid": trader_id}).scalar()
+        if n == 0:
+            conn.execute(
+                text(
+                    "INSERT INTO scores (trader_id, symbol, score, scan_id, created_at) "
+                    "VALUES (:tid, 'KRW-BTC', 0.5, NULL, NOW() - INTERVAL 365 DAY)"
+                ),
+                {"tid": trader_id},
+            )
+            n = 1
+        while n < rows:
+            k = min(n, rows - n)
+            # 기존 행을 복사하면서 created_at 을 1초씩 뒤로 => (trader_id, created_at) 이 고르게 퍼진다
+            conn.execute(
+                text(
+                    "INSERT INTO scores (trader_id, symbol, score, scan_id, created_at) "
+                    "SELECT trader_id, IF(id % 7 = 0, 'KRW-ETH', symbol), RAND(), scan_id, "
+                    "created_at + INTERVAL :n SECOND FROM scores WHERE trader_id=:tid ORDER BY id LIMIT :k"
+                ),
+                {"tid": trader_id, "n": n, "k": k},
+            )
+            n += k
+            print(f"[seed] {n} rows")
+
+
+def _timed(fn, repeat: int):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trader-id", default="bench-query")
+    ap.add_argument("--rows", type=int, default=10_000_000)
+    ap.add_argument("--seed", action="store_true")
+    ap.add_argument("--limit", type=int, default=500)
+    ap.add_argument("--pages", type=int, nargs="*", default=[1, 10, 100, 1000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default="bench_query.json")
+    args = ap.parse_args()
+
+    if args.seed:
+        _seed(args.trader_id, args.rows)
+
+    db = SessionLocal()
+    results = []
+    try:
+        # keyset: 목표 페이지까지 cursor 를 따라간 뒤 그 페이지 하나만 측정
+        cursor = None
+        page = 1
+        for target in sorted(args.pages):
+            while page < target:
+                r = Response()
+                scores(r, trader_id=args.trader_id, scan_id=None, symbol=None, since=None, until=None,
+                       cursor=cursor, limit=args.limit, features=False, db=db)
+                cursor = r.headers.get("X-Next-Cursor")
+                page += 1
+                if cursor is None:
+                    break
+            if cursor is None and target > 1:
+                print(f"[bench] only {page - 1} pages")
+                break
+            keyset_ms, _ = _timed(
+                lambda: scores(Response(), trader_id=args.trader_id, scan_id=None, symbol=None, since=None,
+                               until=None, cursor=cursor, limit=args.limit, features=False, db=db),
+                args.repeat,
+            )
+            offset_ms, _ = _timed(
+                lambda: db.execute(
+                    text(
+                        "SELECT id, trader_id, symbol, score, scan_id, created_at FROM scores WHERE trader_id=:tid "
+                        "ORDER BY created_at DESC, id DESC LIMIT :lim OFFSET :off"
+                    ),
+                    {"tid": args.trader_id, "lim": args.limit, "off": (target - 1) * args.limit},
+                ).all(),
+                args.repeat,
+            )
+            results.append({"page": target, "keyset_ms": round(keyset_ms, 2), "offset_ms": round(offset_ms, 2)})
+            print(f"page {target:>6}: keyset {keyset_ms:8.2f} ms   offset {offset_ms:8.2f} ms")
+    finally:
+        db.close()
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"rows": args.rows, "limit": args.limit, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
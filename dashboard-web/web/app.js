@@ -21,6 +21,16 @@ async function apiDelete(path){
   if(!r.ok) throw new Error(txt);
   return txt ? JSON.parse(txt) : {};
 }
+// /live (SSE). handlers = {events: rows => ..., scores: rows => ...}
+function apiLive(params, handlers){
+  const q = new URLSearchParams(params || {});
+  q.set("kinds", Object.keys(handlers).join(","));
+  const es = new EventSource(API + "/live?" + q.toString());
+  for(const [kind, fn] of Object.entries(handlers)){
+    es.addEventListener(kind, e => fn(JSON.parse(e.data)));
+  }
+  return es;
+}
 function qs(k){
   return new URLSearchParams(location.search).get(k);
 }
@@ -49,7 +49,7 @@ CREATE TABLE IF NOT EXISTS events (
   code VARCHAR(64) NOT NULL,
   message TEXT NOT NULL,
   detail_json LONGTEXT NULL,
-  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, -- DB 시각. trader 의 EventSink 는 flush 때 INSERT 하므로 발생보다 몇 초 늦을 수 있다
   KEY idx_events_trader_time (trader_id, created_at)
 );
 
@@ -85,6 +85,9 @@ CREATE TABLE IF NOT EXISTS scores (
   trader_id VARCHAR(64) NOT NULL,
   symbol VARCHAR(32) NOT NULL,
   score DOUBLE NOT NULL,
+  scan_id VARCHAR(32) NULL,
+  features_json LONGTEXT NULL,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  KEY idx_scores_trader_time (trader_id, created_at)
+  KEY idx_scores_trader_time (trader_id, created_at),
+  KEY idx_scores_scan (scan_id)
 );
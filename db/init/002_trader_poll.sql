@@ -0,0 +1,14 @@
+-- trader loop 1회 = heartbeat 기록 + flags + config version 을 한 번의 round-trip 으로
+-- (config_json 은 version 이 바뀔 때만 trader 가 따로 읽는다)
+DROP PROCEDURE IF EXISTS trader_poll;
+
+DELIMITER //
+CREATE PROCEDURE trader_poll(IN p_trader_id VARCHAR(64))
+BEGIN
+  UPDATE traders SET heartbeat_at=NOW() WHERE trader_id=p_trader_id;
+  SELECT t.mode, t.strategy_mode, t.is_paused, t.trade_enabled, c.version
+    FROM traders t
+    LEFT JOIN config_current c ON c.trader_id=t.trader_id
+   WHERE t.trader_id=p_trader_id;
+END //
+DELIMITER ;
@@ -0,0 +1,37 @@
+-- trader 별 성과 rollup (dashboard-api 의 rollup job 이 events/scores 를 id watermark 부터 이어서 집계)
+-- grain: 'minute' | 'hour' | 'day', bucket_at: 구간 시작 시각
+CREATE TABLE IF NOT EXISTS trader_rollups (
+  trader_id VARCHAR(64) NOT NULL,
+  grain VARCHAR(8) NOT NULL,
+  bucket_at DATETIME NOT NULL,
+  scans INT NOT NULL DEFAULT 0,
+  no_candidate INT NOT NULL DEFAULT 0,
+  checked BIGINT NOT NULL DEFAULT 0,
+  candidates BIGINT NOT NULL DEFAULT 0,
+  rej_caution BIGINT NOT NULL DEFAULT 0,
+  rej_low_volume BIGINT NOT NULL DEFAULT 0,
+  rej_spread BIGINT NOT NULL DEFAULT 0,
+  rej_candle BIGINT NOT NULL DEFAULT 0,
+  buy_intents INT NOT NULL DEFAULT 0,
+  loop_errors INT NOT NULL DEFAULT 0,
+  score_n BIGINT NOT NULL DEFAULT 0,
+  score_sum DOUBLE NOT NULL DEFAULT 0,
+  score_sumsq DOUBLE NOT NULL DEFAULT 0,
+  score_min DOUBLE NULL,
+  score_max DOUBLE NULL,
+  -- score 분포: [0,0.1) ... [0.9,1.0] 10 구간
+  score_b0 INT NOT NULL DEFAULT 0, score_b1 INT NOT NULL DEFAULT 0, score_b2 INT NOT NULL DEFAULT 0,
+  score_b3 INT NOT NULL DEFAULT 0, score_b4 INT NOT NULL DEFAULT 0, score_b5 INT NOT NULL DEFAULT 0,
+  score_b6 INT NOT NULL DEFAULT 0, score_b7 INT NOT NULL DEFAULT 0, score_b8 INT NOT NULL DEFAULT 0,
+  score_b9 INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (trader_id, grain, bucket_at),
+  KEY idx_rollups_grain_time (grain, bucket_at)
+);
+
+-- source table('events'/'scores') 별 마지막으로 집계한 id
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+  source VARCHAR(32) NOT NULL,
+  last_id BIGINT NOT NULL DEFAULT 0,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (source)
+);
@@ -0,0 +1,14 @@
+-- events / scores 를 created_at 일 단위 RANGE partition 으로 (retention job 이 오래된 partition 을 DROP)
+-- partition key 가 모든 unique key 에 들어가야 하므로 PK 를 (id, created_at) 로 바꾼다.
+-- 여기서는 p0 / pmax 만 만들고, 일별 partition 은 dashboard-api retention job 이 pmax 를 쪼개서 미리 만든다.
+ALTER TABLE events DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at);
+ALTER TABLE events PARTITION BY RANGE COLUMNS(created_at) (
+  PARTITION p0 VALUES LESS THAN ('2000-01-01'),
+  PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+ALTER TABLE scores DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at);
+ALTER TABLE scores PARTITION BY RANGE COLUMNS(created_at) (
+  PARTITION p0 VALUES LESS THAN ('2000-01-01'),
+  PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
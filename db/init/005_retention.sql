@@ -0,0 +1,8 @@
+-- retention job 의 detail compaction cursor: TTL rule 별로 detail_json 을 어디까지 비웠는지 (created_at 기준)
+-- rule_key = "compact:<조건 crc>:<code|level|*>" (TTL 설정이 바뀌면 새 rule => 처음부터)
+CREATE TABLE IF NOT EXISTS retention_cursors (
+  rule_key VARCHAR(96) NOT NULL,
+  compacted_until DATETIME NOT NULL,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (rule_key)
+);
@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+# preset + buy plugin backtest (candle_archive 의 분봉 사용)
+#   cd trader && python backtest.py --preset STANDARD --start 2025-01-01 --end 2026-01-01 --workers 8 --out bt.json
+#
+# 1) precompute: market 별로 process 를 나눠 지표를 계산하고 (T x M) memmap panel 에 쓴다.
+#    지표는 live 의 scanner.feature_engine 과 같은 방식으로 계산한다.
+#      window/batch (기본): 봉마다 직전 60봉 window 로 처음부터 (build_features_batch 로 window 들을 한 번에)
+#      stream: 이어진 series 를 IncrementalFeatures 로
+#    같은 timeframe/구간이면 panel 디렉터리를 재사용한다 (sweep 등).
+# 2) simulate: 봉 마감마다 scan_and_score 와 같은 필터 -> scoring -> top_n 후보 전체 buy plugin 평가,
+#    다음 봉 시가에 진입하고 sell 섹션(tp/sl/trailing/max_hold)으로 청산한다.
+# live 와 다른 점: 호가 이력이 없어 spread 필터는 건너뛰고, 24h 거래대금은 분봉 거래대금 합으로 근사한다.
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from candle_archive import ARCHIVE_DIR, CandleArchive, _to_epoch
+from indicators.batch import build_features_batch
+from indicators.stream import IncrementalFeatures
+from presets.loader import load_preset, deep_merge
+from scoring import compute_batch, top_k
+from strategies.registry import eval_buy, first_buy
+
+PANEL_FIELDS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "acc_trade_price_24h",
+    "ema20",
+    "ema50",
+    "rsi14",
+    "atr14",
+    "prev_high",
+    "prev_close",
+    "breakout_pct",
+    "bars",
+)
+# scan_and_score 의 feature 이름 (panel 필드 중 market_state 로 넘기는 것)
+STATE_FIELDS = (
+    "acc_trade_price_24h",
+    "ema20",
+    "ema50",
+    "rsi14",
+    "atr14",
+    "prev_high",
+    "prev_close",
+    "breakout_pct",
+)
+WARMUP_BARS = 200
+# live scan 이 받는 분봉 수 (trader._fetch_candles 의 count)
+WINDOW_BARS = 60
+WINDOW_CHUNK = 20_000
+MIN_BARS = 30
+KST = 9 * 3600
+
+
+def _unit_from_timeframe(tf: str) -> int:
+    return int(tf[:-1]) if tf and tf.endswith("m") else 3
+
+
+# ---- precompute ------------------------------------------------------------
+
+
+def _resample(ts: np.ndarray, cols: Dict[str, np.ndarray], step: int) -> tuple[np.ndarray, Dict[str, np.ndarray]]:
+    # 1분봉(체결 있는 봉만) -> step 초 봉
+    if len(ts) == 0:
+        return ts, cols
+    g = ts - ts % step
+    starts = np.flatnonzero(np.concatenate(([True], g[1:] != g[:-1])))
+    ends = np.concatenate((starts[1:], [len(ts)])) - 1
+    return g[starts], {
+        "open": cols["open"][starts],
+        "high": np.maximum.reduceat(cols["high"], starts),
+        "low": np.minimum.reduceat(cols["low"], starts),
+        "close": cols["close"][ends],
+        "value": np.add.reduceat(cols["value"], starts),
+    }
+
+
+def _stream_indicators(ts, h, l, c) -> np.ndarray:
+    ind = np.full((4, len(ts)), np.nan)
+    fe = IncrementalFeatures()
+    for i in range(len(ts)):
+        fe.update(int(ts[i]), float(h[i]), float(l[i]), float(c[i]))
+        s = fe.snapshot()
+        ind[0, i] = np.nan if s.ema20 is None else s.ema20
+        ind[1, i] = np.nan if s.ema50 is None else s.ema50
+        ind[2, i] = np.nan if s.rsi14 is None else s.rsi14
+        ind[3, i] = np.nan if s.atr14 is None else s.atr14
+    return ind
+
+
+def _window_indicators(h, l, c) -> np.ndarray:
+    # 봉 i 의 값 = 봉 [i-59, i] window 만으로 계산 (앞쪽은 있는 만큼). window 하나가 batch 의 row 하나
+    n = len(c)
+    ind = np.full((4, n), np.nan)
+    pad = np.full(WINDOW_BARS - 1, np.nan)
+    views = [np.lib.stride_tricks.sliding_window_view(np.concatenate((pad, x)), WINDOW_BARS) for x in (h, l, c)]
+    lengths = np.minimum(np.arange(1, n + 1), WINDOW_BARS)
+    for a in range(0, n, WINDOW_CHUNK):
+        b = min(n, a + WINDOW_CHUNK)
+        f = build_features_batch(views[0][a:b], views[1][a:b], views[2][a:b], lengths=lengths[a:b])
+        for j, k in enumerate(("ema20", "ema50", "rsi14", "atr14")):
+            ind[j, a:b] = f[k]
+    return ind
+
+
+def _market_panel(job: dict) -> int:
+    # 한 market 을 계산해서 panel 의 column 하나를 채운다 (worker process)
+    step = job["unit"] * 60
+    arc = CandleArchive(job["archive_root"], job["archive_unit"])
+    t0, t_count = job["t0"], job["t_count"]
+    src_start = t0 - WARMUP_BARS * step - 86400
+    raw = arc.read(job["market"], src_start, t0 + t_count * step, fields=("open", "high", "low", "close", "value"))
+    ts, bars = raw["ts"], raw
+    if job["archive_unit"] * 60 != step:
+        ts, bars = _resample(ts, raw, step)
+    if len(ts) == 0:
+        return 0
+
+    h, l, c = bars["high"], bars["low"], bars["close"]
+    n = len(ts)
+    if job.get("feature_engine") == "stream":
+        ind = _stream_indicators(ts, h, l, c)
+    else:
+        ind = _window_indicators(h, l, c)
+
+    # 직전 19봉 고가 (live 60봉 window 의 max(highs[-20:-1]))
+    prev_high = np.full(n, np.nan)
+    if n > 1:
+        prev_high[1:] = np.maximum.accumulate(h)[:-1]
+    if n > 20:
+        win = np.lib.stride_tricks.sliding_window_view(h[:-1], 19)
+        prev_high[20:] = win[1:].max(axis=1)
+    prev_close = np.concatenate(([np.nan], c[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakout = np.where(prev_high > 0, (c - prev_high) / prev_high * 100, 0.0)
+
+    # 24h 거래대금: 마감 시각 기준 직전 24시간 봉 거래대금 합
+    cum = np.concatenate(([0.0], np.cumsum(np.nan_to_num(bars["value"]))))
+    lo = np.searchsorted(ts, ts + step - 86400, side="left")
+    vol24 = cum[1:] - cum[lo]
+
+    sel = (ts >= t0) & (ts < t0 + t_count * step)
+    rows = ((ts[sel] - t0) // step).astype(np.int64)
+    values = {
+        "open": bars["open"],
+        "high": h,
+        "low": l,
+        "close": c,
+        "acc_trade_price_24h": vol24,
+        "ema20": ind[0],
+        "ema50": ind[1],
+        "rsi14": ind[2],
+        "atr14": ind[3],
+        "prev_high": prev_high,
+        "prev_close": prev_close,
+        "breakout_pct": breakout,
+        "bars": np.arange(1, n + 1, dtype=np.float64),
+    }
+    col = job["col"]
+    for f in PANEL_FIELDS:
+        arr = np.load(os.path.join(job["panel_dir"], f"{f}.npy"), mmap_mode="r+")
+        arr[rows, col] = values[f][sel]
+        arr.flush()
+        del arr
+    return int(sel.sum())
+
+
+class FeaturePanel:
+    # (T x M) 지표 배열. 봉 마감 시각 t0 + i*step, 체결이 없던 봉은 NaN
+    def __init__(self, panel_dir: str):
+        with open(os.path.join(panel_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.dir = panel_dir
+        self.markets: List[str] = self.meta["markets"]
+        self.unit = int(self.meta["unit"])
+        self.t0 = int(self.meta["t0"])
+        self.t_count = int(self.meta["t_count"])
+        self.step = self.unit * 60
+        self.arrays = {f: np.load(os.path.join(panel_dir, f"{f}.npy"), mmap_mode="r") for f in PANEL_FIELDS}
+
+    def ts(self, i: int) -> int:
+        return self.t0 + i * self.step
+
+    @classmethod
+    def build(
+        cls,
+        panel_dir: str,
+        markets: List[str],
+        unit: int,
+        start,
+        end,
+        archive_root: str = ARCHIVE_DIR,
+        archive_unit: int = 1,
+        workers: int | None = None,
+        feature_engine: str = "window",
+    ) -> "FeaturePanel":
+        step = unit * 60
+        t0 = _to_epoch(start)
+        t0 -= t0 % step
+        t_count = (_to_epoch(end) - t0) // step
+        meta = {
+            "markets": list(markets),
+            "unit": unit,
+            "t0": t0,
+            "t_count": int(t_count),
+            "archive_root": os.path.abspath(archive_root),
+            "archive_unit": archive_unit,
+            "feature_engine": "stream" if feature_engine == "stream" else "window",
+        }
+        meta_path = os.path.join(panel_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                old = json.load(f)
+            if old.get("complete") and all(old.get(k) == v for k, v in meta.items()):
+                return cls(panel_dir)
+        os.makedirs(panel_dir, exist_ok=True)
+        for f in PANEL_FIELDS:
+            arr = np.lib.format.open_memmap(
+                os.path.join(panel_dir, f"{f}.npy"), mode="w+", dtype=np.float64, shape=(int(t_count), len(markets))
+            )
+            arr[:] = np.nan
+            arr.flush()
+            del arr
+        jobs = [
+            {
+                "market": mk,
+                "col": i,
+                "unit": unit,
+                "t0": t0,
+                "t_count": int(t_count),
+                "panel_dir": panel_dir,
+                "archive_root": archive_root,
+                "archive_unit": archive_unit,
+                "feature_engine": meta["feature_engine"],
+            }
+            for i, mk in enumerate(markets)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            meta["bars"] = dict(zip(markets, pool.map(_market_panel, jobs)))
+        meta["complete"] = True
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return cls(panel_dir)
+
+
+# ---- simulate --------------------------------------------------------------
+
+
+def _nan_none(v: float):
+    return None if v != v else v
+
+
+def simulate(
+    panel: FeaturePanel,
+    cfg: dict,
+    capital: float = 1_000_000.0,
+    fee_bp: float = 5.0,
+    slippage_bp: float = 0.0,
+    eval_top: int | None = None,
+) -> dict:
+    sc, risk, sell = cfg["scanner"], cfg.get("risk", {}), cfg.get("sell", {})
+    top_n = int(sc["top_n"])
+    min_vol = float(sc["min_krw_volume_24h"])
+    max_positions = int(sc.get("max_positions", 3))
+    model = cfg.get("scoring", {}).get("model", "SCORE_A")
+    buy_plugins = cfg.get("plugins", {}).get("buy", [])
+    sell_plugins = cfg.get("plugins", {}).get("sell") or ["fixed_tp_sl", "trailing_stop"]
+    use_tp_sl = "fixed_tp_sl" in sell_plugins
+    use_trailing = "trailing_stop" in sell_plugins
+    tp = float(sell.get("tp_pct", 0.0)) / 100
+    sl = float(sell.get("sl_pct", 0.0)) / 100
+    trail = float(sell.get("trailing_pct", 0.0)) / 100
+    max_hold_bars = int(sell.get("max_hold_minutes", 0)) // panel.unit
+    per_trade = float(risk.get("per_trade_krw", 50_000))
+    daily_limit = capital * float(risk.get("daily_loss_limit_pct", 100.0)) / 100
+    max_losses = int(risk.get("max_consecutive_losses", 0)) or None
+    fee = fee_bp / 10_000
+    slip = slippage_bp / 10_000
+
+    A = panel.arrays
+    markets = panel.markets
+    cash = capital
+    positions: Dict[int, dict] = {}
+    trades: List[dict] = []
+    equity = np.empty(panel.t_count)
+    pending: Optional[tuple] = None
+    day, day_pnl, losses = None, 0.0, 0
+    evals = 0
+
+    def close_pos(j: int, t: int, price: float, reason: str):
+        nonlocal cash, day_pnl, losses
+        p = positions.pop(j)
+        px = price * (1 - slip)
+        proceeds = p["qty"] * px * (1 - fee)
+        cash += proceeds
+        pnl = proceeds - p["cost"]
+        day_pnl += pnl
+        losses = losses + 1 if pnl < 0 else 0
+        trades.append({
+            "market": markets[j],
+            "plugin": p["plugin"],
+            "reason": p["reason"],
+            "entry_ts": panel.ts(p["t"]),
+            "entry_price": p["price"],
+            "exit_ts": panel.ts(t),
+            "exit_price": px,
+            "exit_reason": reason,
+            "bars_held": t - p["t"],
+            "pnl_krw": pnl,
+            "pnl_pct": pnl / p["cost"] * 100,
+        })
+
+    for t in range(panel.t_count):
+        ts = panel.ts(t)
+        d = (ts + KST) // 86400
+        if d != day:
+            day, day_pnl, losses = d, 0.0, 0
+        o, h, l, c = A["open"][t], A["high"][t], A["low"][t], A["close"][t]
+
+        # 직전 봉에서 고른 진입 => 이번 봉 시가
+        if pending is not None:
+            j, plugin, reason = pending
+            pending = None
+            if o[j] == o[j] and j not in positions and cash >= per_trade:
+                px = float(o[j]) * (1 + slip)
+                positions[j] = {"t": t, "price": px, "qty": per_trade * (1 - fee) / px, "cost": per_trade,
+                                "peak": px, "plugin": plugin, "reason": reason}
+                cash -= per_trade
+
+        # 청산 (같은 봉에서 sl/tp 가 모두 닿으면 sl 우선)
+        for j in list(positions):
+            p = positions[j]
+            if h[j] != h[j]:
+                continue
+            entry = p["price"]
+            if use_tp_sl and sl > 0 and l[j] <= entry * (1 - sl):
+                close_pos(j, t, entry * (1 - sl), "sl")
+                continue
+            if use_tp_sl and tp > 0 and h[j] >= entry * (1 + tp):
+                close_pos(j, t, entry * (1 + tp), "tp")
+                continue
+            p["peak"] = max(p["peak"], float(h[j]))
+            # trailing 은 고점이 진입가 + trailing 폭 이상일 때부터
+            if use_trailing and trail > 0 and p["peak"] >= entry * (1 + trail) and c[j] <= p["peak"] * (1 - trail):
+                close_pos(j, t, float(c[j]), "trailing")
+                continue
+            if max_hold_bars and t - p["t"] >= max_hold_bars:
+                close_pos(j, t, float(c[j]), "max_hold")
+
+        equity[t] = cash + sum(p["qty"] * float(c[j]) for j, p in positions.items() if c[j] == c[j]) + sum(
+            p["cost"] for j, p in positions.items() if c[j] != c[j]
+        )
+
+        # 진입 후보 (scan_and_score 필터 -> score -> top_n -> buy plugin batch 평가)
+        if (
+            not buy_plugins
+            or len(positions) >= max_positions
+            or cash < per_trade
+            or day_pnl <= -daily_limit
+            or (max_losses and losses >= max_losses)
+            or t + 1 >= panel.t_count
+        ):
+            continue
+        vol = A["acc_trade_price_24h"][t]
+        ok = (vol >= min_vol) & (A["bars"][t] >= MIN_BARS) & (c == c)
+        idx = np.flatnonzero(ok)
+        if len(idx) == 0:
+            continue
+        idx = np.array([j for j in idx if j not in positions], dtype=np.int64)
+        if len(idx) == 0:
+            continue
+        feats = {f: A[f][t, idx] for f in STATE_FIELDS}
+        feats["last"] = c[idx]
+        scores = compute_batch(model, feats)
+        order = top_k(scores, top_n if eval_top is None else min(top_n, eval_top))
+        cand = {f: v[order] for f, v in feats.items()}
+        cand["score"] = scores[order]
+        hit = first_buy(buy_plugins, cand, cfg)
+        evals += len(order) * len(buy_plugins)
+        if hit is not None:
+            k, plug = hit
+            j = int(idx[order[k]])
+            st = {"symbol": markets[j], "spread_bp": 0.0}
+            for f, v in cand.items():
+                st[f] = _nan_none(float(v[k]))
+            # 진입 사유 (evidence) 는 고른 하나만
+            pending = (j, plug, eval_buy(plug, st, cfg).reason)
+
+    last = panel.t_count - 1
+    for j in list(positions):
+        price = A["close"][last][j]
+        close_pos(j, last, float(price) if price == price else positions[j]["price"], "end")
+    if panel.t_count:
+        equity[last] = cash
+
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    dd = (equity - peak) / peak * 100 if len(equity) else equity
+    wins = [x for x in trades if x["pnl_krw"] > 0]
+    pnl = cash - capital
+    days = (equity[:: max(1, 86400 // panel.step)]).tolist()
+    return {
+        "preset": cfg.get("name"),
+        "markets": len(markets),
+        "timeframe": f"{panel.unit}m",
+        "start": datetime.fromtimestamp(panel.t0, tz=timezone.utc).isoformat(),
+        "end": datetime.fromtimestamp(panel.ts(panel.t_count), tz=timezone.utc).isoformat(),
+        "capital": capital,
+        "final_equity": cash,
+        "pnl_krw": pnl,
+        "pnl_pct": pnl / capital * 100,
+        "max_drawdown_pct": float(dd.min()) if len(dd) else 0.0,
+        "trades": len(trades),
+        "win_rate": len(wins) / len(trades) if trades else None,
+        "avg_trade_pct": float(np.mean([x["pnl_pct"] for x in trades])) if trades else None,
+        "exit_reasons": {r: sum(1 for x in trades if x["exit_reason"] == r) for r in sorted({x["exit_reason"] for x in trades})},
+        "buy_evals": evals,
+        "daily_equity": days,
+        "trade_list": trades,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--preset", default="STANDARD")
+    ap.add_argument("--overrides", help="preset 위에 덮을 JSON (dashboard config 의 overrides 와 같은 모양)")
+    ap.add_argument("--start", required=True)
+    ap.add_argument("--end", required=True)
+    ap.add_argument("--markets", nargs="*", help="기본값: archive 에 있는 전체 market")
+    ap.add_argument("--archive", default=ARCHIVE_DIR)
+    ap.add_argument("--archive-unit", type=int, default=1)
+    ap.add_argument("--panel-dir", default=None)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--capital", type=float, default=1_000_000.0)
+    ap.add_argument("--fee-bp", type=float, default=5.0)
+    ap.add_argument("--slippage-bp", type=float, default=0.0)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args()
+
+    cfg = load_preset(args.preset)
+    if args.overrides:
+        cfg = deep_merge(cfg, json.loads(args.overrides))
+    unit = _unit_from_timeframe(cfg["scanner"]["timeframe"])
+    markets = args.markets or CandleArchive(args.archive, args.archive_unit).markets()
+    start = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc)
+    end = datetime.fromisoformat(args.end).replace(tzinfo=timezone.utc)
+    # window/batch 는 같은 값 => 같은 panel
+    engine = "stream" if cfg["scanner"].get("feature_engine") == "stream" else "window"
+    panel_dir = args.panel_dir or os.path.join(
+        args.archive, "panels", f"{unit}m_{start:%Y%m%d}_{end:%Y%m%d}_{len(markets)}_{engine}"
+    )
+    panel = FeaturePanel.build(
+        panel_dir, markets, unit, start, end, args.archive, args.archive_unit, args.workers, feature_engine=engine
+    )
+    report = simulate(panel, cfg, args.capital, args.fee_bp, args.slippage_bp)
+    summary = {k: v for k, v in report.items() if k not in ("trade_list", "daily_equity")}
+    print(json.dumps(summary, ensure_ascii=False, default=float))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, default=float)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+# scalar(build_features per market) vs batch(build_features_batch) 비교
+#   cd trader && python -m bench.bench_features --markets 100 500 5000
+
+import argparse
+import json
+import random
+import time
+
+from indicators.ta import build_features
+from indicators.batch import build_features_batch, stack_right_aligned
+
+
+def _synthetic(n_markets: int, bars: int, seed: int = 7):
+    rnd = random.Random(seed)
+    highs, lows, closes = [], [], []
+    for _ in range(n_markets):
+        p = rnd.uniform(10, 100_000)
+        h, l, c = [], [], []
+        for _ in range(bars):
+            nxt = p * (1 + rnd.gauss(0, 0.004))
+            h.append(max(p, nxt) * (1 + abs(rnd.gauss(0, 0.001))))
+            l.append(min(p, nxt) * (1 - abs(rnd.gauss(0, 0.001))))
+            c.append(nxt)
+            p = nxt
+        highs.append(h)
+        lows.append(l)
+        closes.append(c)
+    return highs, lows, closes
+
+
+def _scalar(highs, lows, closes):
+    out = []
+    for h, l, c in zip(highs, lows, closes):
+        f = build_features(h, l, c)
+        prev_high = max(h[-20:-1]) if len(h) >= 21 else max(h[:-1])
+        out.append((f, prev_high, (c[-1] - prev_high) / prev_high * 100 if prev_high > 0 else 0.0))
+    return out
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(market_counts: list[int], bars: int, repeat: int) -> list[dict]:
+    results = []
+    for n in market_counts:
+        highs, lows, closes = _synthetic(n, bars)
+        scalar_sec = _best_of(lambda: _scalar(highs, lows, closes), repeat)
+
+        def batch():
+            build_features_batch(
+                stack_right_aligned(highs, bars),
+                stack_right_aligned(lows, bars),
+                stack_right_aligned(closes, bars),
+            )
+
+        batch_sec = _best_of(batch, repeat)
+
+        # 결과 일치 확인
+        ref = _scalar(highs, lows, closes)
+        arr = build_features_batch(
+            stack_right_aligned(highs, bars), stack_right_aligned(lows, bars), stack_right_aligned(closes, bars)
+        )
+        max_diff = 0.0
+        for i, (f, prev_high, brk) in enumerate(ref):
+            for k in ("ema20", "ema50", "rsi14", "atr14"):
+                max_diff = max(max_diff, abs(getattr(f, k) - float(arr[k][i])))
+            max_diff = max(max_diff, abs(prev_high - float(arr["prev_high"][i])), abs(brk - float(arr["breakout_pct"][i])))
+
+        results.append({
+            "markets": n,
+            "bars": bars,
+            "scalar_ms": round(scalar_sec * 1000, 2),
+            "batch_ms": round(batch_sec * 1000, 2),
+            "speedup": round(scalar_sec / batch_sec, 2) if batch_sec > 0 else None,
+            "max_abs_diff": max_diff,
+        })
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--markets", type=int, nargs="+", default=[100, 500, 5000])
+    ap.add_argument("--bars", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    for r in run(args.markets, args.bars, args.repeat):
+        print(json.dumps(r))
+
+
+if __name__ == "__main__":
+    main()
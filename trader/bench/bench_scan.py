@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+# trader.scan_and_score 벤치마크 (로컬 Upbit stand-in 사용, DB 쓰기 없음)
+#   cd trader && python -m bench.bench_scan --markets 50 150 300 --presets SAFE CRAZY --out bench_scan.json
+# scan 별 wall/CPU 시간, upstream 요청 수, 요청 latency p50/p99 를 JSON 으로 남긴다.
+# 첫 scan 은 cold(캔들 warm-up 포함), 이후는 warm 으로 따로 집계한다.
+# scan 별 상세 (--out) 는 commit 하지 않는다 (bench/results/bench_scan.json 은 .gitignore).
+# 비교 기준으로는 요약만 남긴다:
+#   python -m bench.bench_scan --presets SAFE STANDARD CRAZY --out bench/results/bench_scan.json \
+#       --summary-out bench/results/bench_scan_baseline.json
+
+import argparse
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import upbit_public
+import trader
+from candle_cache import CandleStore
+from market_feed import MarketFeed
+from market_meta import MarketMetaCache
+from mock_upbit.rest import SyntheticMarket, FixtureMarket, serve as serve_rest
+from mock_upbit.ws_replay import serve as serve_ws
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def _reset_trader():
+    if trader.FEED is not None:
+        trader.FEED.stop()
+        trader.FEED = None
+    trader.CANDLES = CandleStore()
+    trader.FEATURES.clear()
+    trader.LAST_CANDIDATES.clear()
+    trader.MARKET_META = MarketMetaCache()
+    upbit_public.latency_stats(reset=True)
+
+
+def _run_preset(cfg: dict, mock, scans: int, events: list) -> list[dict]:
+    out = []
+    for i in range(scans):
+        events.clear()
+        mock.reset_counts()
+        t0 = time.perf_counter()
+        c0 = time.process_time()
+        top = trader.scan_and_score(cfg)
+        cpu = time.process_time() - c0
+        wall = time.perf_counter() - t0
+        throttled = dict(mock.throttled)
+        counts = mock.reset_counts()
+        timing = next((d.get("timing") for code, d in events if code in ("SCORES_SAVED", "SCAN_NO_CANDIDATE")), {}) or {}
+        out.append({
+            "scan": i,
+            "wall_ms": round(wall * 1000, 1),
+            "cpu_ms": round(cpu * 1000, 1),
+            "requests": sum(counts.values()),
+            "requests_by_group": counts,
+            "http_429": throttled,
+            "candidates": len(top),
+            "stages_ms": {k: timing.get(k) for k in ("filter_ms", "candles_ms", "features_ms")},
+            "latency_ms": {
+                g: {"count": h["count"], "p50": h["p50_ms"], "p99": h["p99_ms"]}
+                for g, h in (timing.get("latency") or {}).items()
+                if h.get("count")
+            },
+        })
+    return out
+
+
+def _summary(scans: list[dict]) -> dict:
+    warm = scans[1:] or scans
+    return {
+        "cold_wall_ms": scans[0]["wall_ms"],
+        "cold_requests": scans[0]["requests"],
+        "warm_wall_ms_p50": round(statistics.median(s["wall_ms"] for s in warm), 1),
+        "warm_cpu_ms_p50": round(statistics.median(s["cpu_ms"] for s in warm), 1),
+        "warm_requests_p50": statistics.median(s["requests"] for s in warm),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--markets", type=int, nargs="+", default=[50, 150, 300])
+    ap.add_argument("--presets", nargs="+", default=["SAFE", "STANDARD", "PROFIT", "CRAZY"])
+    ap.add_argument("--fixture", help="녹화된 fixture (주면 --markets 는 무시)")
+    ap.add_argument("--scans", type=int, default=3)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--rate-per-sec", type=int, default=None)
+    ap.add_argument("--fail-429", type=float, default=0.0)
+    ap.add_argument("--data-source", choices=["rest", "websocket"], default="rest")
+    ap.add_argument("--feature-engine", choices=["window", "batch", "stream"], default=None)
+    ap.add_argument("--candle-refresh", choices=["always", "bar_close"], default=None)
+    ap.add_argument("--out", default="bench_scan.json")
+    ap.add_argument("--summary-out", help="scan 별 상세 없이 meta + preset 별 요약만")
+    args = ap.parse_args()
+    if args.fixture and args.data_source == "websocket":
+        ap.error("websocket replay is synthetic only")
+
+    # DB 쓰기는 빼고 이벤트 detail 만 모은다
+    events: list = []
+    trader.log_event = lambda engine, tid, level, code, msg, detail=None: events.append((code, detail or {}))
+    trader.save_scores = lambda *a, **kw: None
+
+    sizes = [None] if args.fixture else args.markets
+    results = []
+    for n in sizes:
+        market = FixtureMarket(args.fixture) if args.fixture else SyntheticMarket(n)
+        mock = serve_rest(
+            market=market,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            rate_per_sec=args.rate_per_sec,
+            fail_429_ratio=args.fail_429,
+        )
+        upbit_public.BASE = mock.url
+        ws = None
+        if args.data_source == "websocket":
+            ws = serve_ws(market.ws_messages(), loop=True)
+            trader.MarketFeed = functools.partial(MarketFeed, url=ws.url)
+
+        for preset in args.presets:
+            _reset_trader()
+            cfg = trader._parse_cfg(None, preset)
+            cfg["scanner"]["data_source"] = args.data_source
+            if args.feature_engine:
+                cfg["scanner"]["feature_engine"] = args.feature_engine
+            if args.candle_refresh:
+                cfg["scanner"]["candle_refresh"] = args.candle_refresh
+            scans = _run_preset(cfg, mock, args.scans, events)
+            row = {"markets": len(market.markets), "preset": preset, **_summary(scans), "scans": scans}
+            results.append(row)
+            print(json.dumps({k: v for k, v in row.items() if k != "scans"}))
+
+        _reset_trader()
+        mock.shutdown()
+        mock.server_close()
+        if ws is not None:
+            ws.shutdown()
+            ws.server_close()
+
+    report = {
+        "meta": {
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"wrote {args.out}")
+    if args.summary_out:
+        report["results"] = [{k: v for k, v in r.items() if k != "scans"} for r in results]
+        with open(args.summary_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"wrote {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+# market-data 서비스 부하 테스트: N 개의 simulated trader 가
+#   direct  : 각자 Upbit(stand-in) 에 직접 요청
+#   shared  : market-data 서비스를 거쳐 요청
+# 할 때 upstream 요청 수와 scan 시간을 비교한다.
+# 두 mode 모두 simulated trader 마다 trader 프로세스와 같은 group 별 TokenBucket(--upstream-rate) 을 따로 둔다
+# (shared 는 서비스의 upstream 쪽 bucket 이 하나 더 있다).
+#   cd trader && python -m bench.load_market_data --traders 1 10 50
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import upbit_public
+from market_data_service import MarketDataService, serve as serve_market_data
+from mock_upbit.rest import serve as serve_mock
+
+
+def _get(sess: requests.Session, buckets: dict, group: str, url: str, params: dict) -> requests.Response:
+    buckets[group].acquire()
+    r = sess.get(url, params=params, timeout=30)
+    r.raise_for_status()
+    return r
+
+
+def _scan_once(sess: requests.Session, buckets: dict, base: str, candle_markets: int, unit: int) -> int:
+    # trader.scan_and_score 와 같은 요청 패턴 (market/all -> ticker/orderbook batch -> candles)
+    n = 0
+    markets = [m["market"] for m in _get(sess, buckets, "market", f"{base}/v1/market/all", {"isDetails": "false"}).json()]
+    n += 1
+    krw = [m for m in markets if m.startswith("KRW-")]
+    for i in range(0, len(krw), 100):
+        batch = ",".join(krw[i : i + 100])
+        _get(sess, buckets, "ticker", f"{base}/v1/ticker", {"markets": batch})
+        _get(sess, buckets, "orderbook", f"{base}/v1/orderbook", {"markets": batch})
+        n += 2
+    for mk in krw[:candle_markets]:
+        _get(sess, buckets, "candles", f"{base}/v1/candles/minutes/{unit}", {"market": mk, "count": 60})
+        n += 1
+    return n
+
+
+def _run_traders(base: str, traders: int, rounds: int, candle_markets: int, unit: int, rate: float) -> dict:
+    scan_ms: list[float] = []
+    lock = threading.Lock()
+    client_requests = [0]
+    client_waited = [0.0]
+
+    def trader():
+        sess = requests.Session()
+        # trader 프로세스 1개 = upbit_public._BUCKETS 1벌
+        buckets = {g: upbit_public.TokenBucket(rate) for g in upbit_public._BUCKETS}
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            n = _scan_once(sess, buckets, base, candle_markets, unit)
+            with lock:
+                scan_ms.append((time.perf_counter() - t0) * 1000)
+                client_requests[0] += n
+        with lock:
+            client_waited[0] += sum(b.waited_sec for b in buckets.values())
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=traders) as pool:
+        for f in [pool.submit(trader) for _ in range(traders)]:
+            f.result()
+    wall = time.perf_counter() - t0
+    scan_ms.sort()
+    return {
+        "wall_sec": round(wall, 2),
+        "client_requests": client_requests[0],
+        "client_throttled_sec": round(client_waited[0], 2),
+        "scan_ms_p50": round(statistics.median(scan_ms), 1),
+        "scan_ms_p99": round(scan_ms[min(len(scan_ms) - 1, int(len(scan_ms) * 0.99))], 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--traders", type=int, nargs="+", default=[1, 10, 50])
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--markets", type=int, default=150)
+    ap.add_argument("--candle-markets", type=int, default=30)
+    ap.add_argument("--unit", type=int, default=1)
+    ap.add_argument("--upstream-rate", type=float, default=upbit_public.DEFAULT_RATE_PER_SEC)
+    args = ap.parse_args()
+
+    mock = serve_mock(args.markets)
+    upbit_public.BASE = mock.url
+    for b in upbit_public._BUCKETS.values():
+        b.rate = b.capacity = b.tokens = args.upstream_rate
+
+    for n in args.traders:
+        for mode in ("direct", "shared"):
+            mock.reset_counts()
+            if mode == "shared":
+                srv = serve_market_data("127.0.0.1", 0, MarketDataService())
+                threading.Thread(target=srv.serve_forever, daemon=True).start()
+                base = f"http://127.0.0.1:{srv.server_address[1]}"
+            else:
+                srv = None
+                base = mock.url
+            res = _run_traders(base, n, args.rounds, args.candle_markets, args.unit, args.upstream_rate)
+            upstream = mock.reset_counts()
+            if srv is not None:
+                srv.shutdown()
+                srv.server_close()
+            res.update({
+                "traders": n,
+                "mode": mode,
+                "upstream_requests": sum(upstream.values()),
+                "upstream_per_trader": round(sum(upstream.values()) / n, 1),
+                "upstream_by_group": upstream,
+            })
+            print(json.dumps(res))
+
+
+if __name__ == "__main__":
+    main()
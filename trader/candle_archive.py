@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+# 분봉 archive (backtest 용). market/일 단위 .npy 파일 하나 = (FIELDS x 하루 slot 수) float64.
+#   {root}/{unit}m/{market}/{YYYY-MM-DD}.npy
+# 파일은 np.load(mmap_mode=...) 로 열어서 필요한 구간만 읽는다 (전체를 메모리에 올리지 않음).
+# state: 0 = 모름(아직 받지 않음), 1 = 봉 있음, 2 = 조회했지만 체결 없음(Upbit 는 빈 분봉을 주지 않는다)
+#   cd trader && python candle_archive.py backfill --markets KRW-BTC KRW-ETH --days 30
+#   cd trader && python candle_archive.py info --markets KRW-BTC
+
+import argparse
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from upbit_public import candles_minutes
+
+ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR", "/data/candles")
+FIELDS = ("open", "high", "low", "close", "volume", "value", "state")
+_F = {f: i for i, f in enumerate(FIELDS)}
+UNKNOWN, PRESENT, EMPTY = 0.0, 1.0, 2.0
+PAGE = 200  # Upbit candles 최대 count
+
+
+def _epoch(ts: str) -> int:
+    return int(datetime.fromisoformat(ts).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _to_epoch(t) -> int:
+    if isinstance(t, (int, float)):
+        return int(t)
+    if isinstance(t, str):
+        return _epoch(t)
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return int(t.timestamp())
+
+
+def _day(sec: int) -> date:
+    return datetime.fromtimestamp(sec, tz=timezone.utc).date()
+
+
+def _day_start(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
+
+
+def _iso(sec: int) -> str:
+    return datetime.fromtimestamp(sec, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class CandleArchive:
+    def __init__(self, root: str = ARCHIVE_DIR, unit: int = 1):
+        self.root = root
+        self.unit = int(unit)
+        self.step = self.unit * 60
+        self.slots = 86400 // self.step
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ---- files -----------------------------------------------------------
+
+    def path(self, market: str, d: date) -> str:
+        return os.path.join(self.root, f"{self.unit}m", market, f"{d.isoformat()}.npy")
+
+    def _lock_for(self, market: str) -> threading.Lock:
+        with self._locks_guard:
+            lk = self._locks.get(market)
+            if lk is None:
+                lk = self._locks[market] = threading.Lock()
+            return lk
+
+    def _open(self, market: str, d: date, create: bool = False) -> Optional[np.ndarray]:
+        p = self.path(market, d)
+        if os.path.exists(p):
+            return np.load(p, mmap_mode="r+" if create else "r")
+        if not create:
+            return None
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        # 다 채운 뒤 rename => 읽는 쪽은 반쯤 만든 파일을 보지 않는다
+        tmp = f"{p}.tmp{os.getpid()}"
+        arr = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(len(FIELDS), self.slots))
+        arr[:] = np.nan
+        arr[_F["state"]] = UNKNOWN
+        arr.flush()
+        del arr
+        os.replace(tmp, p)
+        return np.load(p, mmap_mode="r+")
+
+    def markets(self) -> List[str]:
+        d = os.path.join(self.root, f"{self.unit}m")
+        return sorted(os.listdir(d)) if os.path.isdir(d) else []
+
+    def days(self, market: str) -> List[date]:
+        d = os.path.join(self.root, f"{self.unit}m", market)
+        if not os.path.isdir(d):
+            return []
+        return sorted(date.fromisoformat(f[:-4]) for f in os.listdir(d) if f.endswith(".npy"))
+
+    # ---- write -----------------------------------------------------------
+
+    def write(self, market: str, candles: List[dict]) -> int:
+        # Upbit 분봉(순서 무관)을 저장. 같은 slot 은 덮어쓴다 (형성 중이던 봉 갱신)
+        if not candles:
+            return 0
+        by_day: Dict[date, List[Tuple[int, dict]]] = {}
+        for c in candles:
+            sec = _epoch(c["candle_date_time_utc"])
+            by_day.setdefault(_day(sec), []).append((sec, c))
+        with self._lock_for(market):
+            for d, items in by_day.items():
+                arr = self._open(market, d, create=True)
+                base = _day_start(d)
+                idx = np.array([(sec - base) // self.step for sec, _ in items])
+                arr[_F["open"], idx] = [float(c["opening_price"]) for _, c in items]
+                arr[_F["high"], idx] = [float(c["high_price"]) for _, c in items]
+                arr[_F["low"], idx] = [float(c["low_price"]) for _, c in items]
+                arr[_F["close"], idx] = [float(c["trade_price"]) for _, c in items]
+                arr[_F["volume"], idx] = [float(c.get("candle_acc_trade_volume") or 0.0) for _, c in items]
+                arr[_F["value"], idx] = [float(c.get("candle_acc_trade_price") or 0.0) for _, c in items]
+                arr[_F["state"], idx] = PRESENT
+                arr.flush()
+                del arr
+        return len(candles)
+
+    def mark_checked(self, market: str, start, end):
+        # [start, end) 에서 아직 모르는 slot 을 "체결 없음" 으로 표시
+        s, e = _to_epoch(start), _to_epoch(end)
+        if e <= s:
+            return
+        with self._lock_for(market):
+            for d, lo, hi in self._day_ranges(s, e):
+                arr = self._open(market, d, create=True)
+                st = arr[_F["state"], lo:hi]
+                st[st == UNKNOWN] = EMPTY
+                arr.flush()
+                del arr
+
+    # ---- read ------------------------------------------------------------
+
+    def _day_ranges(self, s: int, e: int) -> Iterator[Tuple[date, int, int]]:
+        # [s, e) 를 (day, slot_lo, slot_hi) 로 나눈다
+        s -= s % self.step
+        d = _day(s)
+        while _day_start(d) < e:
+            base = _day_start(d)
+            lo = max(0, (s - base) // self.step)
+            hi = min(self.slots, -(-(e - base) // self.step))
+            if hi > lo:
+                yield d, lo, hi
+            d += timedelta(days=1)
+
+    def iter_days(self, market: str, start, end, fields=FIELDS) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        # 하루씩 (ts, {field: array}) 를 돌려준다. 없는 날은 NaN/UNKNOWN 으로 채운다
+        s, e = _to_epoch(start), _to_epoch(end)
+        rows = [_F[f] for f in fields]
+        for d, lo, hi in self._day_ranges(s, e):
+            base = _day_start(d)
+            ts = base + np.arange(lo, hi, dtype=np.int64) * self.step
+            arr = self._open(market, d)
+            if arr is None:
+                block = np.full((len(rows), hi - lo), np.nan)
+                if "state" in fields:
+                    block[fields.index("state")] = UNKNOWN
+            else:
+                block = np.array(arr[rows, lo:hi])
+                del arr
+            yield ts, {f: block[i] for i, f in enumerate(fields)}
+
+    def read(self, market: str, start, end, fields=FIELDS, present_only: bool = True) -> Dict[str, np.ndarray]:
+        # [start, end) 분봉을 column 별 배열로. present_only 면 체결이 있는 봉만 남긴다
+        fields = tuple(fields)
+        need = fields if "state" in fields else fields + ("state",)
+        tss, cols = [], {f: [] for f in need}
+        for ts, block in self.iter_days(market, start, end, need):
+            tss.append(ts)
+            for f in need:
+                cols[f].append(block[f])
+        out = {"ts": np.concatenate(tss) if tss else np.zeros(0, dtype=np.int64)}
+        for f in need:
+            out[f] = np.concatenate(cols[f]) if cols[f] else np.zeros(0)
+        if present_only:
+            keep = out["state"] == PRESENT
+            out = {k: v[keep] for k, v in out.items()}
+        if "state" not in fields:
+            out.pop("state")
+        return out
+
+    def missing(self, market: str, start, end) -> List[Tuple[int, int]]:
+        # 아직 받지 않은 구간 [(start_sec, end_sec), ...]
+        out: List[Tuple[int, int]] = []
+        for ts, block in self.iter_days(market, start, end, ("state",)):
+            unknown = block["state"] == UNKNOWN
+            if not unknown.any():
+                continue
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], unknown.astype(np.int8), [0]))))
+            for a, b in zip(edges[::2], edges[1::2]):
+                lo, hi = int(ts[a]), int(ts[b - 1]) + self.step
+                if out and out[-1][1] == lo:
+                    out[-1] = (out[-1][0], hi)
+                else:
+                    out.append((lo, hi))
+        return out
+
+    # ---- backfill --------------------------------------------------------
+
+    def backfill(
+        self,
+        market: str,
+        start,
+        end=None,
+        fetch: Callable[..., List[dict]] = candles_minutes,
+        now: Callable[[], float] | None = None,
+    ) -> int:
+        # 빈 구간을 최신 -> 과거 방향으로 페이지 조회 (to = exclusive 상한)
+        now_sec = int((now or (lambda: datetime.now(timezone.utc).timestamp()))())
+        # 형성 중인 봉은 "체결 없음" 으로 확정하지 않는다
+        closed = now_sec - now_sec % self.step
+        e = min(_to_epoch(end), closed) if end is not None else closed
+        written = 0
+        for gs, ge in reversed(self.missing(market, start, e)):
+            cursor = ge
+            while cursor > gs:
+                cds = fetch(market, self.unit, count=PAGE, to=_iso(cursor)) or []
+                if not cds:
+                    # 더 과거에는 체결이 없다 (상장 이전 등)
+                    self.mark_checked(market, gs, cursor)
+                    break
+                ts = [_epoch(c["candle_date_time_utc"]) for c in cds]
+                oldest, newest = min(ts), max(ts)
+                if oldest >= cursor or newest >= cursor:
+                    # to 를 무시하는 upstream (최신 봉만 돌려줌) => 그대로 두면 같은 페이지를 무한 반복한다
+                    raise RuntimeError(
+                        f"backfill {market}: page not before to={_iso(cursor)} (got {_iso(oldest)}..{_iso(newest)})"
+                    )
+                written += self.write(market, cds)
+                if len(cds) < PAGE:
+                    self.mark_checked(market, gs, cursor)
+                    break
+                # 이 페이지가 실제로 덮은 구간 [oldest, cursor) 만 확정
+                self.mark_checked(market, max(gs, oldest), cursor)
+                cursor = oldest
+        return written
+
+    def stats(self, market: str) -> dict:
+        days = self.days(market)
+        present = 0
+        for d in days:
+            arr = self._open(market, d)
+            present += int(np.count_nonzero(arr[_F["state"]] == PRESENT))
+            del arr
+        return {
+            "market": market,
+            "unit": self.unit,
+            "days": len(days),
+            "first_day": days[0].isoformat() if days else None,
+            "last_day": days[-1].isoformat() if days else None,
+            "bars": present,
+        }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=["backfill", "info"])
+    ap.add_argument("--root", default=ARCHIVE_DIR)
+    ap.add_argument("--unit", type=int, default=1)
+    ap.add_argument("--markets", nargs="*", help="기본값: backfill=전체 KRW market, info=archive 에 있는 market")
+    ap.add_argument("--days", type=int, default=7)
+    args = ap.parse_args()
+
+    arc = CandleArchive(args.root, args.unit)
+    if args.cmd == "info":
+        for mk in args.markets or arc.markets():
+            print(arc.stats(mk))
+        return
+
+    from upbit_public import market_all
+
+    markets = args.markets or [m["market"] for m in market_all() if m["market"].startswith("KRW-")]
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=args.days)
+    for mk in markets:
+        n = arc.backfill(mk, start, end)
+        print(f"{mk}: {n} bars, missing={len(arc.missing(mk, start, end))} gaps")
+
+
+if __name__ == "__main__":
+    main()
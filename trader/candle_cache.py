@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterable, List, Tuple
+
+from upbit_public import candles_minutes
+
+
+def _ts(c: dict) -> str:
+    # "2024-01-01T00:03:00" (fixed width => 문자열 비교 가능)
+    return c["candle_date_time_utc"]
+
+
+def _parse_ts(ts: str) -> datetime:
+    return datetime.fromisoformat(ts).replace(tzinfo=timezone.utc)
+
+
+# (market, unit)별 ring buffer. warm-up 이후에는 마지막 캐시 봉 이후만 받아온다.
+# 기본으로는 warm scan 도 market 당 요청 1개 (줄어드는 건 응답 크기뿐, 요청 수 / latency 는 cold 와 같다).
+# get(last_price=...) 를 주면 마지막 봉이 아직 형성 중인 동안은 요청 없이 그 봉의 종가/고가/저가만 last_price 로 고친다.
+class CandleStore:
+    def __init__(self, fetch: Callable[..., List[dict]] = candles_minutes, now: Callable[[], datetime] | None = None):
+        self._fetch = fetch
+        self._now = now or (lambda: datetime.now(timezone.utc))
+        self._bars: Dict[Tuple[str, int], Deque[dict]] = {}
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self.skipped_fetches = 0
+        self.bars_fetched = 0
+        self.evicted = 0
+
+    def _count(self, full: bool, n: int):
+        with self._lock:
+            if full:
+                self.full_fetches += 1
+            else:
+                self.incremental_fetches += 1
+            self.bars_fetched += n
+
+    def _warm(self, key: Tuple[str, int], count: int) -> Deque[dict]:
+        market, unit = key
+        cds = self._fetch(market, unit, count=count) or []
+        self._count(True, len(cds))
+        # Upbit returns newest first
+        buf: Deque[dict] = deque(reversed(cds), maxlen=count)
+        self._bars[key] = buf
+        return buf
+
+    def get(self, market: str, unit: int, count: int = 60, last_price: float | None = None) -> List[dict]:
+        # oldest-first 캔들 리스트 (최대 count개)
+        key = (market, unit)
+        buf = self._bars.get(key)
+        if buf is None or buf.maxlen != count or len(buf) < count:
+            return list(self._warm(key, count))
+
+        last_ts = _ts(buf[-1])
+        elapsed = (self._now() - _parse_ts(last_ts)).total_seconds()
+        if last_price and elapsed < unit * 60:
+            # 마지막 봉 구간이 안 끝났다 => 새 봉이 있을 수 없다. 마감된 봉은 다음 요청 때 REST 값으로 덮인다
+            last = buf[-1]
+            buf[-1] = dict(last, trade_price=last_price, high_price=max(float(last["high_price"]), last_price),
+                           low_price=min(float(last["low_price"]), last_price))
+            with self._lock:
+                self.skipped_fetches += 1
+            return list(buf)
+        # 아직 형성 중인 마지막 봉 + 그 이후 새 봉
+        need = min(count, max(2, int(elapsed // (unit * 60)) + 2))
+        if need >= count:
+            return list(self._warm(key, count))
+
+        cds = self._fetch(market, unit, count=need) or []
+        self._count(False, len(cds))
+        new = list(reversed(cds))
+        if not new or _ts(new[0]) > last_ts:
+            # 캐시와 겹치는 구간이 없으면 공백이 생긴 것 => 다시 warm-up
+            return list(self._warm(key, count))
+
+        first_ts = _ts(new[0])
+        while buf and _ts(buf[-1]) >= first_ts:
+            buf.pop()
+        buf.extend(new)
+        return list(buf)
+
+    def retain(self, markets: Iterable[str]) -> int:
+        # 상장 폐지 등으로 목록에서 빠진 market 캐시를 비운다
+        alive = set(markets)
+        with self._lock:
+            dead = [k for k in self._bars if k[0] not in alive]
+            for k in dead:
+                del self._bars[k]
+            self.evicted += len(dead)
+        return len(dead)
+
+    def drop_unit(self, unit: int) -> int:
+        # timeframe 이 바뀌면 이전 분봉 단위 캐시는 더 이상 쓰지 않는다
+        with self._lock:
+            dead = [k for k in self._bars if k[1] == unit]
+            for k in dead:
+                del self._bars[k]
+            self.evicted += len(dead)
+        return len(dead)
+
+    def stats(self, reset: bool = False) -> dict:
+        with self._lock:
+            out = {
+                "series": len(self._bars),
+                "full_fetches": self.full_fetches,
+                "incremental_fetches": self.incremental_fetches,
+                "skipped_fetches": self.skipped_fetches,
+                "bars_fetched": self.bars_fetched,
+                "evicted": self.evicted,
+            }
+            if reset:
+                self._reset_stats()
+            return out
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import atexit
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+# queue 가 가득 찼을 때 낮은 level 부터 버린다. ERROR 는 버리지 않는다.
+_LEVEL_PRIORITY = {"DEBUG": 0, "INFO": 1, "WARN": 2, "WARNING": 2, "ERROR": 3}
+_NEVER_DROP = 3
+# scores.scan_id / features_json 이 없는 기존 DB (dashboard-api migration 전) 면 예전 column 만 쓴다
+SCORES_SCAN_COLS = True
+
+
+def _insert_events(conn, rows: List[dict]):
+    # 한 statement 로 multi-row INSERT
+    # created_at 은 DEFAULT CURRENT_TIMESTAMP (flush 시점의 DB 시각). trader 시계 / session time_zone 을 쓰지 않아서
+    # 다른 table / NOW() 와 같은 시계이고, id 순서와도 거의 맞는다. 대신 put() 부터 flush 까지 (최대 flush 주기 + 적체) 늦다
+    values = []
+    params: Dict[str, Any] = {}
+    for i, r in enumerate(rows):
+        values.append(f"(:tid{i},:lvl{i},:code{i},:msg{i},:detail{i})")
+        params.update({
+            f"tid{i}": r["tid"],
+            f"lvl{i}": r["lvl"],
+            f"code{i}": r["code"],
+            f"msg{i}": r["msg"],
+            f"detail{i}": r["detail"],
+        })
+    conn.execute(
+        text("INSERT INTO events(trader_id, level, code, message, detail_json) VALUES " + ",".join(values)),
+        params,
+    )
+
+
+class EventSink:
+    def __init__(
+        self,
+        engine: Engine,
+        max_queue: int = 5000,
+        batch_size: int = 200,
+        flush_interval_sec: float = 1.0,
+    ):
+        self.engine = engine
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self._q: Deque[dict] = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # metrics
+        self.enqueued = 0
+        self.dropped: Dict[str, int] = {}
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.max_depth = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        # 남은 이벤트를 모두 flush 하고 종료
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _drop(self, level: str):
+        self.dropped[level] = self.dropped.get(level, 0) + 1
+
+    def put(self, trader_id: str, level: str, code: str, message: str, detail_json: Optional[str]):
+        row = {"tid": trader_id, "lvl": level, "code": code, "msg": message, "detail": detail_json}
+        prio = _LEVEL_PRIORITY.get(level.upper(), 1)
+        with self._cond:
+            if len(self._q) >= self.max_queue:
+                # 가장 오래된 최저 level 항목을 희생양으로 고른다
+                victim_i, victim_p = None, _NEVER_DROP
+                for i, r in enumerate(self._q):
+                    p = _LEVEL_PRIORITY.get(r["lvl"].upper(), 1)
+                    if p < victim_p:
+                        victim_i, victim_p = i, p
+                        if p == 0:
+                            break
+                if victim_i is not None and victim_p <= prio:
+                    self._drop(self._q[victim_i]["lvl"])
+                    del self._q[victim_i]
+                elif prio < _NEVER_DROP:
+                    self._drop(level)
+                    return
+                # 그 외(큐 전체가 ERROR 이고 새 항목도 ERROR)는 용량을 넘겨서라도 보관
+            self._q.append(row)
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._q))
+            if len(self._q) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _take(self) -> List[dict]:
+        with self._cond:
+            n = min(self.batch_size, len(self._q))
+            return [self._q.popleft() for _ in range(n)]
+
+    def _requeue(self, rows: List[dict]):
+        with self._cond:
+            for r in reversed(rows):
+                self._q.appendleft(r)
+
+    def flush(self) -> int:
+        total = 0
+        while True:
+            rows = self._take()
+            if not rows:
+                return total
+            t0 = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    _insert_events(conn, rows)
+            except Exception:
+                self.flush_errors += 1
+                self._requeue(rows)
+                raise
+            ms = (time.perf_counter() - t0) * 1000
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+            self.last_flush_ms = ms
+            self.total_flush_ms += ms
+            self.max_flush_ms = max(self.max_flush_ms, ms)
+            total += len(rows)
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            with self._cond:
+                if not self._stop.is_set() and len(self._q) < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval_sec)
+            stopping = self._stop.is_set()
+            try:
+                self.flush()
+                backoff = 0.0
+            except Exception:
+                # DB 장애: backoff 후 재시도 (종료 중이면 포기)
+                if stopping:
+                    return
+                backoff = min(30.0, backoff * 2 or 1.0)
+                self._stop.wait(backoff)
+                continue
+            if stopping:
+                return
+
+    def metrics(self) -> dict:
+        with self._cond:
+            depth = len(self._q)
+        return {
+            "queue_depth": depth,
+            "max_queue_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": dict(self.dropped),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 1) if self.flushes else None,
+            "max_flush_ms": round(self.max_flush_ms, 1),
+        }
+
+
+_SINK: Optional[EventSink] = None
+
+
+def start_event_sink(engine: Engine, **kw) -> EventSink:
+    global _SINK
+    if _SINK is None:
+        _SINK = EventSink(engine, **kw)
+        _SINK.start()
+        atexit.register(stop_event_sink)
+    return _SINK
+
+
+def stop_event_sink():
+    global _SINK
+    sink, _SINK = _SINK, None
+    if sink is not None:
+        sink.stop()
+
+
+def event_sink_metrics() -> Optional[dict]:
+    return _SINK.metrics() if _SINK is not None else None
+
+
+def log_event(engine: Engine, trader_id: str, level: str, code: str, message: str, detail: Optional[Dict[str, Any]] = None):
+    detail_json = json.dumps(detail, ensure_ascii=False) if detail is not None else None
+    sink = _SINK
+    if sink is not None and sink.engine is engine:
+        sink.put(trader_id, level, code, message, detail_json)
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO events(trader_id, level, code, message, detail_json) VALUES (:tid,:lvl,:code,:msg,:detail)"
+            ),
+            {"tid": trader_id, "lvl": level, "code": code, "msg": message, "detail": detail_json},
+        )
+
+
+def save_scores(engine: Engine, trader_id: str, items: list[dict], scan_id: Optional[str] = None):
+    # 한 scan 의 순위를 executemany(=multi-row INSERT) 한 번으로 저장
+    if not items:
+        return
+    rows = [
+        {
+            "tid": trader_id,
+            "sym": it.get("symbol"),
+            "score": float(it.get("score", 0.0)),
+            "scan": scan_id,
+            "features": json.dumps(it["features"], ensure_ascii=False) if it.get("features") is not None else None,
+        }
+        for it in items
+    ]
+    global SCORES_SCAN_COLS
+    if SCORES_SCAN_COLS:
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "INSERT INTO scores(trader_id, symbol, score, scan_id, features_json) "
+                        "VALUES (:tid,:sym,:score,:scan,:features)"
+                    ),
+                    rows,
+                )
+            return
+        except DBAPIError as e:
+            if getattr(e.orig, "args", (None,))[0] != 1054:  # ER_BAD_FIELD_ERROR
+                raise
+            SCORES_SCAN_COLS = False
+            log_event(engine, trader_id, "WARN", "SCORES_COLUMNS_FALLBACK", "scores.scan_id/features_json not found", {})
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO scores(trader_id, symbol, score) VALUES (:tid,:sym,:score)"), rows)
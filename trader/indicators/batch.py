@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+
+# 여러 market을 한 번에 계산하는 vectorized 버전 (markets x bars).
+# 각 row는 오른쪽 정렬, 봉이 부족한 row는 왼쪽을 NaN으로 채운다.
+# 시간축은 순차(재귀식)지만 market 축은 한 번에 처리한다. ta.* 와 같은 연산 순서를 유지한다.
+
+
+def _starts(closes: np.ndarray, lengths: Optional[np.ndarray]) -> np.ndarray:
+    t = closes.shape[1]
+    if lengths is None:
+        lengths = np.sum(~np.isnan(closes), axis=1)
+    return t - np.asarray(lengths, dtype=np.int64)
+
+
+def ema_batch(closes: np.ndarray, period: int, starts: np.ndarray) -> np.ndarray:
+    m, t = closes.shape
+    k = 2.0 / (period + 1.0)
+    seed = np.zeros(m)
+    val = np.full(m, np.nan)
+    for i in range(t):
+        v = closes[:, i]
+        rel = i - starts
+        seed = np.where((rel >= 0) & (rel < period), seed + v, seed)
+        val = np.where(rel == period - 1, seed / period, val)
+        val = np.where(rel >= period, (v - val) * k + val, val)
+    return val
+
+
+def rsi_batch(closes: np.ndarray, period: int, starts: np.ndarray) -> np.ndarray:
+    m, t = closes.shape
+    gains = np.zeros(m)
+    losses = np.zeros(m)
+    avg_gain = np.full(m, np.nan)
+    avg_loss = np.full(m, np.nan)
+    for i in range(1, t):
+        rel = i - starts
+        diff = closes[:, i] - closes[:, i - 1]
+        in_seed = (rel >= 1) & (rel <= period)
+        gains = np.where(in_seed & (diff >= 0), gains + diff, gains)
+        losses = np.where(in_seed & (diff < 0), losses - diff, losses)
+        done = rel == period
+        avg_gain = np.where(done, gains / period, avg_gain)
+        avg_loss = np.where(done, losses / period, avg_loss)
+        upd = rel > period
+        gain = np.where(diff > 0, diff, 0.0)
+        loss = np.where(diff < 0, -diff, 0.0)
+        avg_gain = np.where(upd, (avg_gain * (period - 1) + gain) / period, avg_gain)
+        avg_loss = np.where(upd, (avg_loss * (period - 1) + loss) / period, avg_loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+    out = np.where(avg_loss == 0, 100.0, out)
+    return np.where(np.isnan(avg_gain), np.nan, out)
+
+
+def atr_batch(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int, starts: np.ndarray) -> np.ndarray:
+    m, t = closes.shape
+    seed = np.zeros(m)
+    val = np.full(m, np.nan)
+    for i in range(1, t):
+        rel = i - starts
+        pc = closes[:, i - 1]
+        tr = np.maximum(np.maximum(highs[:, i] - lows[:, i], np.abs(highs[:, i] - pc)), np.abs(lows[:, i] - pc))
+        seed = np.where((rel >= 1) & (rel <= period), seed + tr, seed)
+        val = np.where(rel == period, seed / period, val)
+        val = np.where(rel > period, (val * (period - 1) + tr) / period, val)
+    return val
+
+
+def build_features_batch(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    lengths: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    starts = _starts(closes, lengths)
+
+    # breakout: 직전 19봉 고가 (봉이 21개 미만이면 마지막 봉을 제외한 전체)
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 봉이 1개뿐인 row 의 All-NaN slice
+        prev_high = np.nanmax(highs[:, -20:-1], axis=1) if highs.shape[1] >= 2 else np.full(len(highs), np.nan)
+    last = closes[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakout_pct = np.where(prev_high > 0, (last - prev_high) / prev_high * 100, 0.0)
+
+    return {
+        "ema20": ema_batch(closes, 20, starts),
+        "ema50": ema_batch(closes, 50, starts),
+        "rsi14": rsi_batch(closes, 14, starts),
+        "atr14": atr_batch(highs, lows, closes, 14, starts),
+        "prev_high": prev_high,
+        "prev_close": closes[:, -2],
+        "last": last,
+        "breakout_pct": breakout_pct,
+    }
+
+
+def stack_right_aligned(rows: list[list[float]], width: int) -> np.ndarray:
+    out = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        r = r[-width:]
+        if r:
+            out[i, width - len(r):] = r
+    return out
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from .ta import FeatureSnapshot
+
+# ta.ema/rsi/atr 와 같은 계산 순서를 유지하는 incremental 버전.
+# push()는 새 봉, amend()는 아직 형성 중인 마지막 봉을 교체한다 (둘 다 O(1)).
+
+
+class StreamingEMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1.0)
+        self.seed: list[float] = []
+        self.value: Optional[float] = None
+        self._prev = None
+
+    def _state(self):
+        return (tuple(self.seed) if self.value is None else (), self.value)
+
+    def _apply(self, v: float):
+        if self.value is None:
+            self.seed.append(v)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = []
+        else:
+            self.value = (v - self.value) * self.k + self.value
+
+    def push(self, v: float) -> Optional[float]:
+        self._prev = self._state()
+        self._apply(v)
+        return self.value
+
+    def amend(self, v: float) -> Optional[float]:
+        if self._prev is None:
+            return self.push(v)
+        seed, self.value = self._prev
+        self.seed = list(seed)
+        self._apply(v)
+        return self.value
+
+
+class StreamingRSI:
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.n = 0
+        self.gains = 0.0
+        self.losses = 0.0
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self._prev = None
+
+    def _state(self):
+        return (self.prev_close, self.n, self.gains, self.losses, self.avg_gain, self.avg_loss)
+
+    def _apply(self, close: float):
+        if self.prev_close is None:
+            self.prev_close = close
+            return
+        diff = close - self.prev_close
+        self.prev_close = close
+        p = self.period
+        if self.n < p:
+            if diff >= 0:
+                self.gains += diff
+            else:
+                self.losses -= diff
+            self.n += 1
+            if self.n == p:
+                self.avg_gain = self.gains / p
+                self.avg_loss = self.losses / p
+            return
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        self.avg_gain = (self.avg_gain * (p - 1) + gain) / p
+        self.avg_loss = (self.avg_loss * (p - 1) + loss) / p
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.avg_gain is None:
+            return None
+        if self.avg_loss == 0:
+            return 100.0
+        rs = self.avg_gain / self.avg_loss
+        return 100.0 - (100.0 / (1.0 + rs))
+
+    def push(self, close: float) -> Optional[float]:
+        self._prev = self._state()
+        self._apply(close)
+        return self.value
+
+    def amend(self, close: float) -> Optional[float]:
+        if self._prev is None:
+            return self.push(close)
+        self.prev_close, self.n, self.gains, self.losses, self.avg_gain, self.avg_loss = self._prev
+        self._apply(close)
+        return self.value
+
+
+class StreamingATR:
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.seed: list[float] = []
+        self.value: Optional[float] = None
+        self._prev = None
+
+    def _state(self):
+        return (self.prev_close, tuple(self.seed) if self.value is None else (), self.value)
+
+    def _apply(self, high: float, low: float, close: float):
+        if self.prev_close is None:
+            self.prev_close = close
+            return
+        tr = max(
+            high - low,
+            abs(high - self.prev_close),
+            abs(low - self.prev_close),
+        )
+        self.prev_close = close
+        p = self.period
+        if self.value is None:
+            self.seed.append(tr)
+            if len(self.seed) == p:
+                self.value = sum(self.seed) / p
+                self.seed = []
+        else:
+            self.value = (self.value * (p - 1) + tr) / p
+
+    def push(self, high: float, low: float, close: float) -> Optional[float]:
+        self._prev = self._state()
+        self._apply(high, low, close)
+        return self.value
+
+    def amend(self, high: float, low: float, close: float) -> Optional[float]:
+        if self._prev is None:
+            return self.push(high, low, close)
+        self.prev_close, seed, self.value = self._prev
+        self.seed = list(seed)
+        self._apply(high, low, close)
+        return self.value
+
+
+class IncrementalFeatures:
+    # market 하나의 EMA20/EMA50/RSI14/ATR14 상태. 봉은 시간 순서(ts 오름차순)로 넣는다.
+    def __init__(self):
+        self.ema20 = StreamingEMA(20)
+        self.ema50 = StreamingEMA(50)
+        self.rsi14 = StreamingRSI(14)
+        self.atr14 = StreamingATR(14)
+        self.last_ts = None
+        self.bars = 0
+
+    def update(self, ts, high: float, low: float, close: float) -> bool:
+        # 같은 ts => 형성 중인 봉 교체, 더 큰 ts => 새 봉, 더 작은 ts => 무시
+        if self.last_ts is not None and ts < self.last_ts:
+            return False
+        if self.last_ts is not None and ts == self.last_ts:
+            self.ema20.amend(close)
+            self.ema50.amend(close)
+            self.rsi14.amend(close)
+            self.atr14.amend(high, low, close)
+            return True
+        self.ema20.push(close)
+        self.ema50.push(close)
+        self.rsi14.push(close)
+        self.atr14.push(high, low, close)
+        self.last_ts = ts
+        self.bars += 1
+        return True
+
+    def snapshot(self) -> FeatureSnapshot:
+        return FeatureSnapshot(
+            ema20=self.ema20.value,
+            ema50=self.ema50.value,
+            rsi14=self.rsi14.value,
+            atr14=self.atr14.value,
+        )
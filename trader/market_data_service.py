@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+# 여러 trader 컨테이너가 공유하는 Upbit 시세 캐시 (Upbit REST 와 같은 경로/응답 모양).
+# trader 는 UPBIT_BASE_URL=http://market-data:8090 으로 이 서비스를 본다.
+# 같은 데이터를 trader 수만큼 받아오지 않도록 market 별 snapshot 을 TTL 동안 공유하고,
+# 동시에 들어온 같은 요청은 upstream 호출 한 번으로 합친다.
+
+import gzip
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+import upbit_public
+from candle_cache import CandleStore
+
+HOST = os.getenv("MARKET_DATA_HOST", "0.0.0.0")
+PORT = int(os.getenv("MARKET_DATA_PORT", "8090"))
+MARKET_TTL_SEC = float(os.getenv("MARKET_DATA_MARKET_TTL_SEC", "300"))
+QUOTE_TTL_SEC = float(os.getenv("MARKET_DATA_QUOTE_TTL_SEC", "1.0"))
+CANDLE_TTL_SEC = float(os.getenv("MARKET_DATA_CANDLE_TTL_SEC", "2.0"))
+CANDLE_WINDOW = int(os.getenv("MARKET_DATA_CANDLE_WINDOW", "60"))
+
+
+class SnapshotCache:
+    # market 단위 snapshot (ticker/orderbook). 오래된 market 만 모아서 batch 로 갱신한다.
+    def __init__(self, fetch_batch: Callable[[List[str]], List[dict]], ttl: float):
+        self.fetch_batch = fetch_batch
+        self.ttl = ttl
+        self._data: Dict[str, Tuple[float, dict]] = {}
+        self._fetch_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.stale_served = 0
+
+    def _stale(self, markets: List[str], now: float) -> List[str]:
+        return [m for m in markets if m not in self._data or now - self._data[m][0] > self.ttl]
+
+    def get(self, markets: List[str]) -> List[dict]:
+        stale = self._stale(markets, time.monotonic())
+        if stale:
+            with self._fetch_lock:
+                # 기다리는 동안 다른 요청이 갱신했을 수 있다
+                stale = self._stale(markets, time.monotonic())
+                for i in range(0, len(stale), 100):
+                    chunk = stale[i : i + 100]
+                    try:
+                        items = self.fetch_batch(chunk)
+                    except Exception:
+                        if all(m in self._data for m in chunk):
+                            self.stale_served += len(chunk)
+                            continue
+                        raise
+                    self.upstream_calls += 1
+                    t = time.monotonic()
+                    for it in items:
+                        self._data[it["market"]] = (t, it)
+        self.misses += len(stale)
+        self.hits += len(markets) - len(stale)
+        return [self._data[m][1] for m in markets if m in self._data]
+
+    def retain(self, markets: List[str]):
+        alive = set(markets)
+        for m in [m for m in self._data if m not in alive]:
+            self._data.pop(m, None)
+
+    def stats(self) -> dict:
+        return {
+            "markets": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "upstream_calls": self.upstream_calls,
+            "stale_served": self.stale_served,
+        }
+
+
+class CandleCache:
+    # (market, unit) 별 CandleStore window 를 TTL 동안 공유한다. count <= window 요청은 모두 여기서 자른다.
+    def __init__(self, ttl: float, window: int):
+        self.ttl = ttl
+        self.window = window
+        self.store = CandleStore()
+        self._cds: Dict[Tuple[str, int], Tuple[float, List[dict]]] = {}
+        self._locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.passthrough = 0
+
+    def _lock_for(self, key) -> threading.Lock:
+        with self._locks_guard:
+            lk = self._locks.get(key)
+            if lk is None:
+                lk = self._locks[key] = threading.Lock()
+            return lk
+
+    def get(self, market: str, unit: int, count: int, to: str | None = None) -> List[dict]:
+        # to(과거 페이지) 가 있거나 window 보다 큰 요청은 공유 window 로 답할 수 없다 => upstream 그대로
+        if to or count > self.window:
+            self.passthrough += 1
+            return upbit_public.candles_minutes(market, unit, count=count, to=to)
+        key = (market, unit)
+        with self._lock_for(key):
+            ent = self._cds.get(key)
+            if ent is None or time.monotonic() - ent[0] > self.ttl:
+                self.misses += 1
+                ent = (time.monotonic(), self.store.get(market, unit, self.window))
+                self._cds[key] = ent
+            else:
+                self.hits += 1
+        # Upbit 와 같이 newest first
+        return list(reversed(ent[1][-count:]))
+
+    def retain(self, markets: List[str]):
+        self.store.retain(markets)
+        alive = set(markets)
+        with self._locks_guard:
+            for key in [k for k in self._cds if k[0] not in alive]:
+                self._cds.pop(key, None)
+                self._locks.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "series": len(self._cds),
+            "hits": self.hits,
+            "misses": self.misses,
+            "passthrough": self.passthrough,
+            "store": self.store.stats(),
+        }
+
+
+class MarketDataService:
+    def __init__(
+        self,
+        market_ttl: float = MARKET_TTL_SEC,
+        quote_ttl: float = QUOTE_TTL_SEC,
+        candle_ttl: float = CANDLE_TTL_SEC,
+        candle_window: int = CANDLE_WINDOW,
+    ):
+        self.market_ttl = market_ttl
+        self._markets: Dict[str, Tuple[float, List[dict]]] = {}
+        self._markets_lock = threading.Lock()
+        self.tickers = SnapshotCache(upbit_public.ticker, quote_ttl)
+        self.orderbooks = SnapshotCache(upbit_public.orderbook, quote_ttl)
+        self.candles = CandleCache(candle_ttl, candle_window)
+        self.requests = 0
+
+    def market_all(self, is_details: bool) -> List[dict]:
+        key = "true" if is_details else "false"
+        with self._markets_lock:
+            ent = self._markets.get(key)
+            if ent is None or time.monotonic() - ent[0] > self.market_ttl:
+                try:
+                    r = upbit_public.market_all(is_details=is_details)
+                except Exception:
+                    if ent is None:
+                        raise
+                    return ent[1]
+                ent = (time.monotonic(), r)
+                self._markets[key] = ent
+                names = [m["market"] for m in r if "market" in m]
+                self.tickers.retain(names)
+                self.orderbooks.retain(names)
+                self.candles.retain(names)
+            return ent[1]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "ticker": self.tickers.stats(),
+            "orderbook": self.orderbooks.stats(),
+            "candles": self.candles.stats(),
+            "upstream_rate_limit": upbit_public.limiter_stats(),
+            "upstream_latency": upbit_public.latency_stats(),
+        }
+
+
+def make_handler(svc: MarketDataService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            headers = {"Content-Type": "application/json; charset=utf-8"}
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                data = gzip.compress(data, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            svc.requests += 1
+            u = urlparse(self.path)
+            q = {k: v[-1] for k, v in parse_qs(u.query).items()}
+            try:
+                if u.path == "/v1/market/all":
+                    return self._send(200, svc.market_all(q.get("isDetails", "false").lower() == "true"))
+                if u.path == "/v1/ticker":
+                    return self._send(200, svc.tickers.get([m for m in q.get("markets", "").split(",") if m]))
+                if u.path == "/v1/orderbook":
+                    return self._send(200, svc.orderbooks.get([m for m in q.get("markets", "").split(",") if m]))
+                if u.path.startswith("/v1/candles/minutes/"):
+                    unit = int(u.path.rsplit("/", 1)[-1])
+                    return self._send(200, svc.candles.get(q["market"], unit, int(q.get("count", 1)), q.get("to")))
+                if u.path == "/metrics":
+                    return self._send(200, svc.stats())
+                if u.path == "/health":
+                    return self._send(200, {"ok": True})
+                return self._send(404, {"error": {"name": "not_found", "message": u.path}})
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 502
+                return self._send(status, {"error": {"name": "upstream", "message": str(e)}})
+            except (KeyError, ValueError) as e:
+                return self._send(400, {"error": {"name": "bad_request", "message": str(e)}})
+            except Exception as e:
+                return self._send(502, {"error": {"name": "upstream", "message": str(e)}})
+
+    return Handler
+
+
+def serve(host: str = HOST, port: int = PORT, svc: MarketDataService | None = None) -> ThreadingHTTPServer:
+    svc = svc or MarketDataService()
+    srv = ThreadingHTTPServer((host, port), make_handler(svc))
+    srv.daemon_threads = True
+    srv.service = svc
+    return srv
+
+
+def main():
+    srv = serve()
+    print(f"[market-data] listening on {HOST}:{PORT} upstream={upbit_public.BASE}")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import websocket  # websocket-client
+
+WS_URL = os.getenv("UPBIT_WS_URL", "wss://api.upbit.com/websocket/v1")
+RECONNECT_SEC = 3.0
+
+
+def _bar_ts(ts_ms: int, unit: int) -> str:
+    step = unit * 60_000
+    start = (int(ts_ms) // step) * step
+    return datetime.fromtimestamp(start / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# Upbit WebSocket(ticker/orderbook/trade) 구독 결과를 메모리에 유지한다.
+# ticker/orderbook은 REST 응답과 같은 모양(market 키)으로, 분봉은 trade로 직접 만든다.
+class MarketFeed:
+    def __init__(
+        self,
+        markets: Iterable[str],
+        units: Iterable[int] = (1,),
+        url: str = WS_URL,
+        max_bars: int = 200,
+        record_path: Optional[str] = None,
+    ):
+        self.url = url
+        self.markets = list(markets)
+        self.units = set(int(u) for u in units)
+        self.max_bars = max_bars
+        self.record_path = record_path
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._tickers: Dict[str, dict] = {}
+        self._orderbooks: Dict[str, dict] = {}
+        self._bars: Dict[Tuple[str, int], Deque[dict]] = {}
+        # 체결이 빠졌을 수 있는 series (재연결 / 봉 건너뜀) => REST 로 다시 seed 할 때까지 candles() 가 None
+        self._stale: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._record = None
+        # event trigger: 마지막 scoring 기준값 대비 변화가 생긴 market 을 dirty 로 표시
+        self._ref: Dict[str, float] = {}
+        self._dirty: set = set()
+        self._avg_vol: Dict[str, float] = {}
+        self._spiked: Dict[str, str] = {}
+        self.price_move_pct = 0.3
+        self.volume_spike_x = 3.0
+        self.trigger_unit = min(self.units) if self.units else 1
+        self.dirty_marked = 0
+        # counters
+        self.messages = 0
+        self.reconnects = 0
+        self.connected = False
+        self.last_message_at: Optional[float] = None
+
+    # ---- lifecycle -------------------------------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        if self.record_path:
+            self._record = open(self.record_path, "a", encoding="utf-8")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._disconnect()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._record:
+            self._record.close()
+            self._record = None
+
+    def resubscribe(self, markets: Iterable[str], units: Iterable[int] | None = None):
+        markets = list(markets)
+        units = set(int(u) for u in units) if units is not None else self.units
+        if markets == self.markets and units <= self.units:
+            return
+        self.markets = markets
+        self.units |= units
+        alive = set(markets)
+        with self._lock:
+            for d in (self._tickers, self._orderbooks):
+                for mk in [m for m in d if m not in alive]:
+                    del d[mk]
+            for key in [k for k in self._bars if k[0] not in alive]:
+                del self._bars[key]
+            self._stale = {k for k in self._stale if k[0] in alive}
+            for d in (self._ref, self._avg_vol, self._spiked):
+                for mk in [m for m in d if m not in alive]:
+                    del d[mk]
+            self._dirty &= alive
+        # 연결을 끊으면 _run 이 새 목록으로 다시 구독한다
+        self._disconnect()
+
+    def _disconnect(self):
+        # 다른 thread 에서 close() 로 fd 를 닫으면 run_forever 의 select 가 깨지지 않는다 (ping_timeout 까지 대기)
+        # => shutdown 만 해서 EOF 를 받게 하고, 닫는 건 run_forever 에 맡긴다
+        ws = self._ws
+        if ws is None:
+            return
+        ws.keep_running = False
+        sock = getattr(ws.sock, "sock", None)
+        try:
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+            else:
+                ws.close()
+        except Exception:
+            pass
+
+    def _subscribe_payload(self) -> str:
+        codes = self.markets
+        return json.dumps([
+            {"ticket": f"trader-{uuid.uuid4().hex[:12]}"},
+            {"type": "ticker", "codes": codes},
+            {"type": "orderbook", "codes": codes},
+            {"type": "trade", "codes": codes},
+            {"format": "DEFAULT"},
+        ])
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=lambda ws: ws.send(self._subscribe_payload()),
+                on_message=lambda ws, msg: self._on_raw(msg),
+            )
+            try:
+                self._ws.run_forever(ping_interval=30, ping_timeout=10)
+            except Exception:
+                pass
+            self.connected = False
+            if self._stop.is_set():
+                break
+            # 끊긴 동안의 체결은 다시 오지 않는다
+            with self._lock:
+                self._stale |= set(self._bars)
+            self.reconnects += 1
+            self._stop.wait(RECONNECT_SEC)
+
+    # ---- ingest ----------------------------------------------------------
+
+    def _on_raw(self, raw):
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        if self._record:
+            self._record.write(raw + "\n")
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            return
+        self.on_message(msg)
+
+    def on_message(self, msg: dict):
+        typ = msg.get("type")
+        code = msg.get("code")
+        if not code:
+            return
+        self.connected = True
+        self.messages += 1
+        self.last_message_at = time.time()
+        with self._lock:
+            if typ == "ticker":
+                self._tickers[code] = dict(msg, market=code)
+            elif typ == "orderbook":
+                self._orderbooks[code] = dict(msg, market=code)
+            elif typ == "trade":
+                self._apply_trade(code, msg)
+
+    def _apply_trade(self, code: str, msg: dict):
+        price = float(msg["trade_price"])
+        vol = float(msg.get("trade_volume") or 0.0)
+        ts_ms = int(msg.get("trade_timestamp") or msg.get("timestamp") or 0)
+        for unit in self.units:
+            key = (code, unit)
+            buf = self._bars.get(key)
+            if buf is None:
+                buf = self._bars[key] = deque(maxlen=self.max_bars)
+            ts = _bar_ts(ts_ms, unit)
+            bar = None
+            # 늦게 도착한 체결은 최근 몇 개 봉 안에서만 반영한다
+            for j in range(1, min(3, len(buf)) + 1):
+                if buf[-j]["candle_date_time_utc"] == ts:
+                    bar = buf[-j]
+                    break
+            if bar is None:
+                if buf and buf[-1]["candle_date_time_utc"] > ts:
+                    continue
+                # 직전 봉이 바로 앞 봉이 아니면 사이 봉이 빠졌다 (체결 없는 구간일 수도 있지만 REST 로 확인)
+                if buf and buf[-1]["candle_date_time_utc"] < _bar_ts(ts_ms - unit * 60_000, unit):
+                    self._stale.add(key)
+                if unit == self.trigger_unit:
+                    self._on_new_bar(code, buf)
+                buf.append({
+                    "market": code,
+                    "candle_date_time_utc": ts,
+                    "opening_price": price,
+                    "high_price": price,
+                    "low_price": price,
+                    "trade_price": price,
+                    "candle_acc_trade_volume": vol,
+                    "candle_acc_trade_price": price * vol,
+                    "unit": unit,
+                })
+                continue
+            bar["high_price"] = max(bar["high_price"], price)
+            bar["low_price"] = min(bar["low_price"], price)
+            if bar is buf[-1]:
+                bar["trade_price"] = price
+            bar["candle_acc_trade_volume"] += vol
+            bar["candle_acc_trade_price"] += price * vol
+            if unit == self.trigger_unit and bar is buf[-1]:
+                self._check_spike(code, bar)
+        self._check_move(code, price)
+
+    # ---- event trigger ---------------------------------------------------
+
+    def set_triggers(self, price_move_pct: float | None = None, volume_spike_x: float | None = None, unit: int | None = None):
+        with self._lock:
+            if price_move_pct is not None:
+                self.price_move_pct = float(price_move_pct)
+            if volume_spike_x is not None:
+                self.volume_spike_x = float(volume_spike_x)
+            if unit is not None:
+                self.trigger_unit = int(unit)
+
+    def mark_scored(self, market: str, price: float):
+        with self._lock:
+            self._ref[market] = float(price)
+            self._dirty.discard(market)
+
+    def _mark_dirty(self, code: str):
+        # lock 보유 상태에서 호출. 한 번도 scoring 되지 않은 market 은 full scan 에 맡긴다.
+        if code not in self._ref or code in self._dirty:
+            return
+        self._dirty.add(code)
+        self.dirty_marked += 1
+        self._changed.notify_all()
+
+    def _on_new_bar(self, code: str, buf: Deque[dict]):
+        # 직전 봉 마감 + 새 봉의 거래량 기준값 갱신
+        recent = list(buf)[-20:]
+        self._avg_vol[code] = (sum(b["candle_acc_trade_volume"] for b in recent) / len(recent)) if recent else 0.0
+        if buf:
+            self._mark_dirty(code)
+
+    def _check_spike(self, code: str, bar: dict):
+        avg = self._avg_vol.get(code) or 0.0
+        ts = bar["candle_date_time_utc"]
+        if avg > 0 and bar["candle_acc_trade_volume"] >= self.volume_spike_x * avg and self._spiked.get(code) != ts:
+            self._spiked[code] = ts
+            self._mark_dirty(code)
+
+    def _check_move(self, code: str, price: float):
+        ref = self._ref.get(code)
+        if ref and ref > 0 and abs(price - ref) / ref * 100 >= self.price_move_pct:
+            self._mark_dirty(code)
+
+    def wait_dirty(self, timeout: float) -> set:
+        # 변화가 생긴 market 목록을 가져가고 비운다 (없으면 timeout 까지 대기)
+        with self._changed:
+            if not self._dirty:
+                self._changed.wait(timeout=max(0.0, timeout))
+            out, self._dirty = self._dirty, set()
+            return out
+
+    # ---- read ------------------------------------------------------------
+
+    def tickers(self, markets: Iterable[str]) -> List[dict]:
+        with self._lock:
+            return [self._tickers[m] for m in markets if m in self._tickers]
+
+    def orderbooks(self, markets: Iterable[str]) -> List[dict]:
+        with self._lock:
+            return [self._orderbooks[m] for m in markets if m in self._orderbooks]
+
+    def seed_candles(self, market: str, unit: int, cds: List[dict]):
+        # REST 분봉(oldest first)으로 초기 이력을 채운다.
+        # 구독 시작 직후 trade로 만든 봉은 앞부분 체결이 빠져 있으므로 REST 봉을 우선하고,
+        # REST의 마지막(형성 중) 봉과 겹치면 고가/저가/종가만 합친다.
+        if not cds:
+            return
+        key = (market, int(unit))
+        with self._lock:
+            buf = self._bars.get(key)
+            built = {b["candle_date_time_utc"]: b for b in (buf or [])}
+            merged = [dict(c) for c in cds]
+            last = merged[-1]
+            b = built.get(last["candle_date_time_utc"])
+            if b is not None:
+                last["high_price"] = max(float(last["high_price"]), b["high_price"])
+                last["low_price"] = min(float(last["low_price"]), b["low_price"])
+                last["trade_price"] = b["trade_price"]
+            merged += [b for ts, b in sorted(built.items()) if ts > last["candle_date_time_utc"]]
+            self._bars[key] = deque(merged, maxlen=self.max_bars)
+            self._stale.discard(key)
+
+    def candles(self, market: str, unit: int, count: int = 60) -> Optional[List[dict]]:
+        # 충분한 이력이 없거나 빠진 봉이 있을 수 있으면 None (REST로 seed 필요)
+        with self._lock:
+            key = (market, int(unit))
+            buf = self._bars.get(key)
+            if not buf or len(buf) < count or key in self._stale:
+                return None
+            return [dict(b) for b in list(buf)[-count:]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connected": self.connected,
+                "messages": self.messages,
+                "reconnects": self.reconnects,
+                "tickers": len(self._tickers),
+                "orderbooks": len(self._orderbooks),
+                "candle_series": len(self._bars),
+                "stale_series": len(self._stale),
+                "dirty_pending": len(self._dirty),
+                "dirty_marked": self.dirty_marked,
+                "last_message_age_sec": round(time.time() - self.last_message_at, 1) if self.last_message_at else None,
+            }
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from upbit_public import market_all
+
+# KRW market 목록은 거의 바뀌지 않으므로 scan 마다 받지 않는다.
+META_TTL_SEC = float(os.getenv("MARKET_META_TTL_SEC", "600"))
+META_RETRY_SEC = 30.0
+
+
+def is_caution(m: dict) -> bool:
+    # isDetails=true 응답: 예전 market_warning ("NONE"/"CAUTION") 과
+    # market_event.warning(유의 종목) / market_event.caution(주의 항목별 bool) 을 모두 본다
+    if str(m.get("market_warning") or "").upper() == "CAUTION":
+        return True
+    ev = m.get("market_event") or {}
+    if ev.get("warning"):
+        return True
+    caution = ev.get("caution") or {}
+    return any(bool(v) for v in caution.values()) if isinstance(caution, dict) else bool(caution)
+
+
+# market/all(isDetails=true) 결과를 TTL 동안 보관하고 background thread 가 미리 갱신한다.
+# 갱신에 실패하면 이전 목록을 계속 쓴다 (한 번도 받지 못했을 때만 예외).
+class MarketMetaCache:
+    def __init__(
+        self,
+        fetch: Callable[..., List[dict]] = market_all,
+        ttl: float = META_TTL_SEC,
+        quote: str = "KRW",
+    ):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.prefix = f"{quote}-"
+        self._lock = threading.Lock()
+        self._markets: Optional[List[dict]] = None
+        self._fetched_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # metrics
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.stale_served = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-meta", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            age = time.monotonic() - self._fetched_at
+            if self._markets is None or age >= self.ttl * 0.9:
+                ok = self.refresh()
+                wait = self.ttl * 0.9 if ok else META_RETRY_SEC
+            else:
+                wait = self.ttl * 0.9 - age
+            self._stop.wait(max(1.0, wait))
+
+    def refresh(self) -> bool:
+        try:
+            items = self._fetch(is_details=True)
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+                self.last_error = str(e)
+            return False
+        items = [m for m in items if m.get("market", "").startswith(self.prefix)]
+        with self._lock:
+            self._markets = items
+            self._fetched_at = time.monotonic()
+            self.refreshes += 1
+            self.last_error = None
+        return True
+
+    def markets(self) -> List[dict]:
+        with self._lock:
+            cached = self._markets
+            fresh = cached is not None and time.monotonic() - self._fetched_at < self.ttl
+        if fresh:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        if not self.refresh():
+            if cached is None:
+                raise RuntimeError(f"market list unavailable: {self.last_error}")
+            self.stale_served += 1
+            return cached
+        return self._markets
+
+    def split(self, names: List[str] | None = None) -> tuple[List[str], List[str]]:
+        # (정상, 유의/주의) market 이름. names 가 주어지면 그 안에서만 나눈다.
+        items = self.markets()
+        if names is not None:
+            by_name: Dict[str, dict] = {m["market"]: m for m in items}
+            items = [by_name.get(n) or {"market": n} for n in names]
+        ok, caution = [], []
+        for m in items:
+            (caution if is_caution(m) else ok).append(m["market"])
+        return ok, caution
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "markets": len(self._markets or []),
+                "age_sec": round(time.monotonic() - self._fetched_at, 1) if self._markets is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "stale_served": self.stale_served,
+                "last_error": self.last_error,
+            }
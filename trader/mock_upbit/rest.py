@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+# Upbit quotation REST stand-in (stdlib only). 합성(synthetic) 또는 녹화(fixture) 시세를 준다.
+#   cd trader && python -m mock_upbit.rest --markets 150 --port 8091 --latency-ms 30 --rate-per-sec 10
+#   cd trader && python -m mock_upbit.rest --fixture fixtures/upbit.json --ws-port 8765
+#   cd trader && python -m mock_upbit.rest --record fixtures/upbit.json     (실제 Upbit 에서 녹화)
+#   UPBIT_BASE_URL=http://127.0.0.1:8091 UPBIT_WS_URL=ws://127.0.0.1:8765/websocket/v1
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+
+def _noise(*key) -> float:
+    # key 에 대해 결정적인 [-1, 1) 값
+    return (zlib.crc32(repr(key).encode()) / 0xFFFFFFFF) * 2.0 - 1.0
+
+
+def _parse_to(ts: str) -> float:
+    return datetime.fromisoformat(ts.rstrip("Z")).replace(tzinfo=timezone.utc).timestamp()
+
+
+class SyntheticMarket:
+    def __init__(self, n_markets: int = 150, now=time.time):
+        self.now = now
+        self.markets = [f"KRW-M{i:03d}" for i in range(n_markets)]
+        self.base = {m: 10 ** (1 + (i % 5)) * (1.0 + 0.01 * i) for i, m in enumerate(self.markets)}
+
+    def market_info(self, market: str, details: bool = False) -> dict:
+        out = {"market": market, "korean_name": market, "english_name": market}
+        if details:
+            # 25 개 중 하나는 유의(CAUTION) market
+            caution = self.markets.index(market) % 25 == 24
+            out["market_warning"] = "CAUTION" if caution else "NONE"
+            out["market_event"] = {"warning": caution, "caution": {"PRICE_FLUCTUATIONS": False}}
+        return out
+
+    def price(self, market: str, minute: int) -> float:
+        b = self.base[market]
+        phase = _noise(market, "phase") * math.pi
+        return b * (1.0 + 0.02 * math.sin(minute / 37.0 + phase) + 0.004 * _noise(market, minute))
+
+    def candle(self, market: str, unit: int, idx: int, forming: bool = False) -> dict:
+        m0 = idx * unit
+        prices = [self.price(market, m0 + k) for k in range(unit)]
+        close = prices[-1]
+        if forming:
+            close = self.price(market, m0 + unit - 1) * (1.0 + 0.001 * _noise(market, int(self.now())))
+        hi = max(prices + [close]) * (1.0 + 0.001 * abs(_noise(market, idx, "h")))
+        lo = min(prices + [close]) * (1.0 - 0.001 * abs(_noise(market, idx, "l")))
+        vol = 10.0 + 5.0 * _noise(market, idx, "v")
+        ts = datetime.fromtimestamp(m0 * 60, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        return {
+            "market": market,
+            "candle_date_time_utc": ts,
+            "candle_date_time_kst": ts,
+            "opening_price": prices[0],
+            "high_price": hi,
+            "low_price": lo,
+            "trade_price": close,
+            "timestamp": int(self.now() * 1000),
+            "candle_acc_trade_price": vol * close,
+            "candle_acc_trade_volume": vol,
+            "unit": unit,
+        }
+
+    def candles(self, market: str, unit: int, count: int, to: str | None = None) -> List[dict]:
+        cur = int(self.now() // 60) // unit
+        if to:
+            # to 이전(exclusive) 의 마감된 봉
+            end = int(_parse_to(to) // 60) // unit
+            if end <= cur:
+                return [self.candle(market, unit, end - 1 - k) for k in range(count)]
+        return [self.candle(market, unit, cur - k, forming=(k == 0)) for k in range(count)]
+
+    def ticker(self, market: str) -> dict:
+        i = self.markets.index(market)
+        last = self.candles(market, 1, 1)[0]["trade_price"]
+        return {
+            "market": market,
+            "trade_price": last,
+            "acc_trade_price_24h": 5e8 * (1 + (i % 20)),
+            "timestamp": int(self.now() * 1000),
+        }
+
+    def orderbook(self, market: str) -> dict:
+        last = self.ticker(market)["trade_price"]
+        spread = 0.0002 + 0.0001 * abs(_noise(market, "spread"))
+        return {
+            "market": market,
+            "timestamp": int(self.now() * 1000),
+            "orderbook_units": [{"ask_price": last * (1 + spread), "bid_price": last, "ask_size": 1.0, "bid_size": 1.0}],
+        }
+
+    def ws_messages(self, minutes: int = 5, trades_per_minute: int = 6) -> List[dict]:
+        # ws_replay 용 ticker/orderbook/trade 메시지 (현재 시각 이전 minutes 분)
+        out = []
+        start = int(self.now() // 60) - minutes
+        for minute in range(start, start + minutes):
+            for k in range(trades_per_minute):
+                ts = (minute * 60 + k * 60 // trades_per_minute) * 1000
+                for m in self.markets:
+                    p = self.price(m, minute) * (1.0 + 0.001 * _noise(m, minute, k))
+                    vol = 1.0 + abs(_noise(m, minute, k, "v"))
+                    out.append({"type": "trade", "code": m, "timestamp": ts, "trade_timestamp": ts,
+                                "trade_price": p, "trade_volume": vol})
+                    if k == trades_per_minute - 1:
+                        i = self.markets.index(m)
+                        out.append({"type": "ticker", "code": m, "timestamp": ts, "trade_price": p,
+                                    "acc_trade_price_24h": 5e8 * (1 + (i % 20))})
+                        spread = 0.0002 + 0.0001 * abs(_noise(m, "spread"))
+                        out.append({"type": "orderbook", "code": m, "timestamp": ts, "orderbook_units": [
+                            {"ask_price": p * (1 + spread), "bid_price": p, "ask_size": 1.0, "bid_size": 1.0}]})
+        return out
+
+
+class FixtureMarket:
+    # 녹화된 응답을 그대로 돌려준다. candles 는 Upbit 와 같은 newest first.
+    # {"markets": [...market/all isDetails...], "ticker": [...], "orderbook": [...],
+    #  "candles": {"1": {"KRW-BTC": [...]}, ...}}
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.info = {m["market"]: m for m in data["markets"]}
+        self.markets = list(self.info)
+        self.base = self.info
+        self._ticker = {x["market"]: x for x in data.get("ticker", [])}
+        self._orderbook = {x["market"]: x for x in data.get("orderbook", [])}
+        self._candles = {int(u): v for u, v in data.get("candles", {}).items()}
+
+    def market_info(self, market: str, details: bool = False) -> dict:
+        m = self.info[market]
+        if details:
+            return m
+        return {k: v for k, v in m.items() if k in ("market", "korean_name", "english_name")}
+
+    def ticker(self, market: str) -> dict:
+        return self._ticker[market]
+
+    def orderbook(self, market: str) -> dict:
+        return self._orderbook[market]
+
+    def candles(self, market: str, unit: int, count: int, to: str | None = None) -> List[dict]:
+        cds = self._candles.get(unit, {}).get(market, [])
+        if to:
+            end = _parse_to(to)
+            cds = [c for c in cds if _parse_to(c["candle_date_time_utc"]) < end]
+        return cds[:count]
+
+
+def record_fixture(path: str, units=(1,), count: int = 200, limit: int | None = None):
+    # 실제 Upbit(upbit_public.BASE)에서 현재 KRW 시세를 받아 fixture 로 저장
+    import upbit_public
+
+    markets = [m for m in upbit_public.market_all(is_details=True) if m["market"].startswith("KRW-")][:limit]
+    names = [m["market"] for m in markets]
+    tks, obs = [], []
+    for i in range(0, len(names), 100):
+        tks += upbit_public.ticker(names[i : i + 100])
+        obs += upbit_public.orderbook(names[i : i + 100])
+    candles = {str(u): {m: upbit_public.candles_minutes(m, u, count=count) for m in names} for u in units}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"markets": markets, "ticker": tks, "orderbook": obs, "candles": candles}, f, ensure_ascii=False)
+
+
+class MockUpbitServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        addr,
+        market,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_per_sec: int | None = None,
+        fail_429_ratio: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(addr, _Handler)
+        self.market = market
+        # 요청마다 latency_ms + U(0, jitter_ms) 지연
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # group 별 초당 허용 요청 수 (Remaining-Req 헤더, 초과 시 429). None 이면 제한 없음
+        self.rate_per_sec = rate_per_sec
+        # 제한과 별개로 무작위 429 를 섞는 비율
+        self.fail_429_ratio = fail_429_ratio
+        self._rnd = random.Random(seed)
+        self._window: Dict[str, tuple[int, int]] = {}
+        self.counts: Dict[str, int] = {}
+        self.throttled: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, group: str):
+        with self._lock:
+            self.counts[group] = self.counts.get(group, 0) + 1
+
+    def admit(self, group: str) -> tuple[bool, str, float]:
+        # (허용 여부, Remaining-Req 헤더, 지연 초)
+        with self._lock:
+            sec = int(time.time())
+            win_sec, used = self._window.get(group, (sec, 0))
+            if win_sec != sec:
+                used = 0
+            limit = self.rate_per_sec if self.rate_per_sec is not None else 10**6
+            ok = used < limit and not (self.fail_429_ratio > 0 and self._rnd.random() < self.fail_429_ratio)
+            if ok:
+                used += 1
+            else:
+                self.throttled[group] = self.throttled.get(group, 0) + 1
+            self._window[group] = (sec, used)
+            delay = (self.latency_ms + self._rnd.uniform(0, self.jitter_ms)) / 1000.0
+        return ok, f"group={group}; min={limit * 60}; sec={max(0, limit - used)}", delay
+
+    def reset_counts(self) -> Dict[str, int]:
+        with self._lock:
+            out, self.counts = self.counts, {}
+            self.throttled = {}
+            return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, body, headers: Dict[str, str] | None = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        srv: MockUpbitServer = self.server
+        mk = srv.market
+        u = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(u.query).items()}
+        if u.path == "/v1/market/all":
+            group = "market"
+        elif u.path in ("/v1/ticker", "/v1/orderbook"):
+            group = u.path.rsplit("/", 1)[-1]
+        elif u.path.startswith("/v1/candles/minutes/"):
+            group = "candles"
+        else:
+            return self._send(404, {"error": {"name": "not_found", "message": u.path}})
+
+        srv.count(group)
+        ok, remaining, delay = srv.admit(group)
+        if delay > 0:
+            time.sleep(delay)
+        headers = {"Remaining-Req": remaining}
+        if not ok:
+            return self._send(429, {"error": {"name": "too_many_requests", "message": "Too many API requests."}}, headers)
+
+        if group == "market":
+            details = q.get("isDetails", "false").lower() == "true"
+            return self._send(200, [mk.market_info(m, details) for m in mk.markets], headers)
+        if group in ("ticker", "orderbook"):
+            names = [m for m in q.get("markets", "").split(",") if m in mk.base]
+            fn = mk.ticker if group == "ticker" else mk.orderbook
+            return self._send(200, [fn(m) for m in names], headers)
+        unit = int(u.path.rsplit("/", 1)[-1])
+        market = q.get("market")
+        if market not in mk.base:
+            return self._send(404, {"error": {"name": "not_found", "message": "market"}}, headers)
+        return self._send(200, mk.candles(market, unit, min(200, int(q.get("count", 1))), to=q.get("to")), headers)
+
+
+def serve(n_markets: int = 150, host: str = "127.0.0.1", port: int = 0, market=None, **kw) -> MockUpbitServer:
+    srv = MockUpbitServer((host, port), market or SyntheticMarket(n_markets), **kw)
+    threading.Thread(target=srv.serve_forever, name="mock-upbit", daemon=True).start()
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--markets", type=int, default=150)
+    ap.add_argument("--fixture", help="녹화된 fixture JSON (없으면 synthetic)")
+    ap.add_argument("--record", help="실제 Upbit 에서 fixture 를 녹화해 저장하고 종료")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8091)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--rate-per-sec", type=int, default=None)
+    ap.add_argument("--fail-429", type=float, default=0.0)
+    ap.add_argument("--ws-port", type=int, default=None, help="synthetic WebSocket 재생 (synthetic 모드만)")
+    args = ap.parse_args()
+
+    if args.record:
+        record_fixture(args.record)
+        print(f"recorded {args.record}")
+        return
+
+    market = FixtureMarket(args.fixture) if args.fixture else SyntheticMarket(args.markets)
+    srv = MockUpbitServer(
+        (args.host, args.port),
+        market,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_per_sec=args.rate_per_sec,
+        fail_429_ratio=args.fail_429,
+    )
+    if args.ws_port is not None and isinstance(market, SyntheticMarket):
+        from mock_upbit.ws_replay import serve as serve_ws
+
+        ws = serve_ws(market.ws_messages(), host=args.host, port=args.ws_port)
+        print(f"mock upbit websocket on {ws.url}")
+    print(f"mock upbit on {srv.url} ({len(market.markets)} markets)")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+# 녹화된 Upbit WebSocket 메시지(NDJSON)를 재생하는 로컬 stand-in 서버 (stdlib only).
+#   cd trader && python -m mock_upbit.ws_replay --file recorded.ndjson --port 8765
+#   UPBIT_WS_URL=ws://127.0.0.1:8765/websocket/v1
+# 녹화는 MarketFeed(record_path=...)로 한다.
+
+import argparse
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import time
+from typing import List, Optional
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+
+
+def encode_frame(payload: bytes, opcode: int = 0x2) -> bytes:
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    if n < 126:
+        head += bytes([n])
+    elif n < 65536:
+        head += bytes([126]) + struct.pack("!H", n)
+    else:
+        head += bytes([127]) + struct.pack("!Q", n)
+    return head + payload
+
+
+def read_frame(rfile) -> Optional[tuple[int, bytes]]:
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None
+    opcode = head[0] & 0x0F
+    masked = head[1] & 0x80
+    n = head[1] & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", rfile.read(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", rfile.read(8))[0]
+    mask = rfile.read(4) if masked else b""
+    data = rfile.read(n)
+    if masked:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return opcode, data
+
+
+def load_messages(path: str) -> List[dict]:
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                out.append(json.loads(line))
+    return out
+
+
+class ReplayServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, addr, messages: List[dict], speed: float = 0.0, loop: bool = False):
+        super().__init__(addr, _Handler)
+        self.messages = messages
+        # speed=0 => 지연 없이 전송, 1.0 => 녹화 당시 간격 그대로
+        self.speed = speed
+        self.loop = loop
+        self.sent = 0
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}/websocket/v1"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        srv: ReplayServer = self.server
+        headers = {}
+        self.rfile.readline()
+        while True:
+            line = self.rfile.readline().decode("latin-1").strip()
+            if not line:
+                break
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            self.wfile.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return
+        self.wfile.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {_accept_key(key)}\r\n\r\n"
+            ).encode()
+        )
+        srv.connections += 1
+
+        # 첫 프레임 = 구독 요청. codes 로 재생 대상을 거른다.
+        codes = None
+        frame = read_frame(self.rfile)
+        if frame is None:
+            return
+        try:
+            for item in json.loads(frame[1].decode("utf-8")):
+                if isinstance(item, dict) and "codes" in item:
+                    codes = set(item["codes"]) if codes is None else codes | set(item["codes"])
+        except ValueError:
+            pass
+
+        # 클라이언트 ping/close 처리
+        closed = threading.Event()
+        wlock = threading.Lock()
+
+        def send(data: bytes, opcode: int = 0x2):
+            with wlock:
+                self.wfile.write(encode_frame(data, opcode=opcode))
+
+        def reader():
+            while not closed.is_set():
+                fr = read_frame(self.rfile)
+                if fr is None or fr[0] == 0x8:
+                    closed.set()
+                    return
+                if fr[0] == 0x9:
+                    send(fr[1], opcode=0xA)
+
+        threading.Thread(target=reader, daemon=True).start()
+        try:
+            while not closed.is_set():
+                prev_ts = None
+                for msg in srv.messages:
+                    if closed.is_set():
+                        return
+                    if codes is not None and msg.get("code") not in codes:
+                        continue
+                    ts = msg.get("timestamp")
+                    if srv.speed > 0 and prev_ts is not None and ts is not None:
+                        time.sleep(max(0.0, (ts - prev_ts) / 1000.0 / srv.speed))
+                    prev_ts = ts
+                    send(json.dumps(msg, ensure_ascii=False).encode("utf-8"))
+                    srv.sent += 1
+                if not srv.loop:
+                    break
+            # 재생이 끝나도 연결은 유지 (클라이언트가 닫을 때까지)
+            closed.wait()
+        except (BrokenPipeError, ConnectionResetError):
+            closed.set()
+
+
+def serve(messages: List[dict], host: str = "127.0.0.1", port: int = 0, speed: float = 0.0, loop: bool = False) -> ReplayServer:
+    srv = ReplayServer((host, port), messages, speed=speed, loop=loop)
+    threading.Thread(target=srv.serve_forever, name="ws-replay", daemon=True).start()
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--file", required=True)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--speed", type=float, default=1.0)
+    ap.add_argument("--loop", action="store_true")
+    args = ap.parse_args()
+    srv = ReplayServer((args.host, args.port), load_messages(args.file), speed=args.speed, loop=args.loop)
+    print(f"replaying {len(srv.messages)} messages on {srv.url}")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ PRESET = {
         "min_krw_volume_24h": 800_000_000,
         "max_spread_bp": 80,
         "max_positions": 6,
+        "candle_concurrency": 8,
+        "exclude_caution": True,
     },
     "risk": {
         "daily_loss_limit_pct": 6.0,
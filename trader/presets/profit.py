@@ -7,6 +7,8 @@ PRESET = {
         "min_krw_volume_24h": 1_200_000_000,
         "max_spread_bp": 60,
         "max_positions": 4,
+        "candle_concurrency": 8,
+        "exclude_caution": True,
     },
     "risk": {
         "daily_loss_limit_pct": 3.5,
@@ -7,6 +7,8 @@ PRESET = {
         "min_krw_volume_24h": 3_000_000_000,
         "max_spread_bp": 30,
         "max_positions": 2,
+        "candle_concurrency": 8,
+        "exclude_caution": True,
     },
     "risk": {
         "daily_loss_limit_pct": 1.0,
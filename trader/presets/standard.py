@@ -7,6 +7,8 @@ PRESET = {
         "min_krw_volume_24h": 2_000_000_000,
         "max_spread_bp": 40,
         "max_positions": 3,
+        "candle_concurrency": 8,
+        "exclude_caution": True,
     },
     "risk": {
         "daily_loss_limit_pct": 2.0,
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 
 def clamp01(x: float) -> float:
@@ -9,9 +11,9 @@ def clamp01(x: float) -> float:
 
 def score_a(st: Dict) -> float:
     # 거래대금 + 돌파
-    vol = st.get("acc_trade_price_24h", 0.0)
+    vol = st.get("acc_trade_price_24h") or 0.0
     vol_s = clamp01(vol / 6_000_000_000)
-    breakout = st.get("breakout_pct", 0.0)
+    breakout = st.get("breakout_pct") or 0.0
     brk_s = clamp01(breakout / 1.0)  # 1% 기준
     return clamp01(0.65 * vol_s + 0.35 * brk_s)
 
@@ -41,12 +43,105 @@ def score_c(st: Dict) -> float:
     return clamp01(vol_s)
 
 
+# ---- batch (columnar) ------------------------------------------------------
+# features: {"acc_trade_price_24h": array, "ema20": array, ...}, 값이 없으면 NaN (scalar 의 None)
+# scalar 함수와 같은 연산 순서를 유지해서 결과가 bit 단위로 같다.
+
+
+def clamp01_batch(x: np.ndarray) -> np.ndarray:
+    return np.where(x < 0, 0.0, np.where(x > 1.0, 1.0, x))
+
+
+def _truthy(x: np.ndarray) -> np.ndarray:
+    # scalar 의 `if x:` (None/0 => False)
+    return ~np.isnan(x) & (x != 0)
+
+
+def score_a_batch(f: Dict[str, np.ndarray]) -> np.ndarray:
+    vol = np.nan_to_num(f["acc_trade_price_24h"], nan=0.0)
+    breakout = np.nan_to_num(f["breakout_pct"], nan=0.0)
+    vol_s = clamp01_batch(vol / 6_000_000_000)
+    brk_s = clamp01_batch(breakout / 1.0)
+    return clamp01_batch(0.65 * vol_s + 0.35 * brk_s)
+
+
+def score_b_batch(f: Dict[str, np.ndarray]) -> np.ndarray:
+    ema20, ema50, rsi14 = f["ema20"], f["ema50"], f["rsi14"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend = np.where(
+            _truthy(ema20) & _truthy(ema50) & (ema50 > 0),
+            clamp01_batch((ema20 - ema50) / ema50 * 25),
+            0.0,
+        )
+    rsi_s = np.where(np.isnan(rsi14), 0.0, 1.0 - clamp01_batch(np.abs(rsi14 - 50) / 25))
+    return clamp01_batch(0.6 * trend + 0.4 * rsi_s)
+
+
+def score_c_batch(f: Dict[str, np.ndarray]) -> np.ndarray:
+    atr14, last = f["atr14"], f["last"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_s = clamp01_batch((atr14 / last) * 120)
+    return np.where(_truthy(atr14) & _truthy(last) & (last > 0), clamp01_batch(vol_s), 0.0)
+
+
+ScalarFn = Callable[[Dict], float]
+BatchFn = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+# model 이름 -> (scalar, batch, 필요한 feature)
+MODELS: Dict[str, Tuple[ScalarFn, Optional[BatchFn], Tuple[str, ...]]] = {}
+DEFAULT_MODEL = "SCORE_A"
+
+
+def register_model(name: str, scalar: ScalarFn, batch: Optional[BatchFn] = None, fields: Iterable[str] = ()):
+    # batch 가 없으면 compute_batch 는 row 마다 scalar 를 호출한다
+    MODELS[name.upper()] = (scalar, batch, tuple(fields))
+
+
+register_model("SCORE_A", score_a, score_a_batch, ("acc_trade_price_24h", "breakout_pct"))
+register_model("SCORE_B", score_b, score_b_batch, ("ema20", "ema50", "rsi14"))
+register_model("SCORE_C", score_c, score_c_batch, ("atr14", "last"))
+
+
+def _model(model: str):
+    return MODELS.get((model or DEFAULT_MODEL).upper()) or MODELS[DEFAULT_MODEL]
+
+
 def compute(model: str, st: Dict) -> float:
-    m = (model or "SCORE_A").upper()
-    if m == "SCORE_A":
-        return score_a(st)
-    if m == "SCORE_B":
-        return score_b(st)
-    if m == "SCORE_C":
-        return score_c(st)
-    return score_a(st)
+    return _model(model)[0](st)
+
+
+def columns(rows: List[Dict], keys: Iterable[str]) -> Dict[str, np.ndarray]:
+    # list[dict] -> 열 배열 (None => NaN)
+    return {k: np.array([np.nan if r.get(k) is None else r[k] for r in rows], dtype=np.float64) for k in keys}
+
+
+def compute_batch(model: str, features: Dict[str, np.ndarray]) -> np.ndarray:
+    scalar, batch, fields = _model(model)
+    if batch is not None:
+        return batch(features)
+    n = len(next(iter(features.values()))) if features else 0
+    keys = list(features)
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = scalar({k: (None if features[k][i] != features[k][i] else float(features[k][i])) for k in keys})
+    return out
+
+
+def model_fields(model: str) -> Tuple[str, ...]:
+    return _model(model)[2]
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # 점수 내림차순 상위 k 개의 index. 동점은 입력 순서 (list.sort(reverse=True) 와 같은 순서)
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        idx = np.concatenate((above, ties))
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
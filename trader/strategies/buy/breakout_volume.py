@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 from ..base import Signal, StrategyResult, OrderIntent
 
 
@@ -49,3 +51,22 @@ def evaluate(st: dict, cfg: dict) -> StrategyResult:
             "threshold_pct": threshold * 100,
         },
     )
+
+
+def evaluate_batch(f: dict, cfg: dict) -> np.ndarray:
+    # evaluate() 가 BUY 를 낼 row 의 mask (NaN = None)
+    strict = cfg.get("buy", {}).get("strictness", 0.6)
+    min_score = cfg.get("buy", {}).get("min_score", 0.55)
+    last, prev_high = f["last"], f["prev_high"]
+    vol_norm = np.minimum(1.0, np.nan_to_num(f["acc_trade_price_24h"], nan=0.0) / 5_000_000_000)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakout = (last - prev_high) / prev_high
+    threshold = 0.002 + (0.004 * strict)
+    return (
+        ~np.isnan(prev_high)
+        & (prev_high != 0)
+        & (last > 0)
+        & (breakout >= threshold)
+        & (vol_norm >= (0.35 + 0.25 * strict))
+        & (np.nan_to_num(f["score"], nan=0.0) >= min_score)
+    )
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 from ..base import Signal, StrategyResult, OrderIntent
 
 
@@ -55,3 +57,21 @@ def evaluate(st: dict, cfg: dict) -> StrategyResult:
             "score": score,
         },
     )
+
+
+def evaluate_batch(f: dict, cfg: dict) -> np.ndarray:
+    # evaluate() 가 BUY 를 낼 row 의 mask (NaN = None)
+    strict = cfg.get("buy", {}).get("strictness", 0.6)
+    min_score = cfg.get("buy", {}).get("min_score", 0.55)
+    last, ema20, ema50, rsi14 = f["last"], f["ema20"], f["ema50"], f["rsi14"]
+    ok = (np.nan_to_num(ema20) != 0) & (np.nan_to_num(ema50) != 0) & (np.nan_to_num(rsi14) != 0) & (last > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pullback = np.abs(last - ema20) / ema20
+    pull_th = 0.002 + 0.006 * (1.0 - strict)
+    return (
+        ok
+        & (ema20 > ema50)
+        & (pullback <= pull_th)
+        & (rsi14 >= (45 + 10 * strict))
+        & (np.nan_to_num(f["score"], nan=0.0) >= min_score)
+    )
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 from ..base import Signal, StrategyResult, OrderIntent
 
 
@@ -42,3 +44,14 @@ def evaluate(st: dict, cfg: dict) -> StrategyResult:
         "rsi_momentum_not_met",
         {"symbol": symbol, "last": last, "rsi14": rsi14, "low_th": low_th, "high_th": high_th, "score": score},
     )
+
+
+def evaluate_batch(f: dict, cfg: dict) -> np.ndarray:
+    # evaluate() 가 BUY 를 낼 row 의 mask (NaN = None)
+    strict = cfg.get("buy", {}).get("strictness", 0.6)
+    min_score = cfg.get("buy", {}).get("min_score", 0.55)
+    rsi14 = f["rsi14"]
+    low_th = 32 + int(10 * strict)
+    high_th = 58 + int(10 * strict)
+    ok = ~np.isnan(rsi14) & (f["last"] > 0) & (np.nan_to_num(f["score"], nan=0.0) >= min_score)
+    return ok & ((rsi14 <= low_th) | (rsi14 >= high_th))
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 from ..base import Signal, StrategyResult, OrderIntent
 
 
@@ -51,3 +53,13 @@ def evaluate(st: dict, cfg: dict) -> StrategyResult:
             "score": score,
         },
     )
+
+
+def evaluate_batch(f: dict, cfg: dict) -> np.ndarray:
+    # evaluate() 가 BUY 를 낼 row 의 mask (NaN = None)
+    strict = cfg.get("buy", {}).get("strictness", 0.6)
+    min_score = cfg.get("buy", {}).get("min_score", 0.55)
+    last, atr14, prev_close = f["last"], f["atr14"], f["prev_close"]
+    ok = (np.nan_to_num(atr14) != 0) & (np.nan_to_num(prev_close) != 0) & (last > 0)
+    k = 0.35 + 0.35 * strict
+    return ok & ((last - prev_close) >= atr14 * k) & (np.nan_to_num(f["score"], nan=0.0) >= min_score)
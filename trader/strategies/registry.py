@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Callable, Dict
+from typing import Callable, Dict, List
+
+import numpy as np
 
 from .base import StrategyResult
-from .buy.breakout_volume import evaluate as buy_breakout_volume
-from .buy.ma_pullback import evaluate as buy_ma_pullback
-from .buy.volatility_breakout import evaluate as buy_volatility_breakout
-from .buy.rsi_momentum import evaluate as buy_rsi_momentum
+from .buy.breakout_volume import evaluate as buy_breakout_volume, evaluate_batch as buy_breakout_volume_batch
+from .buy.ma_pullback import evaluate as buy_ma_pullback, evaluate_batch as buy_ma_pullback_batch
+from .buy.volatility_breakout import evaluate as buy_volatility_breakout, evaluate_batch as buy_volatility_breakout_batch
+from .buy.rsi_momentum import evaluate as buy_rsi_momentum, evaluate_batch as buy_rsi_momentum_batch
 
 BUY_REGISTRY: Dict[str, Callable[..., StrategyResult]] = {
     "breakout_volume": buy_breakout_volume,
@@ -15,6 +17,17 @@ BUY_REGISTRY: Dict[str, Callable[..., StrategyResult]] = {
     "rsi_momentum": buy_rsi_momentum,
 }
 
+# features(열 배열) -> BUY mask. evidence 는 BUY row 에 대해서만 eval_buy 로 만든다.
+BUY_BATCH_REGISTRY: Dict[str, Callable[[Dict[str, np.ndarray], dict], np.ndarray]] = {
+    "breakout_volume": buy_breakout_volume_batch,
+    "ma_pullback": buy_ma_pullback_batch,
+    "volatility_breakout": buy_volatility_breakout_batch,
+    "rsi_momentum": buy_rsi_momentum_batch,
+}
+
+# buy plugin 이 읽는 market_state 키
+BUY_FEATURES = ("score", "last", "prev_high", "prev_close", "acc_trade_price_24h", "ema20", "ema50", "rsi14", "atr14")
+
 
 def eval_buy(name: str, market_state: dict, cfg: dict) -> StrategyResult:
     fn = BUY_REGISTRY.get(name)
@@ -23,3 +36,30 @@ def eval_buy(name: str, market_state: dict, cfg: dict) -> StrategyResult:
         from .base import Signal
         return StrategyResult(Signal.HOLD, None, f"unknown_plugin:{name}", {"symbol": market_state.get("symbol")})
     return fn(market_state, cfg)
+
+
+def eval_buy_batch(name: str, features: Dict[str, np.ndarray], cfg: dict) -> np.ndarray:
+    fn = BUY_BATCH_REGISTRY.get(name)
+    n = len(features["last"])
+    if fn is not None:
+        return np.asarray(fn(features, cfg), dtype=bool)
+    if name not in BUY_REGISTRY:
+        return np.zeros(n, dtype=bool)
+    # batch 버전이 없는 plugin 은 row 마다 scalar
+    keys = list(features)
+    rows = [{k: (None if features[k][i] != features[k][i] else float(features[k][i])) for k in keys} for i in range(n)]
+    return np.array([eval_buy(name, dict(r, symbol=None), cfg).signal == "BUY" for r in rows], dtype=bool)
+
+
+def first_buy(plugins: List[str], features: Dict[str, np.ndarray], cfg: dict) -> tuple[int, str] | None:
+    # 순위(row) 순서 -> plugin 순서로 처음 BUY 인 (row, plugin). evaluate_buy 의 이중 loop 와 같은 순서
+    n = len(features["last"])
+    if n == 0 or not plugins:
+        return None
+    masks = np.array([eval_buy_batch(p, features, cfg) for p in plugins])
+    hit = masks.any(axis=0)
+    if not hit.any():
+        return None
+    row = int(np.argmax(hit))
+    return row, plugins[int(np.argmax(masks[:, row]))]
+
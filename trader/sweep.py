@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+# preset 파라미터 sweep (backtest.simulate 를 process pool 로 병렬 실행)
+#   cd trader && python sweep.py --spec sweep.json --start 2025-01-01 --end 2025-07-01 --out sweep_out --workers 8
+#
+# spec (key 는 점 표기, 값은 deep_merge 하는 overrides 와 같은 모양으로 바뀐다):
+#   {"preset": "STANDARD",
+#    "grid":   {"buy.strictness": [0.4, 0.6, 0.8], "sell.tp_pct": [1.5, 2.2, 3.0]},
+#    "random": {"buy.min_score": [0.4, 0.7], "scanner.top_n": [5, 20]},   # [lo, hi], 둘 다 int 면 정수
+#    "samples": 50, "refine": 20, "seed": 7,
+#    "objective": "pnl_pct", "min_trades": 20}
+# grid 와 random 은 곱으로 합쳐진다. refine 은 상위 결과 주변에서 random 값을 다시 뽑는다.
+# 지표 panel 은 scanner.timeframe (+ feature_engine) 별로 한 번만 만들고 모든 조합이 memmap 으로 같이 읽는다.
+# 결과는 {out}/results.jsonl 에 하나씩 append (중단 후 다시 실행하면 끝난 조합은 건너뜀).
+# {out}/draft.json 은 POST /config/{trader_id}/draft 에 그대로 보낼 수 있다.
+
+import argparse
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from backtest import FeaturePanel, simulate, _unit_from_timeframe
+from candle_archive import ARCHIVE_DIR, CandleArchive
+from presets.loader import load_preset, deep_merge
+
+OBJECTIVES = ("pnl_pct", "calmar", "win_rate")
+
+
+def _nest(flat: Dict[str, object]) -> dict:
+    out: dict = {}
+    for key, v in flat.items():
+        cur = out
+        parts = key.split(".")
+        for p in parts[:-1]:
+            cur = cur.setdefault(p, {})
+        cur[parts[-1]] = v
+    return out
+
+
+def _key(flat: Dict[str, object]) -> str:
+    return json.dumps(flat, sort_keys=True)
+
+
+def _draw(rnd: random.Random, space: Dict[str, list], around: Dict[str, object] | None = None, width: float = 0.15) -> dict:
+    out = {}
+    for k, (lo, hi) in space.items():
+        is_int = isinstance(lo, int) and isinstance(hi, int)
+        if around is not None and k in around:
+            # 이전 값 주변 (범위의 width 만큼)
+            span = (hi - lo) * width
+            lo, hi = max(lo, around[k] - span), min(hi, around[k] + span)
+        if is_int:
+            out[k] = rnd.randint(int(round(lo)), int(round(hi)))
+        else:
+            out[k] = round(rnd.uniform(lo, hi), 4)
+    return out
+
+
+def candidates(spec: dict, rnd: random.Random) -> List[dict]:
+    grid = spec.get("grid") or {}
+    space = spec.get("random") or {}
+    combos = [dict(zip(grid, vals)) for vals in itertools.product(*grid.values())] or [{}]
+    if not space:
+        return combos
+    return [dict(g, **_draw(rnd, space)) for g in combos for _ in range(int(spec.get("samples", 20)))]
+
+
+def score(summary: dict, objective: str, min_trades: int) -> float:
+    if summary.get("trades", 0) < min_trades:
+        return float("-inf")
+    if objective == "calmar":
+        return summary["pnl_pct"] / max(0.5, abs(summary["max_drawdown_pct"]))
+    if objective == "win_rate":
+        return summary.get("win_rate") or 0.0
+    return summary["pnl_pct"]
+
+
+def _run_one(job: dict) -> dict:
+    # worker process: panel 은 memmap 으로 열기만 한다
+    panel = FeaturePanel(job["panel_dir"])
+    cfg = deep_merge(load_preset(job["preset"]), _nest(job["params"]))
+    rep = simulate(panel, cfg, job["capital"], job["fee_bp"], job["slippage_bp"])
+    summary = {k: v for k, v in rep.items() if k not in ("trade_list", "daily_equity")}
+    return {"params": job["params"], "summary": summary}
+
+
+class Sweep:
+    def __init__(self, spec: dict, out_dir: str, markets: List[str], args):
+        self.spec = spec
+        self.markets = markets
+        self.out_dir = out_dir
+        self.args = args
+        self.preset = spec.get("preset", "STANDARD")
+        self.objective = spec.get("objective", "pnl_pct")
+        if self.objective not in OBJECTIVES:
+            raise ValueError(f"unknown objective: {self.objective}")
+        self.min_trades = int(spec.get("min_trades", 1))
+        self.results_path = os.path.join(out_dir, "results.jsonl")
+        self.done: Dict[str, dict] = {}
+        self.panels: Dict[tuple, str] = {}
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    r = json.loads(line)
+                    self.done[_key(r["params"])] = r
+
+    def _panel_for(self, params: dict) -> str:
+        cfg = deep_merge(load_preset(self.preset), _nest(params))
+        unit = _unit_from_timeframe(cfg["scanner"]["timeframe"])
+        # window/batch 는 같은 값 => 같은 panel
+        engine = "stream" if cfg["scanner"].get("feature_engine") == "stream" else "window"
+        if (unit, engine) not in self.panels:
+            a = self.args
+            d = os.path.join(self.out_dir, "panels", f"{unit}m_{engine}")
+            FeaturePanel.build(d, self.markets, unit, a.start_dt, a.end_dt, a.archive, a.archive_unit, a.workers,
+                               feature_engine=engine)
+            self.panels[(unit, engine)] = d
+        return self.panels[(unit, engine)]
+
+    def run(self, params_list: List[dict]):
+        todo = [p for p in params_list if _key(p) not in self.done]
+        # 같은 조합이 여러 번 뽑혀도 한 번만
+        todo = list({_key(p): p for p in todo}.values())
+        print(f"[sweep] {len(todo)} to run, {len(self.done)} done")
+        if not todo:
+            return
+        a = self.args
+        jobs = [
+            {
+                "panel_dir": self._panel_for(p),
+                "preset": self.preset,
+                "params": p,
+                "capital": a.capital,
+                "fee_bp": a.fee_bp,
+                "slippage_bp": a.slippage_bp,
+            }
+            for p in todo
+        ]
+        with ProcessPoolExecutor(max_workers=a.workers) as pool, open(self.results_path, "a", encoding="utf-8") as out:
+            futs = [pool.submit(_run_one, j) for j in jobs]
+            for i, fut in enumerate(as_completed(futs), 1):
+                r = fut.result()
+                r["score"] = score(r["summary"], self.objective, self.min_trades)
+                out.write(json.dumps(r, ensure_ascii=False, default=float) + "\n")
+                out.flush()
+                self.done[_key(r["params"])] = r
+                if i % 10 == 0 or i == len(futs):
+                    print(f"[sweep] {i}/{len(futs)}")
+
+    def ranking(self) -> List[dict]:
+        rows = [dict(r, score=score(r["summary"], self.objective, self.min_trades)) for r in self.done.values()]
+        return sorted(rows, key=lambda r: r["score"], reverse=True)
+
+    def write_outputs(self, top: int = 20):
+        ranked = self.ranking()
+        with open(os.path.join(self.out_dir, "ranking.json"), "w", encoding="utf-8") as f:
+            json.dump(ranked[:top], f, ensure_ascii=False, indent=2, default=float)
+        if not ranked or ranked[0]["score"] == float("-inf"):
+            print("[sweep] no result passed min_trades")
+            return None
+        best = {"preset": self.preset, "overrides": _nest(ranked[0]["params"])}
+        with open(os.path.join(self.out_dir, "draft.json"), "w", encoding="utf-8") as f:
+            json.dump({"config_json": json.dumps(best, ensure_ascii=False)}, f, ensure_ascii=False, indent=2)
+        return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--spec", required=True)
+    ap.add_argument("--start", required=True)
+    ap.add_argument("--end", required=True)
+    ap.add_argument("--out", default="sweep_out")
+    ap.add_argument("--markets", nargs="*")
+    ap.add_argument("--archive", default=ARCHIVE_DIR)
+    ap.add_argument("--archive-unit", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--capital", type=float, default=1_000_000.0)
+    ap.add_argument("--fee-bp", type=float, default=5.0)
+    ap.add_argument("--slippage-bp", type=float, default=0.0)
+    args = ap.parse_args()
+    args.start_dt = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc)
+    args.end_dt = datetime.fromisoformat(args.end).replace(tzinfo=timezone.utc)
+
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+    os.makedirs(args.out, exist_ok=True)
+    markets = args.markets or CandleArchive(args.archive, args.archive_unit).markets()
+    sw = Sweep(spec, args.out, markets, args)
+    sw.load_checkpoint()
+
+    rnd = random.Random(int(spec.get("seed", 7)))
+    sw.run(candidates(spec, rnd))
+
+    refine = int(spec.get("refine", 0))
+    space = spec.get("random") or {}
+    if refine and space:
+        # 상위 3개 주변을 더 촘촘히
+        best = [r["params"] for r in sw.ranking()[:3] if r["score"] != float("-inf")]
+        if best:
+            sw.run([dict(b, **_draw(rnd, space, around=b)) for b in best for _ in range(max(1, refine // len(best)))])
+
+    best = sw.write_outputs()
+    for r in sw.ranking()[:5]:
+        s = r["summary"]
+        print(f"{r['score']:>9.3f}  pnl={s['pnl_pct']:.2f}% dd={s['max_drawdown_pct']:.2f}% trades={s['trades']}  {r['params']}")
+    if best:
+        print(f"[sweep] draft -> {os.path.join(args.out, 'draft.json')}")
+
+
+if __name__ == "__main__":
+    main()
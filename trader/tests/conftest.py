@@ -0,0 +1,5 @@
+import os
+import sys
+
+# trader 모듈은 trader/ 를 기준으로 import 한다 (cd trader && python trader.py 와 같게)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from candle_cache import CandleStore
+
+T0 = datetime(2025, 1, 1, 0, 0, tzinfo=timezone.utc)
+
+
+class _Rest:
+    # minute 봉 n 개 (newest first), 마지막 봉 = now 가 속한 봉
+    def __init__(self):
+        self.now = T0 + timedelta(minutes=59, seconds=10)
+        self.calls = []
+
+    def __call__(self, market, unit, count=60):
+        self.calls.append(count)
+        end = int((self.now - T0).total_seconds() // 60)
+        out = []
+        for m in range(end, end - count, -1):
+            ts = (T0 + timedelta(minutes=m)).strftime("%Y-%m-%dT%H:%M:%S")
+            out.append({"candle_date_time_utc": ts, "high_price": 10.0 + m, "low_price": 5.0, "trade_price": 8.0})
+        return out
+
+
+def test_bar_close_skips_fetch_while_last_bar_is_forming():
+    rest = _Rest()
+    store = CandleStore(fetch=rest, now=lambda: rest.now)
+    store.get("KRW-BTC", 1)
+    assert rest.calls == [60]
+
+    # 같은 봉 안: 요청 없이 마지막 봉만 ticker 가격으로
+    rest.now += timedelta(seconds=30)
+    cds = store.get("KRW-BTC", 1, last_price=200.0)
+    assert rest.calls == [60]
+    assert cds[-1]["trade_price"] == 200.0 and cds[-1]["high_price"] == 200.0 and cds[-1]["low_price"] == 5.0
+    assert store.stats()["skipped_fetches"] == 1
+
+    # 다음 봉이 시작되면 받아오고, 마감된 봉은 REST 값으로 덮인다
+    rest.now += timedelta(seconds=30)
+    cds = store.get("KRW-BTC", 1, last_price=201.0)
+    assert rest.calls == [60, 3]
+    assert cds[-2]["trade_price"] == 8.0 and cds[-2]["high_price"] == 69.0
+    assert cds[-1]["candle_date_time_utc"] == "2025-01-01T01:00:00"
+
+
+def test_default_fetches_every_call():
+    rest = _Rest()
+    store = CandleStore(fetch=rest, now=lambda: rest.now)
+    store.get("KRW-BTC", 1)
+    rest.now += timedelta(seconds=30)
+    store.get("KRW-BTC", 1)
+    assert rest.calls == [60, 2]
+    assert store.stats()["skipped_fetches"] == 0
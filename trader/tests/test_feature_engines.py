@@ -0,0 +1,94 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+import backtest
+import trader
+from indicators.ta import build_features
+
+
+def _candles(rnd: random.Random, n: int, t0: int = 0):
+    out = []
+    p = rnd.uniform(10, 1000)
+    for i in range(n):
+        o = p
+        c = o if rnd.random() < 0.1 else o * (1 + rnd.gauss(0, 0.01))
+        h = max(o, c) * (1 + abs(rnd.gauss(0, 0.003)))
+        lo = min(o, c) * (1 - abs(rnd.gauss(0, 0.003)))
+        out.append({"candle_date_time_utc": f"2025-01-01T{(t0 + i) // 60:02d}:{(t0 + i) % 60:02d}:00",
+                    "high_price": h, "low_price": lo, "trade_price": c})
+        p = c
+    return out
+
+
+def _baseline(cds):
+    # 변경 전 scan_and_score 의 계산 그대로
+    highs = [float(c["high_price"]) for c in cds]
+    lows = [float(c["low_price"]) for c in cds]
+    closes = [float(c["trade_price"]) for c in cds]
+    feats = build_features(highs, lows, closes)
+    prev_high = max(highs[-20:-1]) if len(highs) >= 21 else max(highs[:-1])
+    last = closes[-1]
+    return {
+        "last": last,
+        "prev_high": prev_high,
+        "prev_close": closes[-2],
+        "breakout_pct": (last - prev_high) / prev_high * 100 if prev_high > 0 else 0.0,
+        "ema20": feats.ema20,
+        "ema50": feats.ema50,
+        "rsi14": feats.rsi14,
+        "atr14": feats.atr14,
+    }
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_window_and_batch_engines_match_baseline(seed):
+    rnd = random.Random(seed)
+    windows = [_candles(rnd, rnd.choice([30, 45, 49, 50, 51, 60])) for _ in range(20)]
+    batch = trader._features_batch(windows)
+    for cds, b in zip(windows, batch):
+        want = _baseline(cds)
+        assert trader._features_window(cds) == want
+        assert b == want
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_window_engine_reseeds_every_scan(seed):
+    # 같은 market 을 여러 scan 에 걸쳐 봐도 그 scan 의 60봉 window 값 (stream 과 달리 이전 scan 상태를 안 씀)
+    rnd = random.Random(seed)
+    series = _candles(rnd, 200)
+    trader.FEATURES.clear()
+    try:
+        diverged = False
+        for end in range(60, 200, 7):
+            cds = series[end - 60 : end]
+            want = _baseline(cds)
+            assert trader._features_window(cds) == want
+            assert trader._features_batch([cds])[0] == want
+            stream = trader._features_for("KRW-X", 1, cds)
+            if end == 60:
+                assert stream == want
+            elif stream["ema50"] != want["ema50"]:
+                diverged = True
+        assert diverged
+    finally:
+        trader.FEATURES.clear()
+
+
+def test_backtest_window_indicators_match_live_window():
+    rnd = random.Random(7)
+    cds = _candles(rnd, 150)
+    h = np.array([c["high_price"] for c in cds])
+    lo = np.array([c["low_price"] for c in cds])
+    c = np.array([c["trade_price"] for c in cds])
+    ind = backtest._window_indicators(h, lo, c)
+    for i in (0, 13, 14, 29, 49, 59, 60, 100, 149):
+        want = _baseline(cds[max(0, i - 59) : i + 1]) if i >= 1 else None
+        for j, k in enumerate(("ema20", "ema50", "rsi14", "atr14")):
+            v = ind[j, i]
+            if want is None or want[k] is None:
+                assert math.isnan(v)
+            else:
+                assert v == want[k]
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from indicators.stream import IncrementalFeatures
+from indicators.ta import build_features
+
+
+def _series(rnd: random.Random, n: int):
+    highs, lows, closes = [], [], []
+    p = rnd.uniform(10, 100_000)
+    for i in range(n):
+        if rnd.random() < 0.1:
+            nxt = p  # 변화 없는 봉 (diff == 0, RSI 의 gain/loss 경계)
+        else:
+            nxt = p * (1 + rnd.gauss(0, 0.01))
+        highs.append(max(p, nxt) * (1 + abs(rnd.gauss(0, 0.002))))
+        lows.append(min(p, nxt) * (1 - abs(rnd.gauss(0, 0.002))))
+        closes.append(nxt)
+        p = nxt
+    return highs, lows, closes
+
+
+def _check(inc: IncrementalFeatures, highs, lows, closes):
+    assert inc.snapshot() == build_features(highs, lows, closes)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_push_matches_build_features(seed):
+    rnd = random.Random(seed)
+    highs, lows, closes = _series(rnd, 120)
+    inc = IncrementalFeatures()
+    for i in range(len(closes)):
+        inc.update(i, highs[i], lows[i], closes[i])
+        _check(inc, highs[: i + 1], lows[: i + 1], closes[: i + 1])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_amend_forming_bar_matches_build_features(seed):
+    # 매 봉마다 형성 중 값으로 여러 번 amend 한 뒤 최종 값으로 확정
+    rnd = random.Random(1000 + seed)
+    highs, lows, closes = _series(rnd, 120)
+    inc = IncrementalFeatures()
+    for i in range(len(closes)):
+        for _ in range(rnd.randint(0, 3)):
+            h = highs[i] * (1 + rnd.uniform(-0.01, 0.01))
+            l = min(lows[i] * (1 + rnd.uniform(-0.01, 0.01)), h)
+            c = rnd.uniform(l, h)
+            inc.update(i, h, l, c)
+            _check(inc, highs[:i] + [h], lows[:i] + [l], closes[:i] + [c])
+        inc.update(i, highs[i], lows[i], closes[i])
+        _check(inc, highs[: i + 1], lows[: i + 1], closes[: i + 1])
+    assert inc.bars == len(closes)
+
+
+def test_older_bar_is_ignored():
+    rnd = random.Random(7)
+    highs, lows, closes = _series(rnd, 60)
+    inc = IncrementalFeatures()
+    for i in range(len(closes)):
+        inc.update(i, highs[i], lows[i], closes[i])
+    before = inc.snapshot()
+    assert inc.update(10, 1.0, 1.0, 1.0) is False
+    assert inc.snapshot() == before
+
+
+def test_amend_before_first_bar_is_push():
+    inc = IncrementalFeatures()
+    assert inc.update(0, 2.0, 1.0, 1.5)
+    assert inc.update(0, 2.5, 1.0, 2.0)
+    _check(inc, [2.5], [1.0], [2.0])
+    assert inc.bars == 1
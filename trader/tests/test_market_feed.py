@@ -0,0 +1,186 @@
+import socket
+import time
+
+import pytest
+
+import market_feed
+import trader
+from market_feed import MarketFeed
+from mock_upbit import ws_replay
+
+T0 = 1_700_000_000_000
+
+
+def _messages(codes, n=5):
+    out = []
+    for i in range(n):
+        for j, code in enumerate(codes):
+            ts = T0 + i * 1000
+            price = 100.0 + j * 10 + i
+            out.append({"type": "ticker", "code": code, "trade_price": price, "acc_trade_price_24h": 1e10, "timestamp": ts})
+            out.append({"type": "orderbook", "code": code, "timestamp": ts,
+                        "orderbook_units": [{"ask_price": price + 0.1, "bid_price": price - 0.1}]})
+            out.append({"type": "trade", "code": code, "trade_price": price, "trade_volume": 1.0, "trade_timestamp": ts, "timestamp": ts})
+    return out
+
+
+def _wait(cond, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def srv():
+    s = ws_replay.serve(_messages(["KRW-BTC", "KRW-ETH", "KRW-XRP"]))
+    yield s
+    s.shutdown()
+    s.server_close()
+
+
+@pytest.fixture
+def feed(srv, monkeypatch):
+    monkeypatch.setattr(market_feed, "RECONNECT_SEC", 0.05)
+    f = MarketFeed(["KRW-BTC", "KRW-ETH"], units=[1], url=srv.url)
+    f.start()
+    yield f
+    f.stop()
+
+
+def test_subscribe_filters_codes(srv, feed):
+    assert _wait(lambda: len(feed.tickers(["KRW-BTC", "KRW-ETH"])) == 2 and len(feed.orderbooks(["KRW-BTC", "KRW-ETH"])) == 2)
+    assert feed.connected
+    assert feed.tickers(["KRW-XRP"]) == []
+    assert feed.tickers(["KRW-BTC"])[0]["market"] == "KRW-BTC"
+    assert _wait(lambda: feed.messages == 30)
+    assert srv.connections == 1
+
+
+def test_reconnect_after_drop(srv, feed):
+    assert _wait(lambda: feed.messages == 30)
+    # 서버 쪽 끊김과 같게 socket 을 직접 닫는다
+    feed._ws.sock.sock.shutdown(socket.SHUT_RDWR)
+    assert _wait(lambda: srv.connections == 2)
+    assert _wait(lambda: feed.messages == 60)
+    assert feed.reconnects == 1
+    assert feed.connected
+
+
+def test_resubscribe_reconnects_with_new_codes(srv, feed):
+    assert _wait(lambda: len(feed.tickers(["KRW-BTC", "KRW-ETH"])) == 2)
+    feed.resubscribe(["KRW-ETH", "KRW-XRP"])
+    # 빠진 market 의 상태는 바로 지운다
+    assert feed.tickers(["KRW-BTC"]) == []
+    assert _wait(lambda: srv.connections == 2)
+    assert _wait(lambda: len(feed.tickers(["KRW-ETH", "KRW-XRP"])) == 2)
+    assert feed.tickers(["KRW-BTC"]) == []
+    assert feed.reconnects == 1
+
+
+def test_resubscribe_same_markets_keeps_connection(srv, feed):
+    assert _wait(lambda: feed.messages == 30)
+    feed.resubscribe(["KRW-BTC", "KRW-ETH"], units=[1])
+    time.sleep(0.2)
+    assert srv.connections == 1
+    assert feed.reconnects == 0
+
+
+def test_quotes_fall_back_to_rest_until_feed_has_batch(srv, feed, monkeypatch):
+    calls = []
+
+    def rest(kind):
+        def f(batch):
+            calls.append((kind, list(batch)))
+            return [{"market": m, "src": "rest"} for m in batch]
+        return f
+
+    monkeypatch.setattr(trader, "ticker", rest("ticker"))
+    monkeypatch.setattr(trader, "orderbook", rest("orderbook"))
+    assert _wait(lambda: len(feed.tickers(["KRW-BTC", "KRW-ETH"])) == 2 and len(feed.orderbooks(["KRW-BTC", "KRW-ETH"])) == 2)
+
+    tks, obs = trader._quotes(["KRW-BTC", "KRW-ETH"], feed)
+    assert calls == []
+    assert tks["KRW-BTC"]["type"] == "ticker" and obs["KRW-ETH"]["type"] == "orderbook"
+
+    # feed 가 아직 받지 못한 market 이 섞이면 batch 전체를 REST 로
+    tks, obs = trader._quotes(["KRW-BTC", "KRW-XRP"], feed)
+    assert calls == [("ticker", ["KRW-BTC", "KRW-XRP"]), ("orderbook", ["KRW-BTC", "KRW-XRP"])]
+    assert tks["KRW-BTC"]["src"] == "rest"
+
+
+def test_quotes_use_rest_after_feed_drops_market(srv, feed, monkeypatch):
+    monkeypatch.setattr(trader, "ticker", lambda batch: [{"market": m, "src": "rest"} for m in batch])
+    monkeypatch.setattr(trader, "orderbook", lambda batch: [{"market": m, "src": "rest"} for m in batch])
+    assert _wait(lambda: len(feed.tickers(["KRW-BTC", "KRW-ETH"])) == 2)
+    feed.resubscribe(["KRW-ETH"])
+    tks, _ = trader._quotes(["KRW-BTC", "KRW-ETH"], feed)
+    assert tks["KRW-BTC"]["src"] == "rest"
+
+
+def test_candles_seeded_from_rest_then_built_from_trades(srv, feed, monkeypatch):
+    rest = [
+        {"market": "KRW-BTC", "candle_date_time_utc": f"2023-11-14T21:{m:02d}:00", "opening_price": 1.0,
+         "high_price": 1.0, "low_price": 1.0, "trade_price": 1.0, "candle_acc_trade_volume": 1.0}
+        for m in range(0, 60)
+    ]
+    gets = []
+
+    class Store:
+        def get(self, mk, unit, count=60, last_price=None):
+            gets.append((mk, unit, count))
+            return [dict(c) for c in rest]
+
+    monkeypatch.setattr(trader, "CANDLES", Store())
+    assert _wait(lambda: feed.messages == 30)
+    # trade 로 만든 봉은 1개뿐 => REST 로 받고 feed 에 seed
+    cds = trader._fetch_candles("KRW-BTC", 1, feed)
+    assert gets == [("KRW-BTC", 1, 60)]
+    assert len(cds) == 60
+    # 다음부터는 feed 에서 (REST seed + trade 로 만든 봉)
+    cds2 = trader._fetch_candles("KRW-BTC", 1, feed)
+    assert gets == [("KRW-BTC", 1, 60)]
+    assert cds2[-1]["candle_date_time_utc"] == market_feed._bar_ts(T0, 1)
+    assert cds2[-1]["trade_price"] == 104.0
+
+
+def test_fetch_candles_without_feed_uses_rest_only(monkeypatch):
+    monkeypatch.setattr(trader, "CANDLES", type("S", (), {"get": lambda self, mk, unit, count=60, last_price=None: [{"x": 1}]})())
+    assert trader._fetch_candles("KRW-BTC", 1) == [{"x": 1}]
+
+
+def _rest_bars(mk, n=60):
+    return [
+        {"market": mk, "candle_date_time_utc": market_feed._bar_ts(T0 - (n - m) * 60_000, 1), "opening_price": 1.0,
+         "high_price": 1.0, "low_price": 1.0, "trade_price": 1.0, "candle_acc_trade_volume": 1.0}
+        for m in range(n)
+    ]
+
+
+def test_skipped_bar_marks_series_stale_until_reseed():
+    f = MarketFeed(["KRW-BTC"], units=[1])
+    f.seed_candles("KRW-BTC", 1, _rest_bars("KRW-BTC"))
+    trade = {"type": "trade", "code": "KRW-BTC", "trade_price": 2.0, "trade_volume": 1.0}
+    f.on_message(dict(trade, trade_timestamp=T0))
+    f.on_message(dict(trade, trade_timestamp=T0 + 60_000))
+    assert f.candles("KRW-BTC", 1) is not None
+    # 다음 봉이 한 칸 건너뛰면 REST 로 다시 받을 때까지 feed 봉을 쓰지 않는다
+    f.on_message(dict(trade, trade_timestamp=T0 + 3 * 60_000))
+    assert f.candles("KRW-BTC", 1) is None
+    assert f.stats()["stale_series"] == 1
+    f.seed_candles("KRW-BTC", 1, _rest_bars("KRW-BTC"))
+    assert f.candles("KRW-BTC", 1) is not None
+
+
+def test_reconnect_marks_series_stale(srv, feed):
+    assert _wait(lambda: feed.messages == 30)
+    feed.seed_candles("KRW-BTC", 1, _rest_bars("KRW-BTC"))
+    assert feed.candles("KRW-BTC", 1) is not None
+    feed._ws.sock.sock.shutdown(socket.SHUT_RDWR)
+    assert _wait(lambda: feed.reconnects == 1)
+    # 끊긴 동안 빠진 체결이 있을 수 있다 => REST reseed 전까지 None
+    assert feed.candles("KRW-BTC", 1) is None
+    feed.seed_candles("KRW-BTC", 1, _rest_bars("KRW-BTC"))
+    assert feed.candles("KRW-BTC", 1) is not None
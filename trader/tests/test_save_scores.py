@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+
+from sqlalchemy.exc import DBAPIError
+
+from event_log import db_events
+
+
+class _Engine:
+    def __init__(self, missing_cols):
+        self.missing_cols = missing_cols
+        self.sql = []
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if self.missing_cols and "scan_id" in sql:
+            raise DBAPIError(sql, params, Exception(1054, "Unknown column 'scan_id' in 'field list'"))
+        self.sql.append(sql)
+
+
+def test_save_scores_falls_back_to_old_columns(monkeypatch):
+    monkeypatch.setattr(db_events, "SCORES_SCAN_COLS", True)
+    eng = _Engine(missing_cols=True)
+    db_events.save_scores(eng, "t1", [{"symbol": "KRW-BTC", "score": 1.5, "features": {"a": 1}}], scan_id="s1")
+    assert db_events.SCORES_SCAN_COLS is False
+    # WARN event + 예전 column 으로 INSERT
+    assert any("INSERT INTO events" in s for s in eng.sql)
+    assert eng.sql[-1].startswith("INSERT INTO scores(trader_id, symbol, score) ")
+    # 다음 scan 부터는 바로 예전 column 으로
+    eng.sql.clear()
+    db_events.save_scores(eng, "t1", [{"symbol": "KRW-ETH", "score": 0.5}], scan_id="s2")
+    assert len(eng.sql) == 1 and "scan_id" not in eng.sql[0]
+
+
+def test_save_scores_keeps_scan_columns(monkeypatch):
+    monkeypatch.setattr(db_events, "SCORES_SCAN_COLS", True)
+    eng = _Engine(missing_cols=False)
+    db_events.save_scores(eng, "t1", [{"symbol": "KRW-BTC", "score": 1.5}], scan_id="s1")
+    assert db_events.SCORES_SCAN_COLS is True
+    assert len(eng.sql) == 1 and "scan_id" in eng.sql[0]
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+
+from scoring import MODELS, columns, compute, compute_batch, model_fields, register_model, top_k
+
+FEATURE_KEYS = ("acc_trade_price_24h", "breakout_pct", "ema20", "ema50", "rsi14", "atr14", "last")
+
+
+def _rows(rnd: random.Random, n: int):
+    rows = []
+    for _ in range(n):
+        r = {
+            "acc_trade_price_24h": rnd.uniform(0, 10_000_000_000),
+            "breakout_pct": rnd.uniform(-3, 3),
+            "ema20": rnd.uniform(50, 150),
+            "ema50": rnd.uniform(50, 150),
+            "rsi14": rnd.uniform(0, 100),
+            "atr14": rnd.uniform(0, 5),
+            "last": rnd.uniform(1, 200),
+        }
+        # None / 0 / 음수 입력 (scalar 의 `if x:` / `x <= 0` 분기)
+        for k in FEATURE_KEYS:
+            p = rnd.random()
+            if p < 0.1:
+                r[k] = None
+            elif p < 0.2:
+                r[k] = 0.0
+            elif p < 0.25:
+                r[k] = -abs(r[k])
+        rows.append(r)
+    return rows
+
+
+@pytest.mark.parametrize("model", sorted(MODELS))
+@pytest.mark.parametrize("seed", range(5))
+def test_compute_batch_matches_scalar(model, seed):
+    rows = _rows(random.Random(seed), 500)
+    got = compute_batch(model, columns(rows, model_fields(model) or FEATURE_KEYS))
+    want = [compute(model, r) for r in rows]
+    assert got.tolist() == want
+
+
+def test_compute_batch_without_batch_fn_uses_scalar():
+    register_model("_TEST_SCALAR_ONLY", lambda st: (st.get("last") or 0.0) * 2, fields=("last",))
+    try:
+        rows = _rows(random.Random(1), 50)
+        got = compute_batch("_TEST_SCALAR_ONLY", columns(rows, ("last",)))
+        assert got.tolist() == [compute("_TEST_SCALAR_ONLY", r) for r in rows]
+    finally:
+        MODELS.pop("_TEST_SCALAR_ONLY")
+
+
+def test_unknown_model_falls_back_to_default():
+    rows = _rows(random.Random(2), 20)
+    assert [compute("nope", r) for r in rows] == [compute("SCORE_A", r) for r in rows]
+
+
+def _stable_top(scores, k):
+    return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_top_k_matches_stable_sort_with_ties(seed):
+    rnd = random.Random(seed)
+    n = rnd.randint(1, 200)
+    # 값 종류를 적게 해서 동점을 많이 만든다
+    scores = [rnd.choice([0.0, 0.25, 0.5, 0.75, 1.0]) for _ in range(n)]
+    for k in (1, 3, n // 2, n, n + 5):
+        assert top_k(np.array(scores), k).tolist() == _stable_top(scores, k)
+
+
+def test_top_k_empty_and_non_positive_k():
+    assert top_k(np.array([]), 5).tolist() == []
+    assert top_k(np.array([0.3, 0.1]), 0).tolist() == []
@@ -0,0 +1,41 @@
+import trader
+
+FLAGS = {"mode": "PAPER", "strategy_mode": "STANDARD", "is_paused": 0, "trade_enabled": 0}
+
+
+def _poller(monkeypatch, results):
+    calls = []
+
+    def poll():
+        calls.append(1)
+        r = results[min(len(calls), len(results)) - 1]
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    monkeypatch.setattr(trader, "poll_control", poll)
+    monkeypatch.setattr(trader, "CONFIG_POLL_SEC", 0.01)
+    return calls
+
+
+def test_wakes_on_config_version_change(monkeypatch):
+    calls = _poller(monkeypatch, [(FLAGS, 3), (FLAGS, 3), (FLAGS, 4)])
+    assert trader._wait_config(5.0, FLAGS, 3) == (FLAGS, 4)
+    assert len(calls) == 3
+
+
+def test_wakes_on_pause(monkeypatch):
+    paused = dict(FLAGS, is_paused=1)
+    _poller(monkeypatch, [(paused, 3)])
+    assert trader._wait_config(5.0, FLAGS, 3) == (paused, 3)
+
+
+def test_timeout_returns_last_poll(monkeypatch):
+    calls = _poller(monkeypatch, [(FLAGS, 3)])
+    assert trader._wait_config(0.05, FLAGS, 3) == (FLAGS, 3)
+    assert calls
+
+
+def test_poll_error_is_not_reused(monkeypatch):
+    _poller(monkeypatch, [RuntimeError("db down")])
+    assert trader._wait_config(0.05, FLAGS, 3) is None
@@ -1,14 +1,35 @@
 import os
+import math
+import signal
+import sys
 import time
 import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
 
 from presets.loader import load_preset, deep_merge
+from indicators.stream import IncrementalFeatures
 from indicators.ta import build_features
-from logging.db_events import log_event, save_scores
-from scoring import compute as compute_score
-from strategies.registry import eval_buy
-from upbit_public import market_all, ticker, orderbook, candles_minutes
+from indicators.batch import build_features_batch, stack_right_aligned
+from event_log.db_events import log_event, save_scores, start_event_sink, event_sink_metrics
+from scoring import compute_batch, columns, model_fields, top_k
+from candle_cache import CandleStore
+from candle_archive import CandleArchive
+from market_feed import MarketFeed
+from market_meta import MarketMetaCache
+from strategies.registry import BUY_FEATURES, eval_buy, first_buy
+from upbit_public import (
+    HTTP_POOL_SIZE,
+    ticker,
+    orderbook,
+    configure_http,
+    limiter_stats,
+    latency_stats,
+)
 
 TRADER_ID = os.getenv("TRADER_ID", "trader-unknown")
 DB_HOST = os.getenv("DB_HOST", "mariadb")
@@ -17,13 +38,51 @@ DB_NAME = os.getenv("DB_NAME", "upbit")
 DB_USER = os.getenv("DB_USER", "upbit")
 DB_PASS = os.getenv("DB_PASS", "upbitpass")
 
+# 이벤트 로그는 background writer 가 모아서 multi-row INSERT 한다
+EVENT_QUEUE_MAX = int(os.getenv("EVENT_QUEUE_MAX", "5000"))
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "200"))
+EVENT_FLUSH_SEC = float(os.getenv("EVENT_FLUSH_SEC", "1.0"))
+# 1 이면 HOLD 를 포함한 모든 (후보, plugin) 평가 evidence 를 BUY_EVAL 로 남긴다
+BUY_EVAL_DEBUG = os.getenv("BUY_EVAL_DEBUG", "0") == "1"
+
 DB_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
 engine = create_engine(DB_URL, pool_pre_ping=True, pool_recycle=1800)
 
-
-def heartbeat():
-    with engine.begin() as conn:
-        conn.execute(text("UPDATE traders SET heartbeat_at=NOW() WHERE trader_id=:tid"), {"tid": TRADER_ID})
+# scan 사이에 유지되는 캔들 캐시 / 지표 상태
+CANDLES = CandleStore()
+# CANDLE_ARCHIVE_DIR 가 있으면 scan 에서 받은 마감 봉을 backtest 용 archive 에 쌓는다
+ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR", "")
+ARCHIVES: dict[int, CandleArchive] = {}
+ARCHIVED_TS: dict[tuple[str, int], str] = {}
+# market/all(isDetails) 목록 (TTL + background refresh)
+MARKET_META = MarketMetaCache()
+FEATURES: dict[tuple[str, int], IncrementalFeatures] = {}
+# scanner.data_source == "websocket" 일 때만 사용
+FEED: MarketFeed | None = None
+# 마지막 scan 기준 후보 (event scan 은 바뀐 market 만 갱신한 뒤 전체를 다시 순위 매긴다)
+LAST_CANDIDATES: dict[str, dict] = {}
+# scores.features_json 에 남기는 값 (dashboard 에서 순위 설명용)
+SCORE_FEATURE_KEYS = (
+    "last",
+    "prev_high",
+    "prev_close",
+    "acc_trade_price_24h",
+    "spread_bp",
+    "ema20",
+    "ema50",
+    "rsi14",
+    "atr14",
+    "breakout_pct",
+)
+# scanner.trigger == "event" 에서 dirty market 을 기다리는 최대 시간
+EVENT_POLL_SEC = 2.0
+# control-plane polling 상태 (poll_control / current_cfg)
+POLL_PROC = True
+CFG_JSON: str | None = None
+CFG_JSON_VER: int | None = None
+PARSED_CFG: dict[tuple[int, str], dict] = {}
+# poll_control 주기: interval 대기 중 + event mode loop (hot apply / pause 반영 지연 상한, 기본 분당 4회)
+CONFIG_POLL_SEC = float(os.getenv("CONFIG_POLL_SEC", "15"))
 
 
 def load_current_config_json():
@@ -34,22 +93,57 @@ def load_current_config_json():
         return (r[0], int(r[1])) if r else (None, None)
 
 
-def load_trader_flags():
+def _flags_row(r):
+    if not r:
+        return {"mode": "PAPER", "strategy_mode": "STANDARD", "is_paused": 1, "trade_enabled": 0}, None
+    flags = {
+        "mode": r[0],
+        "strategy_mode": r[1],
+        "is_paused": int(r[2]),
+        "trade_enabled": int(r[3]),
+    }
+    return flags, (int(r[4]) if r[4] is not None else None)
+
+
+def poll_control():
+    # heartbeat + flags + config version (trader_poll procedure 1회 호출)
+    # procedure 가 없는 기존 DB(initdb 이후 추가됨)면 한 transaction 안의 UPDATE + SELECT 로 대신한다
+    global POLL_PROC
+    if POLL_PROC:
+        try:
+            with engine.begin() as conn:
+                return _flags_row(conn.execute(text("CALL trader_poll(:tid)"), {"tid": TRADER_ID}).fetchone())
+        except DBAPIError as e:
+            if getattr(e.orig, "args", (None,))[0] != 1305:  # ER_SP_DOES_NOT_EXIST
+                raise
+            POLL_PROC = False
+            log_event(engine, TRADER_ID, "WARN", "CONTROL_POLL_FALLBACK", "trader_poll procedure not found", {})
     with engine.begin() as conn:
+        conn.execute(text("UPDATE traders SET heartbeat_at=NOW() WHERE trader_id=:tid"), {"tid": TRADER_ID})
         r = conn.execute(
             text(
-                "SELECT mode, strategy_mode, is_paused, trade_enabled FROM traders WHERE trader_id=:tid"
+                "SELECT t.mode, t.strategy_mode, t.is_paused, t.trade_enabled, c.version FROM traders t "
+                "LEFT JOIN config_current c ON c.trader_id=t.trader_id WHERE t.trader_id=:tid"
             ),
             {"tid": TRADER_ID},
         ).fetchone()
-        if not r:
-            return {"mode": "PAPER", "strategy_mode": "STANDARD", "is_paused": 1, "trade_enabled": 0}
-        return {
-            "mode": r[0],
-            "strategy_mode": r[1],
-            "is_paused": int(r[2]),
-            "trade_enabled": int(r[3]),
-        }
+    return _flags_row(r)
+
+
+def current_cfg(ver: int, strategy_mode: str):
+    # config_json 은 version 이 바뀔 때만 읽고, parse 결과는 (version, strategy_mode) 로 재사용
+    global CFG_JSON, CFG_JSON_VER
+    if ver != CFG_JSON_VER:
+        cfg_json, v = load_current_config_json()
+        CFG_JSON, CFG_JSON_VER = cfg_json, v
+        PARSED_CFG.clear()
+    if not CFG_JSON:
+        return None
+    key = (CFG_JSON_VER, strategy_mode)
+    cfg = PARSED_CFG.get(key)
+    if cfg is None:
+        cfg = PARSED_CFG[key] = _parse_cfg(CFG_JSON, strategy_mode)
+    return cfg
 
 
 def _parse_cfg(cfg_json: str | None, strategy_mode: str) -> dict:
@@ -68,6 +162,60 @@ def _parse_cfg(cfg_json: str | None, strategy_mode: str) -> dict:
         return base
 
 
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out.update(_flatten(v, f"{prefix}{k}."))
+        else:
+            out[f"{prefix}{k}"] = v
+    return out
+
+
+def _hot_apply(prev: dict, cfg: dict) -> dict:
+    # 컨테이너 재시작 없이 새 config 반영. 바뀐 key 에 따라 필요한 상태만 버린다
+    #   scanner.* / scoring.*   => 이전 후보 순위는 무효 (다음 loop 에서 full scan)
+    #   scanner.timeframe       => 이전 분봉 단위의 캔들/지표 상태 해제
+    #   scanner.data_source     => _ensure_feed 가 다음 scan 에서 feed 를 켜고 끈다
+    #   scanner.feature_engine  => stream 지표 상태 해제
+    # 그 외(buy/sell/risk 등)는 캐시를 그대로 쓴다
+    a, b = _flatten(prev), _flatten(cfg)
+    changed = sorted(k for k in a.keys() | b.keys() if a.get(k) != b.get(k))
+    reset = []
+    if any(k.startswith(("scanner.", "scoring.")) for k in changed):
+        LAST_CANDIDATES.clear()
+        reset.append("candidates")
+    if "scanner.feature_engine" in changed and FEATURES:
+        FEATURES.clear()
+        reset.append("features")
+    old_unit = _unit_from_timeframe(prev["scanner"]["timeframe"])
+    if old_unit != _unit_from_timeframe(cfg["scanner"]["timeframe"]):
+        CANDLES.drop_unit(old_unit)
+        for k in [k for k in FEATURES if k[1] == old_unit]:
+            del FEATURES[k]
+        reset += ["candles", "features"]
+    return {"changed": changed, "reset": reset}
+
+
+def _wait_config(timeout: float, flags: dict, ver):
+    # interval mode 대기. main loop 와 같은 poll_control 을 돌려서 (heartbeat 포함, 별도 query 없음)
+    # flags / config version 이 바뀌면 바로 깨어난다. 마지막 poll 결과를 돌려줘서 main loop 가 다시 poll 하지 않게 한다
+    deadline = time.monotonic() + timeout
+    polled = None
+    while True:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return polled
+        time.sleep(min(CONFIG_POLL_SEC, left))
+        try:
+            polled = poll_control()
+        except Exception:
+            polled = None
+            continue
+        if polled != (flags, ver):
+            return polled
+
+
 def _unit_from_timeframe(tf: str) -> int:
     # "1m" "3m" "5m" only
     if not tf:
@@ -77,30 +225,191 @@ def _unit_from_timeframe(tf: str) -> int:
     return 3
 
 
-def scan_and_score(cfg: dict) -> list[dict]:
+def _ensure_feed(cfg: dict, markets: list[str], unit: int) -> MarketFeed | None:
+    global FEED
+    if cfg["scanner"].get("data_source", "rest") != "websocket":
+        if FEED is not None:
+            FEED.stop()
+            FEED = None
+        return None
+    if FEED is None:
+        FEED = MarketFeed(markets, units=[unit])
+        FEED.start()
+    else:
+        FEED.resubscribe(markets, units=[unit])
+    return FEED
+
+
+def _quotes(batch: list[str], feed: MarketFeed | None = None) -> tuple[dict, dict]:
+    tks = {x["market"]: x for x in feed.tickers(batch)} if feed else {}
+    obs = {x["market"]: x for x in feed.orderbooks(batch)} if feed else {}
+    # feed 에 아직 없는 market 이 있으면 (연결 직후 등) 이 batch 는 REST 로 받는다
+    if len(tks) < len(batch) or len(obs) < len(batch):
+        tks = {x["market"]: x for x in ticker(batch)}
+        obs = {x["market"]: x for x in orderbook(batch)}
+    return tks, obs
+
+
+def _fetch_candles(mk: str, unit: int, feed: MarketFeed | None = None, last_price: float | None = None) -> list[dict] | None:
+    try:
+        if feed is not None:
+            cds = feed.candles(mk, unit, count=60)
+            if cds:
+                return cds
+        cds = CANDLES.get(mk, unit, count=60, last_price=last_price)
+        if feed is not None:
+            # 이후 분봉은 trade stream 으로 이어서 만든다
+            feed.seed_candles(mk, unit, cds)
+        return cds
+    except Exception:
+        return None
+
+
+def _archive_candles(unit: int, items) -> int:
+    # 마지막(형성 중) 봉은 빼고, 이미 쓴 봉 이후만 append
+    arc = ARCHIVES.get(unit)
+    if arc is None:
+        arc = ARCHIVES[unit] = CandleArchive(ARCHIVE_DIR, unit)
+    n = 0
+    for mk, cds in items:
+        if not cds or len(cds) < 2:
+            continue
+        key = (mk, unit)
+        last = ARCHIVED_TS.get(key, "")
+        new = [c for c in cds[:-1] if c["candle_date_time_utc"] > last]
+        if new:
+            n += arc.write(mk, new)
+            ARCHIVED_TS[key] = new[-1]["candle_date_time_utc"]
+    return n
+
+
+def _window_features(highs: list[float], closes: list[float]) -> dict:
+    prev_high = max(highs[-20:-1]) if len(highs) >= 21 else max(highs[:-1])
+    last = closes[-1]
+    return {
+        "last": last,
+        "prev_high": prev_high,
+        "prev_close": closes[-2],
+        "breakout_pct": (last - prev_high) / prev_high * 100 if prev_high > 0 else 0.0,
+    }
+
+
+def _features_window(cds: list[dict]) -> dict:
+    # 기본 (scanner.feature_engine=window): scan 마다 받은 60봉 window 로 EMA/RSI/ATR 를 처음부터 계산 (baseline 과 같은 값)
+    highs = [float(c["high_price"]) for c in cds]
+    closes = [float(c["trade_price"]) for c in cds]
+    snap = build_features(highs, [float(c["low_price"]) for c in cds], closes)
+    out = _window_features(highs, closes)
+    out.update(ema20=snap.ema20, ema50=snap.ema50, rsi14=snap.rsi14, atr14=snap.atr14)
+    return out
+
+
+def _features_for(mk: str, unit: int, cds: list[dict]) -> dict:
+    # scanner.feature_engine=stream (opt-in): market 별 지표 상태에 마지막 처리 봉 이후만 반영한다.
+    # window 마다 다시 seed 하지 않고 이어진 series 로 계산하므로 window/batch 와 값이 다르다 (첫 scan 만 같음).
+    # 연속성이 끊기면 window 전체로 다시 만든다.
+    # CandleStore returns oldest first
+    key = (mk, unit)
+    fe = FEATURES.get(key)
+    if fe is None or fe.last_ts is None or fe.last_ts < cds[0]["candle_date_time_utc"]:
+        fe = IncrementalFeatures()
+        FEATURES[key] = fe
+    start = len(cds)
+    while start > 0 and (fe.last_ts is None or cds[start - 1]["candle_date_time_utc"] >= fe.last_ts):
+        start -= 1
+    for c in cds[start:]:
+        fe.update(c["candle_date_time_utc"], float(c["high_price"]), float(c["low_price"]), float(c["trade_price"]))
+    snap = fe.snapshot()
+    out = _window_features([float(c["high_price"]) for c in cds[-21:]], [float(c["trade_price"]) for c in cds[-2:]])
+    out.update(ema20=snap.ema20, ema50=snap.ema50, rsi14=snap.rsi14, atr14=snap.atr14)
+    return out
+
+
+def _features_batch(windows: list[list[dict]]) -> list[dict]:
+    # 전체 후보를 (markets x bars) 배열로 쌓아 한 번에 계산한다
+    if not windows:
+        return []
+    width = max(len(w) for w in windows)
+    arr = build_features_batch(
+        stack_right_aligned([[float(c["high_price"]) for c in w] for w in windows], width),
+        stack_right_aligned([[float(c["low_price"]) for c in w] for w in windows], width),
+        stack_right_aligned([[float(c["trade_price"]) for c in w] for w in windows], width),
+        lengths=[len(w) for w in windows],
+    )
+    cols = {k: v.tolist() for k, v in arr.items()}
+    return [
+        {k: (None if math.isnan(cols[k][i]) else cols[k][i]) for k in cols}
+        for i in range(len(windows))
+    ]
+
+
+def scan_and_score(cfg: dict, only: list[str] | None = None) -> list[dict]:
     tf = cfg["scanner"]["timeframe"]
     unit = _unit_from_timeframe(tf)
     top_n = int(cfg["scanner"]["top_n"])
     min_vol = float(cfg["scanner"]["min_krw_volume_24h"])
     max_spread_bp = float(cfg["scanner"]["max_spread_bp"])
     model = cfg.get("scoring", {}).get("model", "SCORE_A")
+    concurrency = int(cfg["scanner"].get("candle_concurrency", 8))
+    feature_engine = cfg["scanner"].get("feature_engine", "window")
+    # always (기본): market 마다 매 scan REST 요청 / bar_close: 마지막 봉이 형성 중이면 요청 없이 ticker 가격으로 갱신
+    bar_close = cfg["scanner"].get("candle_refresh", "always") == "bar_close"
+    exclude_caution = bool(cfg["scanner"].get("exclude_caution", True))
+    http_cfg = cfg.get("http", {})
+    configure_http(
+        pool_size=max(concurrency, int(http_cfg.get("pool_size", HTTP_POOL_SIZE))),
+        retries=http_cfg.get("retries"),
+        backoff=http_cfg.get("backoff_sec"),
+    )
 
-    log_event(engine, TRADER_ID, "INFO", "SCAN_START", f"scan start tf={tf} top_n={top_n}", {"timeframe": tf, "top_n": top_n})
+    mode = "full" if only is None else "event"
+    scan_id = uuid.uuid4().hex
+    log_event(
+        engine,
+        TRADER_ID,
+        "INFO",
+        "SCAN_START",
+        f"scan start tf={tf} top_n={top_n} mode={mode}",
+        {
+            "scan_id": scan_id,
+            "timeframe": tf,
+            "top_n": top_n,
+            "mode": mode,
+            "markets": len(only) if only is not None else None,
+        },
+    )
 
-    markets = [m["market"] for m in market_all() if m.get("market", "").startswith("KRW-")]
-    if not markets:
-        log_event(engine, TRADER_ID, "WARN", "SCAN_NO_MARKETS", "no KRW markets", {})
-        return []
+    # 유의/주의 market 은 ticker/orderbook 요청 전에 뺀다
+    markets, caution = MARKET_META.split(list(only) if only is not None else None)
+    if not exclude_caution:
+        markets, caution = markets + caution, []
+
+    if only is None:
+        if not markets:
+            log_event(engine, TRADER_ID, "WARN", "SCAN_NO_MARKETS", "no KRW markets", {})
+            return []
+        CANDLES.retain(markets)
+        alive = set(markets)
+        for key in [k for k in FEATURES if k[0] not in alive]:
+            del FEATURES[key]
+        for key in [k for k in ARCHIVED_TS if k[0] not in alive]:
+            del ARCHIVED_TS[key]
+        feed = _ensure_feed(cfg, markets, unit)
+    else:
+        feed = FEED
 
     # batch size to reduce URL length
     candidates: list[dict] = []
     checked = 0
-    rejected = {"low_volume": 0, "spread": 0, "candle": 0}
+    rejected = {"caution": len(caution), "low_volume": 0, "spread": 0, "candle": 0}
+    t_scan = time.perf_counter()
 
+    # 1) ticker/orderbook 필터 (batch 요청)
+    passed: list[tuple[str, float, float]] = []
+    prices: dict[str, float] = {}
     for i in range(0, len(markets), 100):
         batch = markets[i : i + 100]
-        tks = {x["market"]: x for x in ticker(batch)}
-        obs = {x["market"]: x for x in orderbook(batch)}
+        tks, obs = _quotes(batch, feed)
 
         for mk in batch:
             checked += 1
@@ -108,6 +417,10 @@ def scan_and_score(cfg: dict) -> list[dict]:
             ob = obs.get(mk)
             if not tk or not ob:
                 continue
+            if tk.get("trade_price"):
+                prices[mk] = float(tk["trade_price"])
+                if feed is not None:
+                    feed.mark_scored(mk, prices[mk])
 
             vol24 = float(tk.get("acc_trade_price_24h") or 0.0)
             if vol24 < min_vol:
@@ -128,44 +441,83 @@ def scan_and_score(cfg: dict) -> list[dict]:
                 rejected["spread"] += 1
                 continue
 
-            # candles
-            try:
-                cds = candles_minutes(mk, unit, count=60)
-            except Exception:
-                rejected["candle"] += 1
-                continue
-            if not cds or len(cds) < 30:
-                rejected["candle"] += 1
-                continue
+            passed.append((mk, vol24, spread_bp))
+    t_filtered = time.perf_counter()
 
-            # Upbit returns newest first
-            cds = list(reversed(cds))
-            highs = [float(c["high_price"]) for c in cds]
-            lows = [float(c["low_price"]) for c in cds]
-            closes = [float(c["trade_price"]) for c in cds]
-
-            feats = build_features(highs, lows, closes)
-
-            prev_high = max(highs[-20:-1]) if len(highs) >= 21 else max(highs[:-1])
-            prev_close = closes[-2]
-            last = closes[-1]
-            breakout_pct = (last - prev_high) / prev_high * 100 if prev_high > 0 else 0.0
-
-            st = {
-                "symbol": mk,
-                "last": last,
-                "prev_high": prev_high,
-                "prev_close": prev_close,
-                "acc_trade_price_24h": vol24,
-                "spread_bp": spread_bp,
-                "ema20": feats.ema20,
-                "ema50": feats.ema50,
-                "rsi14": feats.rsi14,
-                "atr14": feats.atr14,
-                "breakout_pct": breakout_pct,
-            }
-            st["score"] = float(compute_score(model, st))
-            candidates.append(st)
+    # 2) candles (bounded worker pool, 결과 순서는 passed 순서 유지)
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(passed) or 1))) as pool:
+        fetched = list(pool.map(lambda p: _fetch_candles(p[0], unit, feed, prices.get(p[0]) if bar_close else None), passed))
+    archived = 0
+    if ARCHIVE_DIR:
+        try:
+            archived = _archive_candles(unit, [(p[0], cds) for p, cds in zip(passed, fetched)])
+        except Exception as e:
+            log_event(engine, TRADER_ID, "WARN", "CANDLE_ARCHIVE_FAIL", str(e), {"dir": ARCHIVE_DIR})
+    t_fetched = time.perf_counter()
+
+    # 3) features + score
+    rows = []
+    for (mk, vol24, spread_bp), cds in zip(passed, fetched):
+        if not cds or len(cds) < 30:
+            rejected["candle"] += 1
+            continue
+        rows.append((mk, vol24, spread_bp, cds))
+
+    if feature_engine == "batch":
+        feats_list = _features_batch([r[3] for r in rows])
+    elif feature_engine == "stream":
+        feats_list = [_features_for(mk, unit, cds) for mk, _, _, cds in rows]
+    else:
+        feats_list = [_features_window(cds) for _, _, _, cds in rows]
+
+    for (mk, vol24, spread_bp, _), f in zip(rows, feats_list):
+        st = {
+            "symbol": mk,
+            "last": f["last"],
+            "prev_high": f["prev_high"],
+            "prev_close": f["prev_close"],
+            "acc_trade_price_24h": vol24,
+            "spread_bp": spread_bp,
+            "ema20": f["ema20"],
+            "ema50": f["ema50"],
+            "rsi14": f["rsi14"],
+            "atr14": f["atr14"],
+            "breakout_pct": f["breakout_pct"],
+        }
+        candidates.append(st)
+    if candidates:
+        scores = compute_batch(model, columns(candidates, model_fields(model) or SCORE_FEATURE_KEYS))
+        for st, sc in zip(candidates, scores.tolist()):
+            st["score"] = sc
+
+    if only is None:
+        LAST_CANDIDATES.clear()
+    else:
+        for mk in markets:
+            LAST_CANDIDATES.pop(mk, None)
+    for st in candidates:
+        LAST_CANDIDATES[st["symbol"]] = st
+    if only is not None:
+        candidates = list(LAST_CANDIDATES.values())
+    t_done = time.perf_counter()
+
+    timing = {
+        "filter_ms": round((t_filtered - t_scan) * 1000, 1),
+        "candles_ms": round((t_fetched - t_filtered) * 1000, 1),
+        "features_ms": round((t_done - t_fetched) * 1000, 1),
+        "total_ms": round((t_done - t_scan) * 1000, 1),
+        "candle_requests": len(passed),
+        "concurrency": concurrency,
+        "feature_engine": feature_engine,
+        "mode": mode,
+        "event_sink": event_sink_metrics(),
+        "feed": feed.stats() if feed else None,
+        "rate_limit": limiter_stats(),
+        "latency": latency_stats(reset=True),
+        "candle_cache": CANDLES.stats(reset=True),
+        "archived_bars": archived,
+        "market_meta": MARKET_META.stats(),
+    }
 
     if not candidates:
         log_event(
@@ -174,14 +526,29 @@ def scan_and_score(cfg: dict) -> list[dict]:
             "WARN",
             "SCAN_NO_CANDIDATE",
             "no candidate after filters",
-            {"checked": checked, "rejected": rejected, "min_vol": min_vol, "max_spread_bp": max_spread_bp},
+            {
+                "scan_id": scan_id,
+                "checked": checked,
+                "rejected": rejected,
+                "min_vol": min_vol,
+                "max_spread_bp": max_spread_bp,
+                "timing": timing,
+            },
         )
         return []
 
-    candidates.sort(key=lambda x: x.get("score", 0.0), reverse=True)
-    top = candidates[:top_n]
+    # 전체 정렬 대신 상위 top_n 만 (동점 순서는 기존 stable sort 와 같다)
+    top = [candidates[i] for i in top_k(np.array([x.get("score", 0.0) for x in candidates]), top_n)]
 
-    save_scores(engine, TRADER_ID, [{"symbol": x["symbol"], "score": x["score"]} for x in top])
+    save_scores(
+        engine,
+        TRADER_ID,
+        [
+            {"symbol": x["symbol"], "score": x["score"], "features": {k: x.get(k) for k in SCORE_FEATURE_KEYS}}
+            for x in top
+        ],
+        scan_id=scan_id,
+    )
 
     log_event(
         engine,
@@ -190,9 +557,12 @@ def scan_and_score(cfg: dict) -> list[dict]:
         "SCORES_SAVED",
         f"saved {len(top)} scores",
         {
+            "scan_id": scan_id,
             "model": model,
             "checked": checked,
+            "candidates": len(candidates),
             "rejected": rejected,
+            "timing": timing,
             "top": [
                 {
                     "symbol": x["symbol"],
@@ -213,62 +583,131 @@ def evaluate_buy(cfg: dict, top: list[dict]):
         log_event(engine, TRADER_ID, "WARN", "BUY_NO_PLUGIN", "no buy plugins configured", {})
         return
 
-    # 후보 상위 5개에 대해만 전략 평가 로그 남김
-    for st in top[:5]:
-        st = dict(st)
-        for plug in buy_plugins:
-            res = eval_buy(plug, st, cfg)
-            log_event(
-                engine,
-                TRADER_ID,
-                "INFO",
-                "BUY_EVAL",
-                f"{plug}:{res.signal}",
-                {"plugin": plug, "signal": res.signal, "reason": res.reason, "evidence": res.evidence},
-            )
-            if res.signal == "BUY":
-                # 실제 주문은 v1.7.0에서 '로그만' 남기고 종료
+    # 모든 후보를 plugin 별 batch mask 로 평가. evidence 는 BUY 로 고른 하나만 만든다.
+    feats = columns(top, BUY_FEATURES)
+    if BUY_EVAL_DEBUG:
+        for st in top:
+            for plug in buy_plugins:
+                res = eval_buy(plug, dict(st), cfg)
                 log_event(
                     engine,
                     TRADER_ID,
-                    "INFO",
-                    "BUY_INTENT",
-                    "buy intent generated (order execution disabled in this build)",
-                    {"plugin": plug, "order_intent": res.order_intent.__dict__ if res.order_intent else None, "evidence": res.evidence},
+                    "DEBUG",
+                    "BUY_EVAL",
+                    f"{plug}:{res.signal}",
+                    {"plugin": plug, "signal": res.signal, "reason": res.reason, "evidence": res.evidence},
                 )
-                return
+    hit = first_buy(buy_plugins, feats, cfg)
+    if hit is not None:
+        row, plug = hit
+        res = eval_buy(plug, dict(top[row]), cfg)
+        log_event(
+            engine,
+            TRADER_ID,
+            "INFO",
+            "BUY_INTENT",
+            "buy intent generated (order execution disabled in this build)",
+            {
+                "plugin": plug,
+                "rank": row + 1,
+                "order_intent": res.order_intent.__dict__ if res.order_intent else None,
+                "evidence": res.evidence,
+            },
+        )
+        return
+
+    log_event(
+        engine,
+        TRADER_ID,
+        "INFO",
+        "BUY_NO_SIGNAL",
+        "no buy signal from plugins",
+        {"checked": len(top), "plugins": buy_plugins},
+    )
 
-    log_event(engine, TRADER_ID, "INFO", "BUY_NO_SIGNAL", "no buy signal from plugins", {"checked": min(5, len(top))})
+
+def _on_sigterm(signum, frame):
+    # docker stop => SystemExit => atexit 에서 event sink flush
+    sys.exit(0)
 
 
 def main():
     print(f"[{TRADER_ID}] started (v1.7.0)")
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    start_event_sink(engine, max_queue=EVENT_QUEUE_MAX, batch_size=EVENT_BATCH_SIZE, flush_interval_sec=EVENT_FLUSH_SEC)
+    MARKET_META.start()
     last_cfg_ver = None
+    active_cfg = None
+    next_full_scan = 0.0
+    next_control_poll = 0.0
+    polled = None
     while True:
         try:
-            heartbeat()
-            flags = load_trader_flags()
-            cfg_json, ver = load_current_config_json()
+            if polled is None:
+                polled = poll_control()
+                next_control_poll = time.monotonic() + CONFIG_POLL_SEC
+            flags, ver = polled
+            polled = None
 
             if ver != last_cfg_ver:
                 log_event(engine, TRADER_ID, "INFO", "CONFIG_SEEN", "current config loaded", {"version": ver})
                 last_cfg_ver = ver
 
-            if not cfg_json:
+            if ver is None or flags.get("is_paused") == 1:
                 time.sleep(2)
                 continue
 
-            if flags.get("is_paused") == 1:
+            cfg = current_cfg(ver, flags.get("strategy_mode") or "STANDARD")
+            if cfg is None:
                 time.sleep(2)
                 continue
+            if active_cfg is not None and cfg is not active_cfg and cfg != active_cfg:
+                applied = _hot_apply(active_cfg, cfg)
+                log_event(
+                    engine,
+                    TRADER_ID,
+                    "INFO",
+                    "CONFIG_HOT_APPLIED",
+                    f"v{ver}: {len(applied['changed'])} keys changed",
+                    dict(applied, version=ver),
+                )
+                if applied["reset"]:
+                    next_full_scan = 0.0
+            active_cfg = cfg
+            interval = int(cfg["scanner"]["scan_interval_sec"])
+
+            event_mode = cfg["scanner"].get("trigger", "interval") == "event"
+            if not event_mode or FEED is None:
+                top = scan_and_score(cfg)
+                if top:
+                    evaluate_buy(cfg, top)
+                next_full_scan = time.monotonic() + interval
+                # 첫 full scan 에서 feed 가 올라왔으면 바로 event 대기로 넘어간다
+                if not (event_mode and FEED is not None):
+                    polled = _wait_config(interval, flags, ver)
+                continue
 
-            cfg = _parse_cfg(cfg_json, flags.get("strategy_mode") or "STANDARD")
-
-            top = scan_and_score(cfg)
+            # event mode: 바뀐 market 만 즉시 재평가, full scan 은 scan_interval_sec 마다 안전망으로 유지
+            now = time.monotonic()
+            # dirty wake-up 마다 CALL + heartbeat UPDATE 를 하지 않게 control poll 은 CONFIG_POLL_SEC 마다만
+            if now < next_control_poll:
+                polled = (flags, ver)
+            if now >= next_full_scan:
+                top = scan_and_score(cfg)
+                next_full_scan = time.monotonic() + interval
+            else:
+                ev = cfg["scanner"].get("event", {})
+                FEED.set_triggers(
+                    price_move_pct=ev.get("price_move_pct"),
+                    volume_spike_x=ev.get("volume_spike_x"),
+                    unit=_unit_from_timeframe(cfg["scanner"]["timeframe"]),
+                )
+                dirty = FEED.wait_dirty(timeout=min(EVENT_POLL_SEC, next_full_scan - now))
+                if not dirty:
+                    continue
+                top = scan_and_score(cfg, only=sorted(dirty))
             if top:
                 evaluate_buy(cfg, top)
-
-            time.sleep(int(cfg["scanner"]["scan_interval_sec"]))
         except Exception as e:
             try:
                 log_event(engine, TRADER_ID, "ERROR", "TRADER_LOOP_ERROR", str(e), {})
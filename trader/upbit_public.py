@@ -1,33 +1,252 @@
 from __future__ import annotations
 
+import os
+import random
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# market-data 서비스(공유 캐시)를 쓰는 trader 는 UPBIT_BASE_URL 로 그쪽을 가리킨다
+BASE = os.getenv("UPBIT_BASE_URL", "https://api.upbit.com")
+
+HTTP_POOL_SIZE = int(os.getenv("UPBIT_HTTP_POOL_SIZE", "16"))
+HTTP_RETRIES = int(os.getenv("UPBIT_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_SEC = float(os.getenv("UPBIT_HTTP_BACKOFF_SEC", "0.2"))
+HTTP_TIMEOUT_SEC = float(os.getenv("UPBIT_HTTP_TIMEOUT_SEC", "10"))
+
+# 요청 지연 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = (25, 50, 100, 200, 400, 800, 1600, 3200)
+
+# Upbit quotation API: 그룹(market/ticker/orderbook/candles)별 초당 10회
+DEFAULT_RATE_PER_SEC = float(os.getenv("UPBIT_RATE_PER_SEC", "10"))
+MAX_429_RETRIES = 4
+BACKOFF_BASE_SEC = 0.25
+BACKOFF_MAX_SEC = 5.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        # counters
+        self.requests = 0
+        self.throttled = 0
+        self.waited_sec = 0.0
+        self.http_429 = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self.blocked_until - now
+                if delay <= 0 and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self.requests += 1
+                    if waited > 0:
+                        self.throttled += 1
+                        self.waited_sec += waited
+                    return
+                if delay <= 0:
+                    delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
 
-BASE = "https://api.upbit.com"
+    def observe_remaining(self, sec_remaining: int):
+        # 서버가 보는 잔여 요청 수가 더 적으면 그쪽을 따른다 (다른 프로세스/트레이더와 IP 공유)
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(sec_remaining))
 
+    def penalize(self, attempt: int) -> float:
+        delay = min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** attempt))
+        delay += random.uniform(0, delay)
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.http_429 += 1
+        return delay
 
-def market_all() -> list[dict]:
-    r = requests.get(f"{BASE}/v1/market/all", params={"isDetails": "false"}, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waited_sec": round(self.waited_sec, 3),
+                "http_429": self.http_429,
+            }
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms: tuple = LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        i = 0
+        while i < len(self.bounds_ms) and ms > self.bounds_ms[i]:
+            i += 1
+        with self.lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def _quantile(self, q: float) -> float | None:
+        # 버킷 상한으로 근사
+        if not self.count:
+            return None
+        target = q * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return float(self.bounds_ms[i]) if i < len(self.bounds_ms) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def stats(self, reset: bool = False) -> dict:
+        with self.lock:
+            labels = [f"le_{b}" for b in self.bounds_ms] + ["inf"]
+            out = {
+                "count": self.count,
+                "avg_ms": round(self.sum_ms / self.count, 1) if self.count else None,
+                "p50_ms": self._quantile(0.5),
+                "p99_ms": self._quantile(0.99),
+                "max_ms": round(self.max_ms, 1),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+            if reset:
+                self.reset()
+            return out
+
+
+def _build_session(pool_size: int, retries: int, backoff: float) -> requests.Session:
+    sess = requests.Session()
+    # 5xx/연결 오류만 재시도. 429는 rate limiter가 처리한다.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    sess.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+    return sess
+
+
+_session_lock = threading.Lock()
+_session_cfg = (HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_BACKOFF_SEC)
+_session = _build_session(*_session_cfg)
+
+
+def configure_http(pool_size: int | None = None, retries: int | None = None, backoff: float | None = None):
+    # pool/retry 설정이 바뀐 경우에만 세션을 다시 만든다
+    global _session, _session_cfg
+    with _session_lock:
+        cfg = (
+            int(pool_size) if pool_size is not None else _session_cfg[0],
+            int(retries) if retries is not None else _session_cfg[1],
+            float(backoff) if backoff is not None else _session_cfg[2],
+        )
+        if cfg == _session_cfg:
+            return
+        old, _session = _session, _build_session(*cfg)
+        _session_cfg = cfg
+    # 이전 pool 의 idle 연결을 닫는다. 진행 중인 요청은 끝난 뒤 연결이 pool 로 돌아올 때 닫힌다
+    old.close()
+
+
+_BUCKETS = {g: TokenBucket(DEFAULT_RATE_PER_SEC) for g in ("market", "ticker", "orderbook", "candles")}
+_LATENCY = {g: LatencyHistogram() for g in _BUCKETS}
+
+
+def _parse_remaining_req(value: str | None) -> tuple[str | None, int | None]:
+    # e.g. "group=candles; min=1799; sec=9"
+    if not value:
+        return None, None
+    group = None
+    sec = None
+    for part in value.split(";"):
+        k, _, v = part.strip().partition("=")
+        if k == "group":
+            group = v
+        elif k == "sec":
+            try:
+                sec = int(v)
+            except ValueError:
+                pass
+    return group, sec
+
+
+def _get(group: str, path: str, params: dict):
+    bucket = _BUCKETS[group]
+    attempt = 0
+    while True:
+        bucket.acquire()
+        t0 = time.perf_counter()
+        r = _session.get(f"{BASE}{path}", params=params, timeout=HTTP_TIMEOUT_SEC)
+        _LATENCY[group].observe((time.perf_counter() - t0) * 1000)
+        _, sec = _parse_remaining_req(r.headers.get("Remaining-Req"))
+        if sec is not None:
+            bucket.observe_remaining(sec)
+        if r.status_code == 429 and attempt < MAX_429_RETRIES:
+            bucket.penalize(attempt)
+            attempt += 1
+            continue
+        r.raise_for_status()
+        return r.json()
+
+
+def limiter_stats() -> dict:
+    return {g: b.stats() for g, b in _BUCKETS.items()}
+
+
+def latency_stats(reset: bool = False) -> dict:
+    return {g: h.stats(reset=reset) for g, h in _LATENCY.items()}
+
+
+def market_all(is_details: bool = False) -> list[dict]:
+    return _get("market", "/v1/market/all", {"isDetails": "true" if is_details else "false"})
 
 
 def ticker(markets: list[str]) -> list[dict]:
-    r = requests.get(f"{BASE}/v1/ticker", params={"markets": ",".join(markets)}, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return _get("ticker", "/v1/ticker", {"markets": ",".join(markets)})
 
 
 def orderbook(markets: list[str]) -> list[dict]:
-    r = requests.get(f"{BASE}/v1/orderbook", params={"markets": ",".join(markets)}, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return _get("orderbook", "/v1/orderbook", {"markets": ",".join(markets)})
 
 
-def candles_minutes(market: str, unit: int, count: int = 60) -> list[dict]:
-    r = requests.get(
-        f"{BASE}/v1/candles/minutes/{unit}",
-        params={"market": market, "count": count},
-        timeout=10,
-    )
-    r.raise_for_status()
-    return r.json()
+def candles_minutes(market: str, unit: int, count: int = 60, to: str | None = None) -> list[dict]:
+    # to: 이 시각 이전(exclusive) 봉부터 (UTC "yyyy-MM-ddTHH:mm:ssZ"), 과거 구간 페이지 조회용
+    params = {"market": market, "count": count}
+    if to:
+        params["to"] = to
+    return _get("candles", f"/v1/candles/minutes/{unit}", params)